@@ -5,179 +5,436 @@ This module provides a chat interface for querying customer databases
 using natural language queries that are automatically translated to SQL.
 """
 
+from __future__ import annotations
+
 import chainlit as cl
-from typing import Optional, List, Dict, Any
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, Awaitable, Callable, Iterator, NamedTuple, TypedDict
+import asyncio
+import csv
+import functools
+import io
 import logging
+import operator
+import time
+from collections import OrderedDict, deque
 from datetime import datetime
 
-from schema_translator.orchestrator import ChatOrchestrator
-from schema_translator.config import Config
+# The orchestrator pulls in the Anthropic client, NetworkX and the database
+# layer; it is imported when the first chat starts rather than at app load.
+if TYPE_CHECKING:
+    from schema_translator.orchestrator import ChatOrchestrator
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging (unless the host, e.g. a test runner, already did)
+if not logging.getLogger().handlers:
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
 logger = logging.getLogger(__name__)
 
 
-# Global orchestrator instance
-orchestrator: Optional[ChatOrchestrator] = None
+# Number of recent results kept per session for "Next Page" paging
+MAX_PAGED_RESULTS = 5
+
+# Number of recent queries kept per session for /stats
+MAX_QUERY_HISTORY = 1000
+
+# Longest cell value shown inline; longer text is cut with an ellipsis
+MAX_CELL_WIDTH = 80
+
+# Table rows per streamed chunk of a result message
+STREAM_ROW_BATCH = 10
+
+# Results with more rows than this also get the full table as a CSV file
+CSV_ATTACHMENT_ROWS = 200
+
+# Display names for aggregation result columns
+AGGREGATION_DISPLAY_NAMES = {
+    'source_db': 'Customer',
+    'count_contract_identifier': 'Count',
+    'sum_contract_value': 'Total Value',
+    'avg_contract_value': 'Avg Value',
+    'max_contract_value': 'Max Value',
+    'min_contract_value': 'Min Value',
+    'count': 'Count',
+    'sum': 'Sum',
+    'average': 'Average',
+    'max': 'Max',
+    'min': 'Min'
+}
+
+# Preferred column order and display names for regular (row) queries
+COLUMN_ORDER = (
+    'source_db',  # Show which customer (A, B, C, etc.)
+    'contract_identifier',  # Contract ID
+    'contract_value',
+    'contract_status',
+    'contract_expiration',
+    'contract_start'
+)
+
+COLUMN_DISPLAY_NAMES = {
+    'source_db': 'Customer',  # Which database (A, B, C, D, E, F)
+    'contract_identifier': 'Contract ID',
+    'contract_value': 'Value',
+    'contract_status': 'Status',
+    'contract_expiration': 'Expiration',
+    'contract_start': 'Start Date'
+}
+
+# Display names for the "Showing N fields" line above the table
+FIELD_DISPLAY_NAMES = {
+    'source_db': 'Customer',
+    'contract_identifier': 'Contract ID',
+    'contract_value': 'Value',
+    'contract_status': 'Status',
+    'contract_expiration': 'Expiration Date',
+    'contract_start': 'Start Date',
+    'count_contract_identifier': 'Count',
+    'sum_contract_value': 'Total Value',
+    'avg_contract_value': 'Avg Value',
+    'max_contract_value': 'Max Value',
+    'min_contract_value': 'Min Value'
+}
 
+# How long the rendered /customers listing is reused before re-reading the
+# databases; (monotonic ts, executor, markdown) of the last listing
+CUSTOMER_INFO_TTL_SECONDS = 60
+_customer_listing: Optional[tuple] = None
 
-def format_result_table(result, limit: int = 10) -> str:
+# customer_id -> short display code ("customer_a" -> "A")
+_SHORT_CODES: Dict[str, str] = {}
+
+# Exact-match cache of successful query responses (LRU with expiry). Shared
+# by all sessions on purpose: a response depends only on the query, the
+# customer selection and the debug flag, and every session reads the same
+# databases and knowledge graph.
+_QUERY_CACHE: "OrderedDict[tuple, tuple[float, Dict[str, Any]]]" = OrderedDict()
+_CACHE_MAX = 256
+_CACHE_TTL_SECONDS = 300
+
+
+async def cached_process_query(
+    orchestrator: ChatOrchestrator,
+    query_text: str,
+    customer_ids: Optional[List[str]],
+    debug: bool,
+    on_plan: Optional[Callable[[Any], Awaitable[Any]]] = None
+) -> Dict[str, Any]:
+    """Process a query, reusing a recent response for the same request.
+    
+    Args:
+        orchestrator: ChatOrchestrator instance
+        query_text: Natural language query
+        customer_ids: Customer IDs to query (all if None)
+        debug: Whether to include debug information
+        on_plan: Optional coroutine function awaited with the semantic plan as
+            soon as the query is parsed (not called on cache hits)
+        
+    Returns:
+        Response dictionary from ChatOrchestrator.process_query_async. A
+        cache hit returns a copy marked 'cached' with an execution_time_ms
+        of 0, since nothing was executed.
+    """
+    key = (query_text.strip().lower(), tuple(sorted(customer_ids or [])), debug)
+    now = time.monotonic()
+    
+    cached = _QUERY_CACHE.get(key)
+    if cached is not None:
+        cached_at, response = cached
+        if now - cached_at < _CACHE_TTL_SECONDS:
+            _QUERY_CACHE.move_to_end(key)
+            return {**response, 'cached': True, 'execution_time_ms': 0.0}
+        del _QUERY_CACHE[key]
+    
+    response = await orchestrator.process_query_async(
+        query_text, customer_ids, debug, on_plan=on_plan
+    )
+    
+    # Only cache successes so transient failures are retried
+    if response['success']:
+        _QUERY_CACHE[key] = (now, response)
+        if len(_QUERY_CACHE) > _CACHE_MAX:
+            _QUERY_CACHE.popitem(last=False)
+    
+    return response
+
+
+def format_result_table(
+    result,
+    limit: int = 10,
+    offset: int = 0,
+    columns_with_values: Optional[Dict[str, None]] = None
+) -> str:
     """Format harmonized result as a markdown table.
     
     Args:
         result: HarmonizedResult object
         limit: Maximum number of rows to display (default 10)
+        offset: Index of the first row to display (default 0)
+        columns_with_values: Output of present_columns(result), if the caller
+            already computed it
         
     Returns:
         Markdown formatted table
     """
-    if not result.results:
-        return "*No results found*"
+    return "".join(_iter_result_table(result, limit, offset, columns_with_values))
+
+
+def customer_short_code(customer_id: str) -> str:
+    """Return the display code for a customer ID (customer_a -> A).
     
-    # Get column names from first row
-    if not result.results:
-        return "*No data*"
+    Args:
+        customer_id: Customer ID
+        
+    Returns:
+        Upper-case short code, memoized per customer ID
+    """
+    code = _SHORT_CODES.get(customer_id)
+    if code is None:
+        prefix = 'customer_'
+        code = (customer_id[len(prefix):] if customer_id.startswith(prefix) else customer_id).upper()
+        _SHORT_CODES[customer_id] = code
+    return code
+
+
+def present_columns(result) -> Dict[str, None]:
+    """Find the columns that have a non-null value in at least one row.
     
-    first_row = result.results[0]
-    all_columns = list(first_row.data.keys())
+    Also fills in each row's source database (customer_a -> A) for display.
     
-    # Add source database to the data (from customer_id in HarmonizedRow)
-    # Convert customer_a -> A, customer_b -> B, etc. for display
+    Args:
+        result: HarmonizedResult object
+        
+    Returns:
+        Column names in first-seen order (as dict keys)
+    """
+    columns_with_values: Dict[str, None] = {}
     for row in result.results:
-        if 'source_db' not in row.data:
-            # Extract letter from customer_id (customer_a -> A)
-            customer_letter = row.customer_id.replace('customer_', '').upper()
-            row.data['source_db'] = customer_letter
+        data = row.data
+        if 'source_db' not in data:
+            data['source_db'] = customer_short_code(row.customer_id)
+        for col, val in data.items():
+            if val is not None:
+                columns_with_values[col] = None
+    return columns_with_values
+
+
+def _iter_result_table(
+    result,
+    limit: int,
+    offset: int,
+    columns_with_values: Optional[Dict[str, None]] = None
+) -> Iterator[str]:
+    """Yield a harmonized result as a markdown table, a few rows at a time.
     
-    # Add source_db to all_columns if not already there
-    if 'source_db' not in all_columns:
-        all_columns.insert(0, 'source_db')
+    Args:
+        result: HarmonizedResult object
+        limit: Maximum number of rows to display
+        offset: Index of the first row to display
+        columns_with_values: Precomputed present_columns(result), if any
+        
+    Yields:
+        The header, then batches of STREAM_ROW_BATCH rows, then the footer
+    """
+    if not result.results:
+        yield "*No results found*"
+        return
     
-    # Filter to only columns that have non-null values in at least one row
-    columns_with_values = set()
-    for col in all_columns:
-        if any(row.data.get(col) is not None for row in result.results):
-            columns_with_values.add(col)
+    if columns_with_values is None:
+        columns_with_values = present_columns(result)
     
     # Check if multiple customers are being queried
     multiple_customers = len(result.customers_queried) > 1
     
     # Always include source_db if querying multiple customers
-    if multiple_customers and 'source_db' not in columns_with_values:
-        columns_with_values.add('source_db')
+    if multiple_customers:
+        columns_with_values.setdefault('source_db')
     
     # Check if this is an aggregation/count query (no contract_identifier or all null)
     is_aggregation = 'contract_identifier' not in columns_with_values
     
     if is_aggregation:
         # For aggregations, show source_db first, then all other non-null columns
-        columns = []
-        if 'source_db' in columns_with_values:
-            columns.append('source_db')
-        for col in columns_with_values:
-            if col != 'source_db':
-                columns.append(col)
-        
-        # Nice names for aggregation fields
-        nice_names = {
-            'source_db': 'Customer',
-            'count_contract_identifier': 'Count',
-            'sum_contract_value': 'Total Value',
-            'avg_contract_value': 'Avg Value',
-            'max_contract_value': 'Max Value',
-            'min_contract_value': 'Min Value',
-            'count': 'Count',
-            'sum': 'Sum',
-            'average': 'Average',
-            'max': 'Max',
-            'min': 'Min'
-        }
+        leading = ('source_db',) if 'source_db' in columns_with_values else ()
+        nice_names = AGGREGATION_DISPLAY_NAMES
     else:
         # For regular queries, use preferred field order (only for columns with values)
-        field_order = [
-            'source_db',  # Show which customer (A, B, C, etc.)
-            'contract_identifier',  # Contract ID
-            'contract_value',
-            'contract_status',
-            'contract_expiration',
-            'contract_start'
-        ]
-        
-        nice_names = {
-            'source_db': 'Customer',  # Which database (A, B, C, D, E, F)
-            'contract_identifier': 'Contract ID',
-            'contract_value': 'Value',
-            'contract_status': 'Status',
-            'contract_expiration': 'Expiration',
-            'contract_start': 'Start Date'
-        }
-        
-        # Order columns: preferred order first (only include if they have values)
-        columns = []
-        for field in field_order:
-            if field in columns_with_values:
-                columns.append(field)
-        
-        # Add any remaining columns not in preferred order (that have values)
-        for col in columns_with_values:
-            if col not in columns:
-                columns.append(col)
+        leading = tuple(f for f in COLUMN_ORDER if f in columns_with_values)
+        nice_names = COLUMN_DISPLAY_NAMES
     
-    # Build markdown table with better formatting
-    lines = []
+    # Remaining columns follow in the order they first appear in the rows
+    columns = list(dict.fromkeys((*leading, *columns_with_values)))
     
+    # Build markdown table with better formatting
     # Header with nicer column names
-    display_cols = []
-    for col in columns:
-        # Get nice name or convert snake_case to Title Case
-        if col in nice_names:
-            display_cols.append(nice_names[col])
-        else:
-            # Convert snake_case to Title Case
-            display_cols.append(col.replace('_', ' ').title())
-    
-    header = "| " + " | ".join(display_cols) + " |"
-    separator = "|" + "|".join(["---" for _ in columns]) + "|"
-    lines.append(header)
-    lines.append(separator)
-    
-    # Rows (limit to specified number or total results, whichever is smaller)
-    max_rows = min(limit, len(result.results))
-    for row in result.results[:max_rows]:
-        values = []
-        for col in columns:
-            val = row.data.get(col, "")
-            # Format values for better display
-            if val is None or val == "None":
-                val = "—"
-            elif isinstance(val, (int, float)):
-                # Format numbers based on column type
-                if 'value' in col.lower() or 'sum' in col.lower():
-                    # Format currency values
-                    val = f"${val:,.0f}"
-                elif 'avg' in col.lower() or 'average' in col.lower():
-                    # Format averages with 2 decimals
-                    val = f"${val:,.2f}" if 'value' in col.lower() else f"{val:,.2f}"
-                else:
-                    # Format counts and other integers
-                    val = f"{val:,}"
-            else:
-                val = str(val)
-            values.append(val)
-        line = "| " + " | ".join(values) + " |"
-        lines.append(line)
+    display_cols = [nice_names.get(col) or _title_case(col) for col in columns]
+    
+    yield "| " + " | ".join(display_cols) + " |\n|" + "|".join(["---"] * len(columns)) + "|"
+    
+    # Rows for the requested page only. Result rows normally share the same
+    # keys, so fetch all cells with one itemgetter call and fall back to
+    # .get() for ragged rows.
+    if len(columns) > 1:
+        get_values = operator.itemgetter(*columns)
+    else:
+        get_values = lambda data: (data[columns[0]],)
+    
+    # One format call per row instead of building and joining a cell list
+    row_fmt = "\n| " + " | ".join(["{}"] * len(columns)) + " |"
+    formatters = [_pick_formatter(col) for col in columns]
     
-    if len(result.results) > max_rows:
-        lines.append(f"\n*Showing {max_rows} of {len(result.results)} rows. Use `/limit <number>` to adjust.*")
+    def row_values(data):
+        try:
+            return get_values(data)
+        except KeyError:
+            return [data.get(col, "") for col in columns]
     
-    return "\n".join(lines)
+    # Slicing clamps to the available rows, so no min()/length checks needed
+    page = result.results[offset:offset + limit]
+    shown = len(page)
+    for start in range(0, shown, STREAM_ROW_BATCH):
+        yield "".join(
+            row_fmt.format(*[fmt(val) for fmt, val in zip(formatters, row_values(row.data))])
+            for row in page[start:start + STREAM_ROW_BATCH]
+        )
+    
+    total = len(result.results)
+    shown_end = offset + shown
+    if offset > 0:
+        yield f"\n\n*Showing rows {offset + 1}-{shown_end} of {total}.*"
+    elif total > shown_end:
+        yield f"\n\n*Showing {shown_end} of {total} rows. Use `/limit <number>` to adjust.*"
+
+
+def _format_text(val: Any) -> str:
+    """Format a non-numeric table cell, cutting long text to MAX_CELL_WIDTH."""
+    if val is None or val == "None":
+        return "—"
+    val = str(val)
+    if len(val) > MAX_CELL_WIDTH:
+        return val[:MAX_CELL_WIDTH - 1] + "…"
+    return val
+
+
+def _number_formatter(number_format: str) -> Callable[[Any], str]:
+    """Build a cell formatter that applies number_format to ints and floats."""
+    apply_format = number_format.format
+    
+    def format_cell(val: Any) -> str:
+        if isinstance(val, (int, float)):
+            return apply_format(val)
+        return _format_text(val)
+    
+    return format_cell
+
+
+_format_currency = _number_formatter("${:,.0f}")
+_format_average = _number_formatter("{:,.2f}")
+_format_count = _number_formatter("{:,}")
 
 
-def format_statistics(stats: Dict[str, Any]) -> str:
+def _pick_formatter(col: str) -> Callable[[Any], str]:
+    """Choose the cell formatter for a column based on its name.
+    
+    Args:
+        col: Column name
+        
+    Returns:
+        Function formatting one cell value of that column
+    """
+    lowered = col.lower()
+    if 'value' in lowered or 'sum' in lowered:
+        return _format_currency
+    if 'avg' in lowered or 'average' in lowered:
+        return _format_average
+    return _format_count
+
+
+def result_to_csv(result) -> bytes:
+    """Serialize every row of a harmonized result as CSV.
+    
+    Args:
+        result: HarmonizedResult object
+        
+    Returns:
+        UTF-8 encoded CSV with a header row
+    """
+    columns = list(dict.fromkeys(
+        col for row in result.results for col in row.data
+    ))
+    
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=columns, restval="")
+    writer.writeheader()
+    writer.writerows(row.data for row in result.results)
+    return buf.getvalue().encode("utf-8")
+
+
+def format_plan_preview(plan) -> str:
+    """Format a short, one-line summary of a semantic plan.
+    
+    Args:
+        plan: SemanticQueryPlan object
+        
+    Returns:
+        Markdown formatted summary
+    """
+    preview = f"\n\n*Understood as* `{plan.intent}`"
+    if plan.filters:
+        filters = ', '.join(f"`{f.concept}` {f.operator} `{f.value}`" for f in plan.filters)
+        preview += f" *where* {filters}"
+    if plan.target_customers:
+        preview += f" *on* {', '.join(plan.target_customers)}"
+    return preview + "\n\n*Running queries...*"
+
+
+class QueryStats(TypedDict):
+    """Execution statistics shown under a result table."""
+    success_rate: float
+    total_rows: int
+    customers_queried: List[str]
+    customers_succeeded: List[str]
+    customers_failed: List[str]
+    execution_time_ms: float
+
+
+class SemanticPlanDebug(TypedDict, total=False):
+    """Semantic plan summary from ChatOrchestrator._build_debug_info."""
+    intent: str
+    projections: List[str]
+    filters: List[Dict[str, Any]]
+    aggregations: List[Any]
+    limit: Optional[int]
+
+
+class DebugInfo(TypedDict, total=False):
+    """Debug payload rendered when debug mode is on."""
+    semantic_plan: SemanticPlanDebug
+    customers: Dict[str, List[str]]
+    sql_queries: Dict[str, str]
+    actual_columns: List[str]
+
+
+_STATS_TEMPLATE = (
+    "### 📊 Execution Statistics\n"
+    "- **Success Rate:** {success_rate:.1f}%\n"
+    "- **Total Rows:** {total_rows}\n"
+    "- **Customers Queried:** {n_queried}\n"
+    "- **Customers Succeeded:** {n_succeeded}\n"
+    "- **Execution Time:** {execution_time_ms:.2f}ms"
+)
+
+_DEBUG_TEMPLATE = (
+    "### 🔍 Debug Information\n"
+    "\n"
+    "**Semantic Plan:**\n"
+    "- Intent: `{intent}`\n"
+    "- Projections ({n_projections}): {projections}"
+)
+
+
+def format_statistics(stats: QueryStats) -> str:
     """Format statistics as markdown.
     
     Args:
@@ -186,96 +443,266 @@ def format_statistics(stats: Dict[str, Any]) -> str:
     Returns:
         Formatted statistics
     """
-    lines = [
-        "### 📊 Execution Statistics",
-        f"- **Total Rows:** {stats['total_rows']}",
-        f"- **Customers Queried:** {len(stats['customers_queried'])}",
-        f"- **Execution Time:** {stats['execution_time_ms']:.2f}ms"
-    ]
+    buf = io.StringIO()
+    _write_statistics(buf.write, stats)
+    return buf.getvalue()
+
+
+def _write_statistics(w: Callable[[str], Any], stats: QueryStats) -> None:
+    """Write statistics as markdown.
+    
+    Args:
+        w: Write function of the output buffer
+        stats: Statistics dictionary
+    """
+    w(_STATS_TEMPLATE.format_map({
+        **stats,
+        "n_queried": len(stats['customers_queried']),
+        "n_succeeded": len(stats['customers_succeeded']),
+    }))
     
     if stats['customers_failed']:
-        lines.append(f"- **Customers Failed:** {', '.join(stats['customers_failed'])}")
-    
-    return "\n".join(lines)
+        w(f"\n- **Customers Failed:** {', '.join(stats['customers_failed'])}")
 
 
-def format_debug_info(debug: Dict[str, Any]) -> str:
+def format_debug_info(debug: DebugInfo) -> str:
     """Format debug information as markdown.
     
     Args:
         debug: Debug information dictionary
         
     Returns:
-        Formatted debug info
+        Formatted debug info ("" when there is nothing to show)
     """
-    projections = debug['semantic_plan']['projections']
-    proj_list = ', '.join(f'`{p}`' for p in projections) if projections else "*(none - SELECT ALL)*"
-    
-    lines = [
-        "### 🔍 Debug Information",
-        "",
-        "**Semantic Plan:**",
-        f"- Intent: `{debug['semantic_plan']['intent']}`",
-        f"- Projections ({len(projections)}): {proj_list}",
-    ]
-    
-    if debug['semantic_plan']['filters']:
-        lines.append(f"- Filters: {len(debug['semantic_plan']['filters'])}")
-        for f in debug['semantic_plan']['filters']:
-            lines.append(f"  - `{f['concept']}` {f['operator']} `{f['value']}`")
-    
-    if debug['semantic_plan']['aggregations']:
+    if not debug:
+        return ""
+    
+    buf = io.StringIO()
+    _write_debug_info(buf.write, debug)
+    return buf.getvalue()
+
+
+def _write_debug_info(w: Callable[[str], Any], debug: DebugInfo) -> None:
+    """Write debug information as markdown.
+    
+    Args:
+        w: Write function of the output buffer
+        debug: Debug information dictionary
+    """
+    plan = debug.get('semantic_plan') or {}
+    projections = plan.get('projections') or []
+    filters = plan.get('filters')
+    aggregations = plan.get('aggregations')
+    
+    w(_DEBUG_TEMPLATE.format_map({
+        "intent": plan.get('intent', 'unknown'),
+        "n_projections": len(projections),
+        "projections": "`" + "`, `".join(projections) + "`" if projections else "*(none - SELECT ALL)*",
+    }))
+    
+    if filters:
+        w(f"\n- Filters: {len(filters)}")
+        for f in filters:
+            w(f"\n  - `{f.get('concept')}` {f.get('operator')} `{f.get('value')}`")
+    
+    if aggregations:
         agg_strs = []
-        for agg in debug['semantic_plan']['aggregations']:
-            if agg.get('alias'):
-                agg_strs.append(f"{agg['function']}({agg['concept']}) as {agg['alias']}")
+        for agg in aggregations:
+            # Plans from the orchestrator carry dicts; plain names are shown as-is
+            if isinstance(agg, str):
+                agg_strs.append(agg)
+            elif agg.get('alias'):
+                agg_strs.append(f"{agg.get('function')}({agg.get('concept')}) as {agg['alias']}")
             else:
-                agg_strs.append(f"{agg['function']}({agg['concept']})")
-        lines.append(f"- Aggregations: {', '.join(agg_strs)}")
+                agg_strs.append(f"{agg.get('function')}({agg.get('concept')})")
+        w(f"\n- Aggregations: {', '.join(agg_strs)}")
     
     # Show actual columns returned
-    if 'actual_columns' in debug:
-        actual_cols = ', '.join(f'`{c}`' for c in debug['actual_columns'])
-        lines.append(f"\n**Actual Columns Returned ({len(debug['actual_columns'])}):**")
-        lines.append(actual_cols)
+    actual_columns = debug.get('actual_columns')
+    if actual_columns is not None:
+        w(f"\n\n**Actual Columns Returned ({len(actual_columns)}):**\n")
+        w("`" + "`, `".join(actual_columns) + "`" if actual_columns else "")
     
     # Show sample SQL for first customer
-    lines.append("\n**Sample SQL (first customer):**")
-    if debug['sql_queries']:
-        first_customer = list(debug['sql_queries'].keys())[0]
-        sql = debug['sql_queries'][first_customer]
-        lines.append(f"```sql\n{sql}\n```")
+    w("\n\n**Sample SQL (first customer):**")
+    sql_queries = debug.get('sql_queries')
+    if sql_queries:
+        sql = sql_queries[next(iter(sql_queries))]
+        w(f"\n```sql\n{sql}\n```")
+
+
+@functools.lru_cache(maxsize=128)
+def _title_case(col: str) -> str:
+    """Convert a snake_case column name to Title Case (memoized)."""
+    return col.replace('_', ' ').title()
+
+
+def _format_field_header(columns_with_values: Dict[str, None]) -> str:
+    """Format the "Showing N fields" line for a result.
+    
+    Args:
+        columns_with_values: Output of present_columns(result)
+        
+    Returns:
+        Markdown line, or "" when the result has no rows
+    """
+    if not columns_with_values:
+        return ""
+    
+    actual_fields = [f for f in columns_with_values if f != 'source_db']
+    field_list = ', '.join(
+        f"`{FIELD_DISPLAY_NAMES.get(f) or _title_case(f)}`" for f in actual_fields
+    )
+    return f"**Showing {len(actual_fields)} fields:** {field_list}"
+
+
+def render_response(
+    result,
+    stats: QueryStats,
+    debug: Optional[DebugInfo] = None,
+    limit: int = 10
+) -> str:
+    """Render a full query response (fields, table, statistics, debug) in one pass.
+    
+    Args:
+        result: HarmonizedResult object
+        stats: Statistics dictionary
+        debug: Debug information dictionary, if debug mode is on
+        limit: Maximum number of rows to display
+        
+    Returns:
+        Markdown message content
+    """
+    return "".join(iter_response_chunks(result, stats, debug, limit))
+
+
+def iter_response_chunks(
+    result,
+    stats: QueryStats,
+    debug: Optional[DebugInfo] = None,
+    limit: int = 10
+) -> Iterator[str]:
+    """Yield a query response in display order for streaming to the client.
+    
+    Args:
+        result: HarmonizedResult object
+        stats: Statistics dictionary
+        debug: Debug information dictionary, if debug mode is on
+        limit: Maximum number of rows to display
+        
+    Yields:
+        Markdown fragments that concatenate to render_response's output
+    """
+    # Show available fields (one scan shared with the table below)
+    columns_with_values = present_columns(result)
+    field_header = _format_field_header(columns_with_values)
+    if field_header:
+        yield field_header + "\n\n\n"
+    
+    # Results table
+    yield "### ✅ Query Results\n\n"
+    yield from _iter_result_table(result, limit, 0, columns_with_values)
+    
+    # Statistics
+    yield "\n\n\n" + format_statistics(stats)
+    
+    # Debug info if enabled
+    if debug:
+        yield "\n\n\n" + format_debug_info(debug)
+
+
+_WELCOME_MESSAGE = """# 🎯 Schema Translator
+
+Query customer contracts databases using natural language. 
+
+**Examples:**
+- "Show me all contracts from customer A"
+- "Find active contracts with value over $3M"
+- "Contracts expiring in 30 days"
+- "Count active contracts by customer"
+
+**Settings:** Click the ⚙️ gear icon at the bottom of the chat input to select customers, enable debug mode, or adjust result limit.
+
+**Commands:** `/help` • `/stats` • `/explain <query>`
+"""
+
+
+@functools.lru_cache(maxsize=1)
+def _shared_components() -> Dict[str, Any]:
+    """Build the parts of an orchestrator that chat sessions can share.
+    
+    Loading the knowledge graph, scanning the databases and creating the
+    Anthropic clients are the slow parts of starting a chat, and sessions
+    only read them, so they are built once per process.
+    
+    Returns:
+        ChatOrchestrator keyword arguments: config, knowledge_graph, executor
+        and llm_clients (None in mock mode)
+    """
+    from anthropic import Anthropic, AsyncAnthropic
+    from schema_translator.config import Config
+    from schema_translator.database_executor import DatabaseExecutor
+    from schema_translator.knowledge_graph import SchemaKnowledgeGraph
     
-    return "\n".join(lines)
+    config = Config()
+    knowledge_graph = SchemaKnowledgeGraph()
+    knowledge_graph.load_cached(config.knowledge_graph_path)
+    llm_clients = None
+    if config.anthropic_api_key:
+        llm_clients = (
+            Anthropic(api_key=config.anthropic_api_key),
+            AsyncAnthropic(api_key=config.anthropic_api_key)
+        )
+    
+    return {
+        "config": config,
+        "knowledge_graph": knowledge_graph,
+        "executor": DatabaseExecutor(),
+        "llm_clients": llm_clients
+    }
+
+
+def create_orchestrator() -> ChatOrchestrator:
+    """Create a chat session's orchestrator on top of the shared components.
+    
+    Each session gets its own instance, so agent plan caches and query
+    history are never shared between users.
+    
+    Returns:
+        ChatOrchestrator instance
+    """
+    from schema_translator.orchestrator import ChatOrchestrator
+    
+    shared = _shared_components()
+    return ChatOrchestrator(use_llm=shared["llm_clients"] is not None, **shared)
 
 
 @cl.on_chat_start
 async def start():
     """Initialize the chat session."""
-    global orchestrator
-    
-    # Initialize orchestrator
+    # Initialize orchestrator (per session; never shared through a module global)
     try:
-        config = Config()
-        orchestrator = ChatOrchestrator(use_llm=bool(config.anthropic_api_key))
+        orchestrator = create_orchestrator()
         
         # Store in session
         cl.user_session.set("orchestrator", orchestrator)
         cl.user_session.set("debug_mode", False)
         cl.user_session.set("selected_customers", [])  # Empty = all customers
         cl.user_session.set("result_limit", 10)  # Default rows to display
+        # (timestamp, query, success, execution_time_ms) of recent queries
+        cl.user_session.set("query_history", deque(maxlen=MAX_QUERY_HISTORY))
         
         mode = "LLM mode" if orchestrator.use_llm else "Mock mode"
         
         # Get available customers
-        customers = orchestrator.list_available_customers()
+        customers = refresh_available_customers(orchestrator)
         
         # Create settings panel - using list syntax for Chainlit 2.9.0
         settings = [
             cl.input_widget.Select(
                 id="customer_selection",
                 label="Query Customers",
-                values=["All Customers"] + [f"Customer {c.split('_')[1].upper()}" for c in customers],
+                values=["All Customers"] + [f"Customer {customer_short_code(c)}" for c in customers],
                 initial_value="All Customers",
                 description="Select which customer database(s) to query"
             ),
@@ -299,27 +726,12 @@ async def start():
         await cl.ChatSettings(settings).send()
         
         # Send welcome message
-        welcome_msg = f"""# 🎯 Schema Translator
-
-Query customer contracts databases using natural language. 
-
-**Examples:**
-- "Show me all contracts from customer A"
-- "Find active contracts with value over $3M"
-- "Contracts expiring in 30 days"
-- "Count active contracts by customer"
-
-**Settings:** Click the ⚙️ gear icon at the bottom of the chat input to select customers, enable debug mode, or adjust result limit.
-
-**Commands:** `/help` • `/stats` • `/explain <query>`
-"""
-        
-        await cl.Message(content=welcome_msg).send()
+        await cl.Message(content=_WELCOME_MESSAGE).send()
         
-        logger.info(f"Chat started with {len(customers)} customers available")
+        logger.info("Chat started with %d customers available", len(customers))
         
     except Exception as e:
-        logger.error(f"Failed to initialize orchestrator: {e}", exc_info=True)
+        logger.error("Failed to initialize orchestrator: %s", e, exc_info=True)
         await cl.Message(
             content=f"❌ **Error:** Failed to initialize. Please check configuration.\n\n`{str(e)}`"
         ).send()
@@ -328,8 +740,6 @@ Query customer contracts databases using natural language.
 @cl.on_settings_update
 async def on_settings_change(settings):
     """Handle settings changes from the sidebar."""
-    orchestrator = cl.user_session.get("orchestrator")
-    
     # Update debug mode
     debug_mode = settings.get("debug_mode", False)
     cl.user_session.set("debug_mode", debug_mode)
@@ -351,15 +761,36 @@ async def on_settings_change(settings):
         await cl.Message(content=f"✅ Now querying **{customer_id}**.").send()
 
 
+class SessionState(NamedTuple):
+    """Per-session values the message handler needs on every message."""
+    # This session's own orchestrator (built on the shared components)
+    orchestrator: Optional[ChatOrchestrator]
+    debug_mode: bool
+    selected_customers: List[str]
+    result_limit: int
+    query_history: deque
+
+
+def _session_state() -> SessionState:
+    """Read the message handler's session values in one place.
+    
+    Returns:
+        SessionState with defaults for values not set yet
+    """
+    get = cl.user_session.get
+    return SessionState(
+        get("orchestrator"),
+        get("debug_mode", False),
+        get("selected_customers", []),
+        get("result_limit", 10),
+        get("query_history"),
+    )
+
+
 @cl.on_message
 async def main(message: cl.Message):
     """Handle incoming chat messages."""
-    global orchestrator
-    
-    orchestrator = cl.user_session.get("orchestrator")
-    debug_mode = cl.user_session.get("debug_mode", False)
-    selected_customers = cl.user_session.get("selected_customers", [])
-    result_limit = cl.user_session.get("result_limit", 10)
+    orchestrator, debug_mode, selected_customers, result_limit, query_history = _session_state()
     
     if not orchestrator:
         await cl.Message(content="❌ Orchestrator not initialized. Please refresh.").send()
@@ -385,73 +816,45 @@ async def main(message: cl.Message):
         # Execute query
         customer_ids = selected_customers if selected_customers else None
         
-        response = orchestrator.process_query(
+        # Stream the parsed plan into the processing message while SQL runs
+        async def on_plan(plan):
+            await processing_msg.stream_token(format_plan_preview(plan))
+        
+        response = await cached_process_query(
+            orchestrator,
             query_text,
-            customer_ids=customer_ids,
-            debug=debug_mode
+            customer_ids,
+            debug_mode,
+            on_plan
         )
         
+        query_history.append((
+            time.time(),
+            query_text,
+            response['success'],
+            response.get('execution_time_ms', 0.0)
+        ))
+        
         if response['success']:
             # Format successful response
             result = response['result']
             
-            # Build response message
-            content_parts = []
-            
-            # Show available fields
-            if result.results:
-                fields = list(result.results[0].data.keys())
-                # Filter out None values to get actual fields returned
-                actual_fields = [f for f in fields if any(
-                    row.data.get(f) is not None for row in result.results
-                )]
-                
-                field_names = {
-                    'source_db': 'Customer',
-                    'contract_identifier': 'Contract ID',
-                    'contract_value': 'Value',
-                    'contract_status': 'Status',
-                    'contract_expiration': 'Expiration Date',
-                    'contract_start': 'Start Date',
-                    'count_contract_identifier': 'Count',
-                    'sum_contract_value': 'Total Value',
-                    'avg_contract_value': 'Avg Value',
-                    'max_contract_value': 'Max Value',
-                    'min_contract_value': 'Min Value'
-                }
-                
-                field_display = []
-                for f in actual_fields:
-                    nice_name = field_names.get(f, f.replace('_', ' ').title())
-                    field_display.append(f"`{nice_name}`")
-                
-                field_list = ', '.join(field_display)
-                content_parts.append(f"**Showing {len(actual_fields)} fields:** {field_list}\n")
-            
-            # Results table
-            content_parts.append("### ✅ Query Results")
-            content_parts.append(format_result_table(result, limit=result_limit))
-            
             # Statistics
-            stats = {
-                'total_rows': result.total_count,
-                'customers_queried': result.customers_queried,
-                'customers_failed': result.customers_failed,
-                'execution_time_ms': response['execution_time_ms']
-            }
-            content_parts.append("\n" + format_statistics(stats))
+            stats = QueryStats(
+                success_rate=result.success_rate,
+                total_rows=result.total_count,
+                customers_queried=result.customers_queried,
+                customers_succeeded=result.customers_succeeded,
+                customers_failed=result.customers_failed,
+                execution_time_ms=response['execution_time_ms']
+            )
             
             # Debug info if enabled
+            debug_with_columns: Optional[DebugInfo] = None
             if debug_mode and 'debug' in response:
                 # Add actual columns returned
-                actual_columns = list(result.results[0].data.keys()) if result.results else []
                 debug_with_columns = response['debug'].copy()
-                debug_with_columns['actual_columns'] = actual_columns
-                content_parts.append("\n" + format_debug_info(debug_with_columns))
-            
-            # Remove processing message and send result
-            await processing_msg.remove()
-            await cl.Message(content="\n\n".join(content_parts)).send()
+                debug_with_columns['actual_columns'] = result.columns
             
             # Add action buttons
             actions = [
@@ -463,7 +866,33 @@ async def main(message: cl.Message):
             if not debug_mode:
                 actions.insert(0, cl.Action(name="debug", payload={"action": "debug"}, label="🔍 Show Debug Info"))
             
-            await cl.Message(content="", actions=actions).send()
+            # Large results ship as a file instead of more inline markdown
+            elements = []
+            if len(result.results) > CSV_ATTACHMENT_ROWS:
+                elements.append(cl.File(
+                    name="results.csv",
+                    content=result_to_csv(result),
+                    mime="text/csv",
+                    display="inline"
+                ))
+            
+            result_msg = cl.Message(content="", actions=actions, elements=elements)
+            
+            # Keep the result around so later pages render without re-running the query
+            if len(result.results) > result_limit:
+                store_paged_result(result_msg.id, result)
+                actions.append(cl.Action(
+                    name="next_page",
+                    payload={"message_id": result_msg.id, "offset": result_limit},
+                    label="➡️ Next Page"
+                ))
+            
+            # Replace the processing message with the result, streaming the
+            # table as it is formatted; send() then attaches the actions
+            await processing_msg.remove()
+            for chunk in iter_response_chunks(result, stats, debug_with_columns, limit=result_limit):
+                await result_msg.stream_token(chunk)
+            await result_msg.send()
             
         else:
             # Format error response
@@ -481,18 +910,88 @@ async def main(message: cl.Message):
             await cl.Message(content=error_msg).send()
     
     except Exception as e:
-        logger.error(f"Error processing query: {e}", exc_info=True)
+        logger.error("Error processing query: %s", e, exc_info=True)
         await processing_msg.remove()
         await cl.Message(
             content=f"❌ **Unexpected Error:** {str(e)}\n\nPlease try again or contact support."
         ).send()
 
 
+def refresh_available_customers(orchestrator: ChatOrchestrator) -> List[str]:
+    """Re-read the available customers and cache them in the user session.
+    
+    Also drops the cached /customers listing so it reflects the change.
+    
+    Args:
+        orchestrator: ChatOrchestrator instance
+        
+    Returns:
+        Sorted list of available customer IDs
+    """
+    global _customer_listing
+    
+    available = orchestrator.list_available_customers(refresh=True)
+    _customer_listing = None
+    cl.user_session.set("available_customers", available)
+    cl.user_session.set("available_customers_set", frozenset(available))
+    return available
+
+
+def store_paged_result(message_id: str, result) -> None:
+    """Remember a result for paging, keeping only the most recent ones.
+    
+    Args:
+        message_id: ID of the message that displayed the result
+        result: HarmonizedResult object
+    """
+    paged_results = cl.user_session.get("paged_results") or {}
+    paged_results[message_id] = result
+    while len(paged_results) > MAX_PAGED_RESULTS:
+        paged_results.pop(next(iter(paged_results)))
+    cl.user_session.set("paged_results", paged_results)
+
+
+@cl.action_callback("next_page")
+async def on_next_page(action: cl.Action):
+    """Render the next page of a previous result."""
+    message_id = action.payload.get("message_id")
+    offset = action.payload.get("offset", 0)
+    result = (cl.user_session.get("paged_results") or {}).get(message_id)
+    
+    if result is None:
+        await cl.Message(content="⚠️ This result is no longer available. Please run the query again.").send()
+        return
+    
+    limit = cl.user_session.get("result_limit", 10)
+    actions = []
+    if offset + limit < len(result.results):
+        actions.append(cl.Action(
+            name="next_page",
+            payload={"message_id": message_id, "offset": offset + limit},
+            label="➡️ Next Page"
+        ))
+    
+    await cl.Message(
+        content=format_result_table(result, limit=limit, offset=offset),
+        actions=actions
+    ).send()
+
+
+@cl.action_callback("refresh_customers")
+async def on_refresh_customers(action: cl.Action):
+    """Re-scan the customer databases for this session."""
+    orchestrator = cl.user_session.get("orchestrator")
+    if not orchestrator:
+        await cl.Message(content="❌ Orchestrator not initialized. Please refresh.").send()
+        return
+    
+    available = refresh_available_customers(orchestrator)
+    await cl.Message(content=f"🔄 Customer list refreshed: {', '.join(available)}").send()
+
+
 @cl.action_callback("explain")
 async def on_explain(action: cl.Action):
     """Handle explain action."""
-    orchestrator = cl.user_session.get("orchestrator")
-    
     # Get the query from the previous message
     # For now, send a message asking to use /explain command
     await cl.Message(
@@ -522,19 +1021,7 @@ async def on_debug(action: cl.Action):
     ).send()
 
 
-async def handle_command(command: str, orchestrator: ChatOrchestrator, debug_mode: bool):
-    """Handle special commands.
-    
-    Args:
-        command: Command string
-        orchestrator: ChatOrchestrator instance
-        debug_mode: Current debug mode state
-    """
-    parts = command.split(maxsplit=1)
-    cmd = parts[0].lower()
-    
-    if cmd == "/help":
-        help_msg = """### 📚 Help
+_HELP_MESSAGE = """### 📚 Help
 
 **Example Queries:**
 - "Show me all contracts"
@@ -568,15 +1055,33 @@ async def handle_command(command: str, orchestrator: ChatOrchestrator, debug_mod
 - Use filters like "active", "over $1M", "expiring in 30 days", "this year"
 - Enable debug mode to see how queries are translated to SQL
 """
-        await cl.Message(content=help_msg).send()
+
+
+async def _cmd_help(args: str, orchestrator: ChatOrchestrator, debug_mode: bool):
+    """Show the help message."""
+    await cl.Message(content=_HELP_MESSAGE).send()
+
+
+async def _cmd_customers(args: str, orchestrator: ChatOrchestrator, debug_mode: bool):
+    """List available customer databases with details."""
+    global _customer_listing
     
-    elif cmd == "/customers":
+    now = time.monotonic()
+    if (
+        _customer_listing is not None
+        and _customer_listing[1] is orchestrator.executor
+        and now - _customer_listing[0] < CUSTOMER_INFO_TTL_SECONDS
+    ):
+        content = _customer_listing[2]
+    else:
         customers = orchestrator.list_available_customers()
         
-        # Get info for each customer
+        # Get info for each customer concurrently
+        get_info = cl.make_async(orchestrator.get_customer_info)
+        infos = await asyncio.gather(*(get_info(customer_id) for customer_id in customers))
+        
         customer_info = []
-        for customer_id in customers:
-            info = orchestrator.get_customer_info(customer_id)
+        for customer_id, info in zip(customers, infos):
             if info['available']:
                 customer_info.append(
                     f"- **{customer_id}**: {info['total_rows']} rows, "
@@ -584,48 +1089,65 @@ async def handle_command(command: str, orchestrator: ChatOrchestrator, debug_mod
                 )
         
         content = f"### 👥 Available Customers ({len(customers)})\n\n" + "\n".join(customer_info)
-        await cl.Message(content=content).send()
+        _customer_listing = (now, orchestrator.executor, content)
     
-    elif cmd == "/debug":
-        if len(parts) > 1:
-            setting = parts[1].lower()
-            if setting == "on":
-                cl.user_session.set("debug_mode", True)
-                await cl.Message(content="🔍 Debug mode **enabled**. You'll see SQL queries and semantic plans.").send()
-            elif setting == "off":
-                cl.user_session.set("debug_mode", False)
-                await cl.Message(content="🔍 Debug mode **disabled**.").send()
-            else:
-                await cl.Message(content="⚠️ Use `/debug on` or `/debug off`").send()
+    await cl.Message(content=content).send()
+
+
+async def _cmd_debug(args: str, orchestrator: ChatOrchestrator, debug_mode: bool):
+    """Show or toggle debug mode."""
+    if args:
+        setting = args.lower()
+        if setting == "on":
+            cl.user_session.set("debug_mode", True)
+            await cl.Message(content="🔍 Debug mode **enabled**. You'll see SQL queries and semantic plans.").send()
+        elif setting == "off":
+            cl.user_session.set("debug_mode", False)
+            await cl.Message(content="🔍 Debug mode **disabled**.").send()
         else:
-            status = "enabled" if debug_mode else "disabled"
-            await cl.Message(content=f"🔍 Debug mode is currently **{status}**.").send()
+            await cl.Message(content="⚠️ Use `/debug on` or `/debug off`").send()
+    else:
+        status = "enabled" if debug_mode else "disabled"
+        await cl.Message(content=f"🔍 Debug mode is currently **{status}**.").send()
+
+
+async def _cmd_stats(args: str, orchestrator: ChatOrchestrator, debug_mode: bool):
+    """Show query statistics and knowledge graph info."""
+    history = cl.user_session.get("query_history") or ()
+    total_queries = len(history)
+    failed_queries = sum(1 for _, _, success, _ in history if not success)
+    total_time = sum(execution_time_ms for _, _, _, execution_time_ms in history)
+    average_time = total_time / total_queries if total_queries else 0.0
     
-    elif cmd == "/stats":
-        stats = orchestrator.get_statistics()
-        
-        history_stats = f"""### 📊 Query Statistics
+    kg_stats = orchestrator.knowledge_graph.get_stats()
+    
+    history_stats = f"""### 📊 Query Statistics
 
 **Query History:**
-- Total Queries: {stats['total_queries']}
-- Failed: {stats['failed_queries']}
-- Average Execution Time: {stats['average_execution_time_ms']:.2f}ms
+- Total Queries: {total_queries}
+- Failed: {failed_queries}
+- Average Execution Time: {average_time:.2f}ms
 
 **Knowledge Graph:**
-- Total Concepts: {stats['knowledge_graph']['total_concepts']}
-- Total Customers: {stats['knowledge_graph']['total_customers']}
-- Total Mappings: {stats['knowledge_graph']['total_mappings']}
-- Total Transformations: {stats['knowledge_graph']['total_transformations']}
+- Total Concepts: {kg_stats['total_concepts']}
+- Total Customers: {kg_stats['total_customers']}
+- Total Mappings: {kg_stats['total_mappings']}
+- Total Transformations: {kg_stats['total_transformations']}
 """
-        await cl.Message(content=history_stats).send()
+    await cl.Message(content=history_stats).send()
+
+
+async def _cmd_explain(args: str, orchestrator: ChatOrchestrator, debug_mode: bool):
+    """Explain how a query will be processed."""
+    if not args:
+        await cl.Message(content="⚠️ Usage: `/explain <your query>`").send()
+        return
     
-    elif cmd == "/explain":
-        if len(parts) > 1:
-            query = parts[1]
-            try:
-                explanation = orchestrator.explain_query(query)
-                
-                content = f"""### 📖 Query Explanation
+    query = args
+    try:
+        explanation = await cl.make_async(orchestrator.explain_query)(query)
+        
+        content = f"""### 📖 Query Explanation
 
 **Query:** "{query}"
 
@@ -636,61 +1158,99 @@ async def handle_command(command: str, orchestrator: ChatOrchestrator, debug_mod
 {list(explanation['sample_sql'].values())[0] if explanation['sample_sql'] else 'N/A'}
 ```
 """
-                await cl.Message(content=content).send()
-            except Exception as e:
-                await cl.Message(content=f"❌ Error explaining query: {str(e)}").send()
-        else:
-            await cl.Message(content="⚠️ Usage: `/explain <your query>`").send()
-    
-    elif cmd == "/select":
-        if len(parts) > 1:
-            selection = parts[1].lower()
-            if selection == "all":
-                cl.user_session.set("selected_customers", [])
-                await cl.Message(content="✅ Now querying **all customers**.").send()
-            else:
-                # Parse customer IDs (comma-separated)
-                customer_ids = [c.strip() for c in selection.split(",")]
-                available = orchestrator.list_available_customers()
-                
-                # Validate
-                invalid = [c for c in customer_ids if c not in available]
-                if invalid:
-                    await cl.Message(
-                        content=f"⚠️ Invalid customer IDs: {', '.join(invalid)}\n\n"
-                        f"Available: {', '.join(available)}"
-                    ).send()
-                else:
-                    cl.user_session.set("selected_customers", customer_ids)
-                    await cl.Message(
-                        content=f"✅ Now querying: **{', '.join(customer_ids)}**"
-                    ).send()
-        else:
-            selected = cl.user_session.get("selected_customers", [])
-            if selected:
-                await cl.Message(content=f"Currently querying: **{', '.join(selected)}**").send()
-            else:
-                await cl.Message(content="Currently querying: **all customers**").send()
-    
-    elif cmd == "/limit":
-        if len(parts) > 1:
-            try:
-                limit = int(parts[1])
-                if limit < 1:
-                    await cl.Message(content="⚠️ Limit must be at least 1.").send()
-                elif limit > 1000:
-                    await cl.Message(content="⚠️ Limit cannot exceed 1000 rows.").send()
-                else:
-                    cl.user_session.set("result_limit", limit)
-                    await cl.Message(content=f"✅ Result limit set to **{limit} rows**.").send()
-            except ValueError:
-                await cl.Message(content="⚠️ Invalid number. Use `/limit <number>`").send()
+        await cl.Message(content=content).send()
+    except Exception as e:
+        await cl.Message(content=f"❌ Error explaining query: {str(e)}").send()
+
+
+async def _cmd_select(args: str, orchestrator: ChatOrchestrator, debug_mode: bool):
+    """Show or change which customers are queried."""
+    if not args:
+        selected = cl.user_session.get("selected_customers", [])
+        if selected:
+            await cl.Message(content=f"Currently querying: **{', '.join(selected)}**").send()
         else:
-            current_limit = cl.user_session.get("result_limit", 10)
-            await cl.Message(content=f"Current result limit: **{current_limit} rows**").send()
+            await cl.Message(content="Currently querying: **all customers**").send()
+        return
+    
+    selection = args.lower()
+    if selection == "all":
+        cl.user_session.set("selected_customers", [])
+        await cl.Message(content="✅ Now querying **all customers**.").send()
+        return
+    
+    # Parse customer IDs (comma-separated)
+    customer_ids = [c.strip() for c in selection.split(",")]
+    available = cl.user_session.get("available_customers")
+    if available is None:
+        available = refresh_available_customers(orchestrator)
+    available_set = cl.user_session.get("available_customers_set")
+    
+    # Validate
+    invalid = [c for c in customer_ids if c not in available_set]
+    if invalid:
+        await cl.Message(
+            content=f"⚠️ Invalid customer IDs: {', '.join(invalid)}\n\n"
+            f"Available: {', '.join(available)}",
+            actions=[cl.Action(name="refresh_customers", payload={"action": "refresh"}, label="🔄 Refresh Customers")]
+        ).send()
+    else:
+        cl.user_session.set("selected_customers", customer_ids)
+        await cl.Message(
+            content=f"✅ Now querying: **{', '.join(customer_ids)}**"
+        ).send()
+
+
+async def _cmd_limit(args: str, orchestrator: ChatOrchestrator, debug_mode: bool):
+    """Show or change the number of rows displayed."""
+    if not args:
+        current_limit = cl.user_session.get("result_limit", 10)
+        await cl.Message(content=f"Current result limit: **{current_limit} rows**").send()
+        return
+    
+    try:
+        limit = int(args)
+    except ValueError:
+        await cl.Message(content="⚠️ Invalid number. Use `/limit <number>`").send()
+        return
     
+    if limit < 1:
+        await cl.Message(content="⚠️ Limit must be at least 1.").send()
+    elif limit > 1000:
+        await cl.Message(content="⚠️ Limit cannot exceed 1000 rows.").send()
     else:
+        cl.user_session.set("result_limit", limit)
+        await cl.Message(content=f"✅ Result limit set to **{limit} rows**.").send()
+
+
+COMMAND_HANDLERS: Dict[str, Callable[[str, ChatOrchestrator, bool], Awaitable[None]]] = {
+    "/help": _cmd_help,
+    "/customers": _cmd_customers,
+    "/debug": _cmd_debug,
+    "/stats": _cmd_stats,
+    "/explain": _cmd_explain,
+    "/select": _cmd_select,
+    "/limit": _cmd_limit,
+}
+
+
+async def handle_command(command: str, orchestrator: ChatOrchestrator, debug_mode: bool):
+    """Handle special commands.
+    
+    Args:
+        command: Command string
+        orchestrator: ChatOrchestrator instance
+        debug_mode: Current debug mode state
+    """
+    cmd, _, args = command.partition(" ")
+    cmd = cmd.lower()
+    
+    handler = COMMAND_HANDLERS.get(cmd)
+    if handler is None:
         await cl.Message(content=f"❓ Unknown command: `{cmd}`. Type `/help` for available commands.").send()
+        return
+    
+    await handler(args.strip(), orchestrator, debug_mode)
 
 
 if __name__ == "__main__":
@@ -11,8 +11,16 @@ Output:
     schema_translator_architecture_graphviz.png
 """
 
+import subprocess
+from pathlib import Path
+
 from graphviz import Digraph
 
+# One cylinder per customer database, all styled alike
+CUSTOMER_LETTERS = ('a', 'b', 'c', 'd', 'e', 'f')
+DB_NODE_STYLE = {'fillcolor': '#D5D5D5', 'shape': 'cylinder'}
+
+
 def create_architecture_diagram():
     """Create the Schema Translator architecture diagram using Graphviz."""
     
@@ -47,12 +55,8 @@ def create_architecture_diagram():
     # Customer Databases (same rank for parallel layout) - Light gray
     with dot.subgraph() as s:
         s.attr(rank='same')
-        s.node('db_a', 'Customer A\nDB', fillcolor='#D5D5D5', shape='cylinder')
-        s.node('db_b', 'Customer B\nDB', fillcolor='#D5D5D5', shape='cylinder')
-        s.node('db_c', 'Customer C\nDB', fillcolor='#D5D5D5', shape='cylinder')
-        s.node('db_d', 'Customer D\nDB', fillcolor='#D5D5D5', shape='cylinder')
-        s.node('db_e', 'Customer E\nDB', fillcolor='#D5D5D5', shape='cylinder')
-        s.node('db_f', 'Customer F\nDB', fillcolor='#D5D5D5', shape='cylinder')
+        for letter in CUSTOMER_LETTERS:
+            s.node(f'db_{letter}', f'Customer {letter.upper()}\nDB', **DB_NODE_STYLE)
     
     # Forward Flow (Query Path) - Black arrows
     dot.edge('ui', 'orchestrator', label='1. User Query')
@@ -63,12 +67,8 @@ def create_architecture_diagram():
     dot.edge('compiler', 'executor', label='6. Generate SQL')
     
     # Parallel execution to all databases
-    dot.edge('executor', 'db_a')
-    dot.edge('executor', 'db_b')
-    dot.edge('executor', 'db_c')
-    dot.edge('executor', 'db_d')
-    dot.edge('executor', 'db_e')
-    dot.edge('executor', 'db_f')
+    for letter in CUSTOMER_LETTERS:
+        dot.edge('executor', f'db_{letter}')
     
     # Backward Flow (Results Path) - Black arrows
     dot.edge('executor', 'harmonizer', label='7. Raw Results')
@@ -78,18 +78,40 @@ def create_architecture_diagram():
     return dot
 
 
+def is_render_current(output_file, source):
+    """Check whether the PNG on disk was rendered from this DOT source.
+    
+    The DOT source saved next to the PNG records what it was rendered
+    from, so an identical source means rendering again would change nothing.
+    """
+    dot_path = Path(f'{output_file}.dot')
+    return (
+        Path(f'{output_file}.png').exists()
+        and dot_path.exists()
+        and dot_path.read_text(encoding='utf-8') == source
+    )
+
+
 def main():
     """Generate and save the diagram."""
     dot = create_architecture_diagram()
-    
-    # Save as PNG
     output_file = 'schema_translator_architecture_graphviz'
-    dot.render(output_file, format='png', cleanup=True)
+    
+    # The diagram is static; skip the `dot` subprocess when nothing changed
+    if is_render_current(output_file, dot.source):
+        print(f"✓ Architecture diagram up to date: {output_file}.png")
+        return
+    
+    # Render from the in-memory source; the DOT file is written only once the
+    # PNG exists, so it always describes what is on disk
+    subprocess.run(
+        ['dot', '-Tpng', '-o', f'{output_file}.png'],
+        input=dot.source.encode('utf-8'),
+        check=True,
+    )
     print(f"✓ Architecture diagram generated: {output_file}.png")
     
-    # Also save the DOT source
-    with open(f'{output_file}.dot', 'w') as f:
-        f.write(dot.source)
+    Path(f'{output_file}.dot').write_text(dot.source, encoding='utf-8')
     print(f"✓ DOT source saved: {output_file}.dot")
 
 
@@ -1,397 +1,107 @@
 """Initialize the knowledge graph with all customer mappings."""
 
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
 from schema_translator.knowledge_graph import SchemaKnowledgeGraph
-from schema_translator.models import SemanticType
 
 
-def initialize_knowledge_graph() -> SchemaKnowledgeGraph:
+# Concepts, per-customer column mappings and transformation rules. Kept as
+# data so building the graph is a parse plus a few bulk calls.
+#
+# NOTE: industry_sector and customer_name concepts were removed.
+# - customer_name: Refers to company names in contracts (e.g., "Global Tech Inc")
+#   which conflicts with database selection (customer_a, customer_b, etc.)
+# - industry_sector: Internal attribute that doesn't represent typical
+#   business queries users would make.
+MAPPINGS_PATH = Path(__file__).parent / "schema_translator" / "data" / "mappings.json"
+
+
+def load_mapping_data(path: Path = MAPPINGS_PATH) -> Dict[str, List[Dict[str, Any]]]:
+    """Load the knowledge graph definition.
+    
+    Args:
+        path: JSON file with "concepts", "mappings" and "transformations" lists
+        
+    Returns:
+        Parsed definition
+    """
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def initialize_knowledge_graph(verbose: bool = False) -> SchemaKnowledgeGraph:
     """Initialize and populate the knowledge graph with all mappings.
     
+    Progress messages are collected and written to stdout in one go at the
+    end, and only when verbose, so library callers pay no console I/O.
+    
+    Args:
+        verbose: Print a progress report once the graph is built
+        
     Returns:
         Populated SchemaKnowledgeGraph instance
     """
+    data = load_mapping_data()
     kg = SchemaKnowledgeGraph()
+    log = []
     
-    print("🔧 Initializing Knowledge Graph...\n")
-    
-    # ========================================================================
-    # 1. CONTRACT IDENTIFIER
-    # ========================================================================
-    print("  Adding concept: contract_identifier")
-    kg.add_concept(
-        concept_id="contract_identifier",
-        concept_name="Contract Identifier",
-        description="Unique identifier for a contract",
-        aliases=["contract_id", "id", "contract_name", "name"]
-    )
-    
-    kg.add_customer_mapping(
-        concept_id="contract_identifier",
-        customer_id="customer_a",
-        table_name="contracts",
-        column_name="contract_id",
-        data_type="INTEGER",
-        semantic_type=SemanticType.INTEGER
-    )
-    
-    kg.add_customer_mapping(
-        concept_id="contract_identifier",
-        customer_id="customer_b",
-        table_name="contract_headers",
-        column_name="id",
-        data_type="INTEGER",
-        semantic_type=SemanticType.INTEGER
-    )
-    
-    kg.add_customer_mapping(
-        concept_id="contract_identifier",
-        customer_id="customer_c",
-        table_name="contracts",
-        column_name="id",
-        data_type="INTEGER",
-        semantic_type=SemanticType.INTEGER
-    )
-    
-    kg.add_customer_mapping(
-        concept_id="contract_identifier",
-        customer_id="customer_d",
-        table_name="contracts",
-        column_name="contract_id",
-        data_type="INTEGER",
-        semantic_type=SemanticType.INTEGER
-    )
-    
-    kg.add_customer_mapping(
-        concept_id="contract_identifier",
-        customer_id="customer_e",
-        table_name="contracts",
-        column_name="contract_id",
-        data_type="INTEGER",
-        semantic_type=SemanticType.INTEGER
-    )
-    
-    kg.add_customer_mapping(
-        concept_id="contract_identifier",
-        customer_id="customer_f",
-        table_name="contracts",
-        column_name="contract_id",
-        data_type="INTEGER",
-        semantic_type=SemanticType.INTEGER
-    )
-    
-    # ========================================================================
-    # 2. CONTRACT EXPIRATION
-    # ========================================================================
-    print("  Adding concept: contract_expiration")
-    kg.add_concept(
-        concept_id="contract_expiration",
-        concept_name="Contract Expiration",
-        description="When the contract expires or is due for renewal",
-        aliases=["expiry", "expiration", "renewal_date", "end_date"]
-    )
-    
-    kg.add_customer_mapping(
-        concept_id="contract_expiration",
-        customer_id="customer_a",
-        table_name="contracts",
-        column_name="expiry_date",
-        data_type="TEXT",
-        semantic_type=SemanticType.DATE
-    )
-    
-    kg.add_customer_mapping(
-        concept_id="contract_expiration",
-        customer_id="customer_b",
-        table_name="renewal_schedule",
-        column_name="renewal_date",
-        data_type="TEXT",
-        semantic_type=SemanticType.DATE,
-        join_requirements=["contract_headers"]
-    )
-    
-    kg.add_customer_mapping(
-        concept_id="contract_expiration",
-        customer_id="customer_c",
-        table_name="contracts",
-        column_name="expiration_date",
-        data_type="TEXT",
-        semantic_type=SemanticType.DATE
-    )
-    
-    kg.add_customer_mapping(
-        concept_id="contract_expiration",
-        customer_id="customer_d",
-        table_name="contracts",
-        column_name="days_remaining",
-        data_type="INTEGER",
-        semantic_type=SemanticType.DAYS_REMAINING,
-        transformation="DATE(CURRENT_DATE, '+' || days_remaining || ' days')"
-    )
-    
-    kg.add_customer_mapping(
-        concept_id="contract_expiration",
-        customer_id="customer_e",
-        table_name="contracts",
-        column_name="expiry_date",
-        data_type="TEXT",
-        semantic_type=SemanticType.DATE
-    )
-    
-    kg.add_customer_mapping(
-        concept_id="contract_expiration",
-        customer_id="customer_f",
-        table_name="contracts",
-        column_name="expiration_date",
-        data_type="TEXT",
-        semantic_type=SemanticType.DATE
-    )
-    
-    # ========================================================================
-    # 3. CONTRACT VALUE
-    # ========================================================================
-    print("  Adding concept: contract_value")
-    kg.add_concept(
-        concept_id="contract_value",
-        concept_name="Contract Value",
-        description="Monetary value of the contract",
-        aliases=["value", "amount", "total_value", "contract_amount"]
-    )
-    
-    kg.add_customer_mapping(
-        concept_id="contract_value",
-        customer_id="customer_a",
-        table_name="contracts",
-        column_name="contract_value",
-        data_type="INTEGER",
-        semantic_type=SemanticType.LIFETIME_TOTAL
-    )
-    
-    kg.add_customer_mapping(
-        concept_id="contract_value",
-        customer_id="customer_b",
-        table_name="contract_headers",
-        column_name="contract_value",
-        data_type="INTEGER",
-        semantic_type=SemanticType.LIFETIME_TOTAL
-    )
-    
-    kg.add_customer_mapping(
-        concept_id="contract_value",
-        customer_id="customer_c",
-        table_name="contracts",
-        column_name="total_value",
-        data_type="INTEGER",
-        semantic_type=SemanticType.LIFETIME_TOTAL
-    )
+    log.append("🔧 Initializing Knowledge Graph...\n")
     
-    kg.add_customer_mapping(
-        concept_id="contract_value",
-        customer_id="customer_d",
-        table_name="contracts",
-        column_name="contract_value",
-        data_type="INTEGER",
-        semantic_type=SemanticType.LIFETIME_TOTAL
-    )
+    for concept in data["concepts"]:
+        log.append(f"  Adding concept: {concept['concept_id']}")
+        kg.add_concept(**concept)
     
-    kg.add_customer_mapping(
-        concept_id="contract_value",
-        customer_id="customer_e",
-        table_name="contracts",
-        column_name="contract_value",
-        data_type="INTEGER",
-        semantic_type=SemanticType.LIFETIME_TOTAL
-    )
+    log.append("\n  Adding customer mappings...")
+    kg.add_customer_mappings(data["mappings"])
     
-    kg.add_customer_mapping(
-        concept_id="contract_value",
-        customer_id="customer_f",
-        table_name="contracts",
-        column_name="contract_value",
-        data_type="INTEGER",
-        semantic_type=SemanticType.ANNUAL_RECURRING_REVENUE,
-        transformation="(contract_value * term_years)"
-    )
+    log.append("\n  Adding transformation rules...")
+    for rule in data["transformations"]:
+        kg.add_transformation(**rule)
     
-    # ========================================================================
-    # 4. CONTRACT STATUS
-    # ========================================================================
-    print("  Adding concept: contract_status")
-    kg.add_concept(
-        concept_id="contract_status",
-        concept_name="Contract Status",
-        description="Current status of the contract (active, inactive, expired, etc.)",
-        aliases=["status", "current_status", "state"]
-    )
+    log.append("\n✅ Knowledge graph initialized successfully!")
     
-    kg.add_customer_mapping(
-        concept_id="contract_status",
-        customer_id="customer_a",
-        table_name="contracts",
-        column_name="status",
-        data_type="TEXT",
-        semantic_type=SemanticType.TEXT
-    )
+    if verbose:
+        sys.stdout.write("\n".join(log) + "\n")
     
-    kg.add_customer_mapping(
-        concept_id="contract_status",
-        customer_id="customer_b",
-        table_name="contract_status_history",
-        column_name="status",
-        data_type="TEXT",
-        semantic_type=SemanticType.TEXT,
-        join_requirements=["contract_headers"],
-        transformation="(SELECT status FROM contract_status_history WHERE contract_id = id ORDER BY status_date DESC LIMIT 1)"
-    )
-    
-    kg.add_customer_mapping(
-        concept_id="contract_status",
-        customer_id="customer_c",
-        table_name="contracts",
-        column_name="current_status",
-        data_type="TEXT",
-        semantic_type=SemanticType.TEXT
-    )
-    
-    kg.add_customer_mapping(
-        concept_id="contract_status",
-        customer_id="customer_d",
-        table_name="contracts",
-        column_name="status",
-        data_type="TEXT",
-        semantic_type=SemanticType.TEXT
-    )
-    
-    kg.add_customer_mapping(
-        concept_id="contract_status",
-        customer_id="customer_e",
-        table_name="contracts",
-        column_name="status",
-        data_type="TEXT",
-        semantic_type=SemanticType.TEXT
-    )
-    
-    kg.add_customer_mapping(
-        concept_id="contract_status",
-        customer_id="customer_f",
-        table_name="contracts",
-        column_name="status",
-        data_type="TEXT",
-        semantic_type=SemanticType.TEXT
-    )
-    
-    # ========================================================================
-    # 5. CONTRACT START
-    # ========================================================================
-    # NOTE: industry_sector and customer_name concepts were removed.
-    # - customer_name: Refers to company names in contracts (e.g., "Global Tech Inc")
-    #   which conflicts with database selection (customer_a, customer_b, etc.)
-    # - industry_sector: Internal attribute that doesn't represent typical
-    #   business queries users would make.
-    # ========================================================================
-    print("  Adding concept: contract_start")
-    kg.add_concept(
-        concept_id="contract_start",
-        concept_name="Contract Start Date",
-        description="When the contract began or was signed",
-        aliases=["start_date", "inception_date", "begin_date", "effective_date"]
-    )
-    
-    kg.add_customer_mapping(
-        concept_id="contract_start",
-        customer_id="customer_a",
-        table_name="contracts",
-        column_name="start_date",
-        data_type="TEXT",
-        semantic_type=SemanticType.DATE
-    )
-    
-    kg.add_customer_mapping(
-        concept_id="contract_start",
-        customer_id="customer_b",
-        table_name="contract_headers",
-        column_name="start_date",
-        data_type="TEXT",
-        semantic_type=SemanticType.DATE
-    )
-    
-    kg.add_customer_mapping(
-        concept_id="contract_start",
-        customer_id="customer_c",
-        table_name="contracts",
-        column_name="inception_date",
-        data_type="TEXT",
-        semantic_type=SemanticType.DATE
-    )
-    
-    kg.add_customer_mapping(
-        concept_id="contract_start",
-        customer_id="customer_d",
-        table_name="contracts",
-        column_name="start_date",
-        data_type="TEXT",
-        semantic_type=SemanticType.DATE
-    )
-    
-    kg.add_customer_mapping(
-        concept_id="contract_start",
-        customer_id="customer_e",
-        table_name="contracts",
-        column_name="start_date",
-        data_type="TEXT",
-        semantic_type=SemanticType.DATE
-    )
-    
-    kg.add_customer_mapping(
-        concept_id="contract_start",
-        customer_id="customer_f",
-        table_name="contracts",
-        column_name="start_date",
-        data_type="TEXT",
-        semantic_type=SemanticType.DATE
-    )
-    
-    # ========================================================================
-    # TRANSFORMATION RULES
-    # ========================================================================
-    print("\n  Adding transformation rules...")
-    
-    # Days remaining to date
-    kg.add_transformation(
-        from_type="days_remaining",
-        to_type="date",
-        transformation_sql="DATE(CURRENT_DATE, '+' || {column} || ' days')"
-    )
-    
-    # Date to days remaining
-    kg.add_transformation(
-        from_type="date",
-        to_type="days_remaining",
-        transformation_sql="CAST((JULIANDAY({column}) - JULIANDAY(CURRENT_DATE)) AS INTEGER)"
-    )
-    
-    # Annual to lifetime
-    kg.add_transformation(
-        from_type="annual",
-        to_type="lifetime",
-        transformation_sql="({column} * {term_years_column})"
-    )
-    
-    # Lifetime to annual
-    kg.add_transformation(
-        from_type="lifetime",
-        to_type="annual",
-        transformation_sql="({column} / {term_years_column})"
-    )
+    return kg
+
+
+def is_saved_graph_current(path: Path) -> bool:
+    """Check whether a saved knowledge graph is newer than this script.
     
-    print("\n✅ Knowledge graph initialized successfully!")
+    A graph saved after the last edit to this script and its mapping data
+    already holds everything initialize_knowledge_graph() would build.
     
-    return kg
+    Args:
+        path: Location of the saved knowledge graph
+        
+    Returns:
+        True if the saved graph can be reused as-is
+    """
+    path = Path(path)
+    if not path.exists():
+        return False
+    sources = (Path(__file__), MAPPINGS_PATH)
+    return path.stat().st_mtime > max(source.stat().st_mtime for source in sources)
 
 
-def main():
-    """Main entry point for initializing the knowledge graph."""
+def main(force: bool = False):
+    """Main entry point for initializing the knowledge graph.
+    
+    Args:
+        force: Rebuild even if the saved graph is already up to date
+    """
+    kg = SchemaKnowledgeGraph()
+    if not force and is_saved_graph_current(kg.config.knowledge_graph_path):
+        kg.load()
+        print(f"✓ Knowledge graph is up to date: {kg.config.knowledge_graph_path}")
+        print("  (run with --force to rebuild)")
+        return
+    
     # Initialize
-    kg = initialize_knowledge_graph()
+    kg = initialize_knowledge_graph(verbose=True)
     
     # Validate
     print("\n🔍 Validating knowledge graph...")
@@ -428,4 +138,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    main(force="--force" in sys.argv[1:])
@@ -2,7 +2,30 @@
 LLM-powered agents for query understanding and schema analysis.
 """
 
-from .query_understanding import QueryUnderstandingAgent
-from .schema_analyzer import SchemaAnalyzerAgent
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .query_understanding import QueryUnderstandingAgent
+    from .schema_analyzer import SchemaAnalyzerAgent
 
 __all__ = ["QueryUnderstandingAgent", "SchemaAnalyzerAgent"]
+
+# Agents are imported on first access (PEP 562) so importing one does not
+# pay for the other's dependencies
+_AGENT_MODULES = {
+    "QueryUnderstandingAgent": ".query_understanding",
+    "SchemaAnalyzerAgent": ".schema_analyzer",
+}
+
+
+def __getattr__(name):
+    if name not in _AGENT_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    agent = getattr(import_module(_AGENT_MODULES[name], __name__), name)
+    globals()[name] = agent
+    return agent
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
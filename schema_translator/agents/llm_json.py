@@ -0,0 +1,118 @@
+"""
+Helpers for reading JSON out of LLM replies.
+"""
+
+import json
+import re
+from typing import Any, Dict, List
+
+try:  # optional accelerator; its JSONDecodeError subclasses json's
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# Any markdown fence line: ```, ```json, ```JSON, ...
+_FENCE_RE = re.compile(r"^```.*\n?", re.MULTILINE)
+
+
+def strip_code_fence(response_text: str) -> str:
+    """
+    Remove a markdown code fence wrapped around a JSON reply.
+
+    Args:
+        response_text: Raw text of the model's reply
+
+    Returns:
+        The reply with fence lines removed and surrounding whitespace trimmed
+    """
+    return _FENCE_RE.sub("", response_text).strip()
+
+
+def loads_reply(response_text: str) -> Any:
+    """
+    Parse the JSON payload of a model reply.
+
+    Uses orjson when it is installed and the standard library otherwise.
+
+    Args:
+        response_text: Raw text of the model's reply
+
+    Returns:
+        Decoded JSON value
+
+    Raises:
+        json.JSONDecodeError: If the reply is not valid JSON
+    """
+    return _loads(strip_code_fence(response_text))
+
+
+def tool_request(tool: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build messages.create arguments that force the model to call one tool.
+
+    The reply then carries the tool's input as an already-decoded object,
+    so no text has to be parsed.
+
+    Args:
+        tool: Tool definition with name, description and input_schema
+
+    Returns:
+        The tools and tool_choice arguments
+    """
+    return {
+        "tools": [tool],
+        "tool_choice": {"type": "tool", "name": tool["name"]},
+    }
+
+
+def reply_payload(message: Any) -> Any:
+    """
+    Extract the structured payload of a model reply.
+
+    Args:
+        message: Response from messages.create
+
+    Returns:
+        The input of the first tool_use block, or the decoded JSON text of
+        the reply when it has no tool call
+
+    Raises:
+        json.JSONDecodeError: If the reply is text that is not valid JSON
+    """
+    for block in message.content:
+        if getattr(block, "type", None) == "tool_use":
+            return block.input
+    return loads_reply(message.content[0].text)
+
+
+def retry_turns(message: Any, feedback: str) -> List[Dict[str, Any]]:
+    """
+    Build the conversation turns that ask the model to fix a failed reply.
+
+    The failed reply is echoed back as the assistant turn and the feedback
+    follows as a user turn (as a tool_result when the reply was a tool
+    call), so the original request is resent unchanged.
+
+    Args:
+        message: The failed response from messages.create
+        feedback: What was wrong with the reply
+
+    Returns:
+        Assistant and user turns to append to the messages list
+    """
+    tool_calls = [
+        block for block in message.content if getattr(block, "type", None) == "tool_use"
+    ]
+    if tool_calls:
+        content: Any = [
+            {"type": "tool_result", "tool_use_id": block.id, "content": feedback, "is_error": True}
+            for block in tool_calls
+        ]
+    else:
+        content = feedback
+    return [
+        {"role": "assistant", "content": message.content},
+        {"role": "user", "content": content},
+    ]
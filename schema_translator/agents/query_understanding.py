@@ -2,18 +2,181 @@
 Query Understanding Agent: Parse natural language queries into semantic query plans.
 """
 
+import asyncio
 import json
-from typing import Optional
-from anthropic import Anthropic
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+from anthropic import Anthropic, AsyncAnthropic
 from ..models import (
     SemanticQueryPlan,
-    QueryFilter,
     SemanticType,
     QueryOperator,
     QueryIntent,
 )
 from ..knowledge_graph import SchemaKnowledgeGraph
 from ..config import Config
+from .llm_json import reply_payload, retry_turns, tool_request
+from .response_cache import ResponseCache, normalize_query
+
+
+# Few-shot examples, sent after the system prompt as a cached block
+_QUERY_EXAMPLES = """Examples:
+
+Query: "Show me all contracts" or "List all contracts"
+Result:
+{
+    "intent": "find_contracts",
+    "filters": [],
+    "projections": [],  // Empty projections means return ALL available fields
+    "limit": 100,
+    "target_customers": null  // null means query all customers
+}
+
+Query: "Show me all active contracts"
+Result:
+{
+    "intent": "find_contracts",
+    "filters": [
+        {
+            "concept": "contract_status",
+            "operator": "equals",
+            "value": "active"
+        }
+    ],
+    "projections": [],  // Empty projections means return ALL available fields
+    "limit": 100,
+    "target_customers": null
+}
+
+Query: "Show contracts from customer_a" or "Query customer A database"
+Result:
+{
+    "intent": "find_contracts",
+    "filters": [],
+    "projections": [],
+    "limit": 100,
+    "target_customers": ["customer_a"]  // Extract database reference
+}
+
+Query: "How many contracts expire in the next 90 days?"
+Result:
+{
+    "intent": "count_contracts",
+    "filters": [
+        {
+            "concept": "contract_expiration",
+            "operator": "between",
+            "value": ["TODAY", "TODAY+90"]
+        }
+    ],
+    "aggregations": [{
+        "function": "count",
+        "concept": "contract_identifier"
+    }]
+}
+
+Query: "Find contracts worth more than 2 million dollars"
+Result:
+{
+    "intent": "find_contracts",
+    "filters": [
+        {
+            "concept": "contract_value",
+            "operator": "greater_than",
+            "value": 2000000
+        }
+    ],
+    "projections": ["contract_identifier", "contract_value", "contract_status"]
+}
+
+Query: "List contracts expiring in 2026"
+Result:
+{
+    "intent": "find_contracts",
+    "filters": [
+        {
+            "concept": "contract_expiration",
+            "operator": "between",
+            "value": ["2026-01-01", "2026-12-31"]
+        }
+    ],
+    "projections": ["contract_identifier", "contract_expiration", "contract_value"],
+    "limit": 50
+}
+
+Query: "Show me contracts from customer A" or "List customer_a contracts"
+Result:
+{
+    "intent": "find_contracts",
+    "filters": [],
+    "projections": [],
+    "target_customers": ["customer_a"]
+}
+
+Query: "Show active contracts for customer B and customer C"
+Result:
+{
+    "intent": "find_contracts",
+    "filters": [
+        {
+            "concept": "contract_status",
+            "operator": "equals",
+            "value": "active"
+        }
+    ],
+    "projections": [],
+    "target_customers": ["customer_b", "customer_c"]
+}
+
+CRITICAL: When user mentions specific customers (e.g., "customer A", "customer_a", "from customer B"):
+- Use "target_customers" field with list of customer IDs: ["customer_a", "customer_b", etc.]
+- Do NOT create a filter for customer names
+- Customer IDs should be lowercase: customer_a, customer_b, customer_c, customer_d, customer_e, customer_f"""
+
+# Tools the model is forced to call, so plans come back as structured input
+# instead of JSON text
+_PLAN_SCHEMA = SemanticQueryPlan.model_json_schema()
+_PLAN_TOOL = {
+    "name": "emit_plan",
+    "description": "Return the semantic query plan for the query.",
+    "input_schema": _PLAN_SCHEMA,
+}
+_PLANS_TOOL = {
+    "name": "emit_plans",
+    "description": "Return one semantic query plan per query, in order.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "plans": {
+                "type": "array",
+                "items": {k: v for k, v in _PLAN_SCHEMA.items() if k != "$defs"},
+            },
+        },
+        "required": ["plans"],
+        "$defs": _PLAN_SCHEMA.get("$defs", {}),
+    },
+}
+
+# Wording used by explain_query_plan
+_INTENT_DESC = {
+    QueryIntent.FIND_CONTRACTS: "Find contracts",
+    QueryIntent.COUNT_CONTRACTS: "Count contracts",
+    QueryIntent.AGGREGATE_VALUES: "Calculate statistics for contracts",
+    QueryIntent.COMPARE_CUSTOMERS: "Compare customers",
+    QueryIntent.GROUP_BY: "Group contracts",
+}
+_OP_DESC = {
+    QueryOperator.EQUALS: "equals",
+    QueryOperator.NOT_EQUALS: "does not equal",
+    QueryOperator.GREATER_THAN: "greater than",
+    QueryOperator.LESS_THAN: "less than",
+    QueryOperator.GREATER_THAN_OR_EQUAL: "at least",
+    QueryOperator.LESS_THAN_OR_EQUAL: "at most",
+    QueryOperator.CONTAINS: "contains",
+    QueryOperator.IN: "is one of",
+    QueryOperator.BETWEEN: "between",
+}
+_UNDERSCORE_TO_SPACE = str.maketrans("_", " ")
 
 
 class QueryUnderstandingAgent:
@@ -26,7 +189,9 @@ class QueryUnderstandingAgent:
         self, 
         anthropic_api_key: str, 
         knowledge_graph: SchemaKnowledgeGraph,
-        config: Optional[Config] = None
+        config: Optional[Config] = None,
+        client: Optional[Anthropic] = None,
+        async_client: Optional[AsyncAnthropic] = None
     ):
         """
         Initialize the query understanding agent.
@@ -35,22 +200,39 @@ class QueryUnderstandingAgent:
             anthropic_api_key: API key for Anthropic Claude
             knowledge_graph: Schema knowledge graph for semantic concepts
             config: Configuration object (creates new if None)
+            client: Existing Anthropic client to share (creates new if None)
+            async_client: Existing AsyncAnthropic client to share (creates
+                new if None)
         """
-        self.client = Anthropic(api_key=anthropic_api_key)
+        self.client = client or Anthropic(api_key=anthropic_api_key)
+        self.async_client = async_client or AsyncAnthropic(api_key=anthropic_api_key)
         self.kg = knowledge_graph
         self.config = config or Config()
-        self.model = self.config.model_name
-        self.max_tokens = self.config.max_tokens
+        self.model = self.config.query_understanding_model
+        self.max_tokens = self.config.max_output_tokens_query
         self.temperature = self.config.temperature
+        self._plan_cache = ResponseCache()
+        self._system_prompt = ""
+        self._system_prompt_key = None
 
     def _build_system_prompt(self) -> str:
+        """Return the system prompt, rebuilding it only when its inputs change.
+
+        The prompt depends on the knowledge graph's concepts and today's date.
+        """
+        today = date.today()
+        prompt_key = (self.kg.concepts_version, today)
+        if prompt_key != self._system_prompt_key:
+            self._system_prompt = self._render_system_prompt(today)
+            self._system_prompt_key = prompt_key
+        return self._system_prompt
+
+    def _render_system_prompt(self, today: date) -> str:
         """Build the system prompt with available semantic concepts."""
-        concepts = list(self.kg.concepts.keys())
-        concept_list = "\n".join([f"- {concept}" for concept in concepts])
+        concept_list = self.kg.concept_list_text()
 
-        from datetime import datetime
-        current_date = datetime.now().strftime("%Y-%m-%d")
-        current_year = datetime.now().year
+        current_date = today.strftime("%Y-%m-%d")
+        current_year = today.year
         
         return f"""You are a semantic query understanding assistant. Your job is to parse natural language queries about contracts into structured semantic query plans.
 
@@ -133,125 +315,158 @@ IMPORTANT:
 - Only specify projections when user explicitly asks for specific fields"""
 
     def _build_user_prompt(self, natural_language_query: str) -> str:
-        """Build the user prompt with examples."""
-        return f"""Parse this natural language query into a semantic query plan:
+        """Build the user prompt (the examples live in the system prompt)."""
+        return (
+            f'Parse this natural language query into a semantic query plan:\n\n"{natural_language_query}"\n\n'
+            "Return ONLY the JSON object."
+        )
 
-"{natural_language_query}"
+    def _validate_plan_concepts(self, query_plan: SemanticQueryPlan) -> None:
+        """
+        Check that every concept a plan references exists in the knowledge graph.
 
-Examples:
+        Args:
+            query_plan: Plan to check
 
-Query: "Show me all contracts" or "List all contracts"
-Result:
-{{
-    "intent": "find_contracts",
-    "filters": [],
-    "projections": [],  // Empty projections means return ALL available fields
-    "limit": 100,
-    "target_customers": null  // null means query all customers
-}}
+        Raises:
+            ValueError: If the plan references an unknown concept
+        """
+        # Extract concepts from filters and projections
+        all_concepts = set()
+        for f in query_plan.filters:
+            all_concepts.add(f.concept)
+        if query_plan.projections:
+            all_concepts.update(query_plan.projections)
+        if query_plan.aggregations:
+            for agg in query_plan.aggregations:
+                all_concepts.add(agg.concept)
+        
+        for concept in all_concepts:
+            if concept not in self.kg.concepts:
+                raise ValueError(
+                    f"Unknown semantic concept: {concept}. "
+                    f"Available concepts: {list(self.kg.concepts.keys())}"
+                )
 
-Query: "Show me all active contracts"
-Result:
-{{
-    "intent": "find_contracts",
-    "filters": [
-        {{
-            "concept": "contract_status",
-            "operator": "equals",
-            "value": "active"
-        }}
-    ],
-    "projections": [],  // Empty projections means return ALL available fields
-    "limit": 100,
-    "target_customers": null
-}}
+    def _lookup_cached_plan(
+        self, system_prompt: str, natural_language_query: str
+    ) -> Tuple[Optional[SemanticQueryPlan], str]:
+        """
+        Look a query up in the exact-match plan cache.
 
-Query: "Show contracts from customer_a" or "Query customer A database"
-Result:
-{{
-    "intent": "find_contracts",
-    "filters": [],
-    "projections": [],
-    "limit": 100,
-    "target_customers": ["customer_a"]  // Extract database reference
-}}
+        Args:
+            system_prompt: System prompt the query would be sent with
+            natural_language_query: The user's natural language query
 
-Query: "How many contracts expire in the next 90 days?"
-Result:
-{{
-    "intent": "count_contracts",
-    "filters": [
-        {{
-            "concept": "contract_expiration",
-            "operator": "between",
-            "value": ["TODAY", "TODAY+90"]
-        }}
-    ],
-    "aggregations": [{{
-        "function": "count",
-        "concept": "contract_identifier"
-    }}]
-}}
+        Returns:
+            Tuple of (cached plan or None, cache key to pass to _store_plan)
+        """
+        # Repeat queries skip the API call
+        cache_key = ResponseCache.make_key(
+            model=self.model,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            system=system_prompt,
+            query=normalize_query(natural_language_query),
+        )
+        return self._plan_cache.get(cache_key), cache_key
+
+    def _store_plan(self, cache_key: str, query_plan: SemanticQueryPlan) -> None:
+        """Remember a freshly parsed plan under the key from _lookup_cached_plan."""
+        self._plan_cache.put(cache_key, query_plan)
+
+    def _request_kwargs(
+        self,
+        system_prompt: str,
+        messages: List[Dict[str, Any]],
+        tool: Dict[str, Any] = _PLAN_TOOL,
+        max_tokens: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Build the messages.create arguments shared by the sync and async paths.
+
+        The system prompt and few-shot examples are sent as one cacheable
+        prefix, so Anthropic serves them from its prompt cache on calls made
+        within a few minutes of each other. The model must answer by calling
+        tool, which returns the plan(s) already decoded. max_tokens overrides
+        the per-plan output budget.
+        """
+        return {
+            "model": self.model,
+            "max_tokens": max_tokens or self.max_tokens,
+            "system": [
+                {"type": "text", "text": system_prompt},
+                {
+                    "type": "text",
+                    "text": _QUERY_EXAMPLES,
+                    "cache_control": {"type": "ephemeral"},
+                },
+            ],
+            "messages": messages,
+            "temperature": self.temperature,
+            **tool_request(tool),
+        }
 
-Query: "Find contracts worth more than 2 million dollars"
-Result:
-{{
-    "intent": "find_contracts",
-    "filters": [
-        {{
-            "concept": "contract_value",
-            "operator": "greater_than",
-            "value": 2000000
-        }}
-    ],
-    "projections": ["contract_identifier", "contract_value", "contract_status"]
-}}
+    def _parse_response(self, message: Any) -> SemanticQueryPlan:
+        """
+        Turn the model's reply into a validated SemanticQueryPlan.
 
-Query: "List contracts expiring in 2026"
-Result:
-{{
-    "intent": "find_contracts",
-    "filters": [
-        {{
-            "concept": "contract_expiration",
-            "operator": "between",
-            "value": ["2026-01-01", "2026-12-31"]
-        }}
-    ],
-    "projections": ["contract_identifier", "contract_expiration", "contract_value"],
-    "limit": 50
-}}
+        Args:
+            message: Response from messages.create
 
-Query: "Show me contracts from customer A" or "List customer_a contracts"
-Result:
-{{
-    "intent": "find_contracts",
-    "filters": [],
-    "projections": [],
-    "target_customers": ["customer_a"]
-}}
+        Returns:
+            SemanticQueryPlan object
 
-Query: "Show active contracts for customer B and customer C"
-Result:
-{{
-    "intent": "find_contracts",
-    "filters": [
-        {{
-            "concept": "contract_status",
-            "operator": "equals",
-            "value": "active"
-        }}
-    ],
-    "projections": [],
-    "target_customers": ["customer_b", "customer_c"]
-}}
+        Raises:
+            json.JSONDecodeError, KeyError, ValueError: If the reply is not a
+                valid plan over known concepts
+        """
+        return self._plan_from_dict(reply_payload(message))
 
-CRITICAL: When user mentions specific customers (e.g., "customer A", "customer_a", "from customer B"):
-- Use "target_customers" field with list of customer IDs: ["customer_a", "customer_b", etc.]
-- Do NOT create a filter for customer names
-- Customer IDs should be lowercase: customer_a, customer_b, customer_c, customer_d, customer_e, customer_f
+    def _plan_from_dict(self, plan_dict: Dict[str, Any]) -> SemanticQueryPlan:
+        """
+        Convert one parsed JSON plan into a validated SemanticQueryPlan.
+
+        Args:
+            plan_dict: Plan object decoded from the model's reply
+
+        Returns:
+            SemanticQueryPlan object
+
+        Raises:
+            ValueError: If the plan is malformed (a pydantic ValidationError)
+                or references unknown concepts
+        """
+        # Nested filters, enums and old-style aggregations are coerced by
+        # the model's validators
+        query_plan = SemanticQueryPlan.model_validate(plan_dict)
+
+        # Validate that all concepts exist in knowledge graph
+        self._validate_plan_concepts(query_plan)
+
+        return query_plan
+
+    @staticmethod
+    def _retry_messages(
+        messages: List[Dict[str, Any]],
+        message: Any,
+        error: Exception,
+        attempt: int,
+        max_retries: int,
+    ) -> List[Dict[str, Any]]:
+        """
+        Append the failed reply and error feedback for another attempt.
 
-Now parse the user's query and return ONLY the JSON object."""
+        Raises:
+            ValueError: If no attempts are left
+        """
+        if attempt < max_retries:
+            # Retry with error feedback
+            feedback = f"Previous attempt failed with error: {str(error)}\nPlease try again with valid JSON."
+            return messages + retry_turns(message, feedback)
+        raise ValueError(
+            f"Failed to parse query after {max_retries + 1} attempts. "
+            f"Last error: {str(error)}"
+        )
 
     def understand_query(
         self, natural_language_query: str, max_retries: int = 2
@@ -270,102 +485,169 @@ Now parse the user's query and return ONLY the JSON object."""
             ValueError: If unable to parse query after retries
         """
         system_prompt = self._build_system_prompt()
-        user_prompt = self._build_user_prompt(natural_language_query)
+        cached_plan, cache_key = self._lookup_cached_plan(system_prompt, natural_language_query)
+        if cached_plan is not None:
+            return cached_plan
+
+        messages = [{"role": "user", "content": self._build_user_prompt(natural_language_query)}]
 
         for attempt in range(max_retries + 1):
             try:
                 # Call Claude API
                 message = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=self.max_tokens,
-                    system=system_prompt,
-                    messages=[{"role": "user", "content": user_prompt}],
-                    temperature=self.temperature,
+                    **self._request_kwargs(system_prompt, messages)
                 )
+                query_plan = self._parse_response(message)
+                self._store_plan(cache_key, query_plan)
+                return query_plan
 
-                # Extract JSON from response
-                response_text = message.content[0].text.strip()
+            except (json.JSONDecodeError, KeyError, ValueError) as e:
+                messages = self._retry_messages(messages, message, e, attempt, max_retries)
 
-                # Handle markdown code blocks
-                if response_text.startswith("```"):
-                    # Remove markdown code fence
-                    lines = response_text.split("\n")
-                    response_text = "\n".join(
-                        line for line in lines if not line.startswith("```")
-                    )
+        raise ValueError("Unexpected error in query understanding")
 
-                # Parse JSON
-                plan_dict = json.loads(response_text)
-
-                # Convert to Pydantic model
-                # First, convert filter dicts to QueryFilter objects
-                if "filters" in plan_dict:
-                    filters = []
-                    for f in plan_dict["filters"]:
-                        filters.append(
-                            QueryFilter(
-                                concept=f["concept"],
-                                operator=QueryOperator(f["operator"]),
-                                value=f["value"],
-                            )
-                        )
-                    plan_dict["filters"] = filters
-
-                # Convert aggregations if present
-                if "aggregations" in plan_dict and plan_dict["aggregations"]:
-                    from ..models import QueryAggregation
-                    aggs = []
-                    for agg in plan_dict["aggregations"]:
-                        if isinstance(agg, str):
-                            # Old format: just function name
-                            aggs.append(QueryAggregation(
-                                function=agg,
-                                concept="contract_identifier"  # default
-                            ))
-                        else:
-                            # New format: {function, concept}
-                            aggs.append(QueryAggregation(**agg))
-                    plan_dict["aggregations"] = aggs
-
-                # Convert intent string to enum
-                plan_dict["intent"] = QueryIntent(plan_dict["intent"])
-
-                # Create SemanticQueryPlan
-                query_plan = SemanticQueryPlan(**plan_dict)
-
-                # Validate that all concepts exist in knowledge graph
-                # Extract concepts from filters and projections
-                all_concepts = set()
-                for f in query_plan.filters:
-                    all_concepts.add(f.concept)
-                if query_plan.projections:
-                    all_concepts.update(query_plan.projections)
-                if query_plan.aggregations:
-                    for agg in query_plan.aggregations:
-                        all_concepts.add(agg.concept)
-                
-                for concept in all_concepts:
-                    if concept not in self.kg.concepts:
+    def _build_batch_user_prompt(self, queries: List[str]) -> str:
+        """Build one user prompt asking for a plan per query, in order."""
+        numbered = "\n".join(f'{i}. "{query}"' for i, query in enumerate(queries, 1))
+        return (
+            f"Parse each of the following {len(queries)} natural language queries "
+            f"into a semantic query plan:\n\n{numbered}\n\n"
+            f"Return ONLY a JSON array of exactly {len(queries)} plan objects, "
+            "one per query, in the same order."
+        )
+
+    def understand_queries(
+        self, queries: List[str], max_retries: int = 2
+    ) -> List[SemanticQueryPlan]:
+        """
+        Parse many queries with as few API calls as possible.
+
+        Queries not already cached are sent config.max_batch_size at a time,
+        each group in a single request that returns an array of plans,
+        so the system prompt and examples are sent once per group rather
+        than once per query.
+
+        Args:
+            queries: Natural language queries
+            max_retries: Maximum number of retries per group on parsing errors
+
+        Returns:
+            One SemanticQueryPlan per query, in input order
+
+        Raises:
+            ValueError: If a group cannot be parsed after retries
+        """
+        system_prompt = self._build_system_prompt()
+        plans: List[Optional[SemanticQueryPlan]] = []
+        # Uncached queries: (position in output, query, cache key)
+        pending = []
+        for position, query in enumerate(queries):
+            cached_plan, cache_key = self._lookup_cached_plan(system_prompt, query)
+            plans.append(cached_plan)
+            if cached_plan is None:
+                pending.append((position, query, cache_key))
+
+        batch_size = self.config.max_batch_size
+        for start in range(0, len(pending), batch_size):
+            group = pending[start:start + batch_size]
+            messages = [{
+                "role": "user",
+                "content": self._build_batch_user_prompt([query for _, query, _ in group]),
+            }]
+
+            # Budget output per plan, up to the overall response ceiling
+            max_tokens = min(self.max_tokens * len(group), self.config.max_tokens)
+
+            for attempt in range(max_retries + 1):
+                try:
+                    message = self.client.messages.create(
+                        **self._request_kwargs(system_prompt, messages, _PLANS_TOOL, max_tokens)
+                    )
+                    plan_dicts = reply_payload(message)
+                    if isinstance(plan_dicts, dict):
+                        plan_dicts = plan_dicts.get("plans")
+                    if not isinstance(plan_dicts, list) or len(plan_dicts) != len(group):
                         raise ValueError(
-                            f"Unknown semantic concept: {concept}. "
-                            f"Available concepts: {list(self.kg.concepts.keys())}"
+                            f"Expected a JSON array of {len(group)} plans"
                         )
+                    group_plans = [self._plan_from_dict(d) for d in plan_dicts]
+                    break
 
+                except (json.JSONDecodeError, KeyError, ValueError) as e:
+                    messages = self._retry_messages(messages, message, e, attempt, max_retries)
+
+            for (position, _, cache_key), query_plan in zip(group, group_plans):
+                self._store_plan(cache_key, query_plan)
+                plans[position] = query_plan
+
+        return plans
+
+    async def understand_query_async(
+        self, natural_language_query: str, max_retries: int = 2
+    ) -> SemanticQueryPlan:
+        """
+        Parse a natural language query without blocking the event loop.
+
+        Same behaviour and caches as understand_query, but the API call is
+        awaited on the async client.
+
+        Args:
+            natural_language_query: The user's natural language query
+            max_retries: Maximum number of retries on parsing errors
+
+        Returns:
+            SemanticQueryPlan object
+
+        Raises:
+            ValueError: If unable to parse query after retries
+        """
+        system_prompt = self._build_system_prompt()
+        cached_plan, cache_key = self._lookup_cached_plan(system_prompt, natural_language_query)
+        if cached_plan is not None:
+            return cached_plan
+
+        messages = [{"role": "user", "content": self._build_user_prompt(natural_language_query)}]
+
+        for attempt in range(max_retries + 1):
+            try:
+                message = await self.async_client.messages.create(
+                    **self._request_kwargs(system_prompt, messages)
+                )
+                query_plan = self._parse_response(message)
+                self._store_plan(cache_key, query_plan)
                 return query_plan
 
             except (json.JSONDecodeError, KeyError, ValueError) as e:
-                if attempt < max_retries:
-                    # Retry with error feedback
-                    user_prompt += f"\n\nPrevious attempt failed with error: {str(e)}\nPlease try again with valid JSON."
-                    continue
-                else:
-                    raise ValueError(
-                        f"Failed to parse query after {max_retries + 1} attempts. "
-                        f"Last error: {str(e)}"
-                    )
+                messages = self._retry_messages(messages, message, e, attempt, max_retries)
 
         raise ValueError("Unexpected error in query understanding")
 
+    async def understand_query_batch(
+        self, queries: List[str], max_retries: int = 2
+    ) -> List[SemanticQueryPlan]:
+        """
+        Parse many queries concurrently.
+
+        At most config.max_concurrency API calls are in flight at once.
+
+        Args:
+            queries: Natural language queries
+            max_retries: Maximum number of retries per query on parsing errors
+
+        Returns:
+            One SemanticQueryPlan per query, in input order
+
+        Raises:
+            ValueError: If any query cannot be parsed after retries
+        """
+        semaphore = asyncio.Semaphore(self.config.max_concurrency)
+
+        async def understand(query: str) -> SemanticQueryPlan:
+            async with semaphore:
+                return await self.understand_query_async(query, max_retries)
+
+        return list(await asyncio.gather(*(understand(q) for q in queries)))
+
     def explain_query_plan(self, query_plan: SemanticQueryPlan) -> str:
         """
         Generate a human-readable explanation of a query plan.
@@ -379,39 +661,24 @@ Now parse the user's query and return ONLY the JSON object."""
         parts = []
 
         # Intent
-        intent_desc = {
-            QueryIntent.FIND_CONTRACTS: "Find contracts",
-            QueryIntent.COUNT_CONTRACTS: "Count contracts",
-            QueryIntent.AGGREGATE_VALUES: "Calculate statistics for contracts",
-            QueryIntent.COMPARE_CUSTOMERS: "Compare customers",
-            QueryIntent.GROUP_BY: "Group contracts",
-        }
-        parts.append(intent_desc.get(query_plan.intent, "Query"))
+        parts.append(_INTENT_DESC.get(query_plan.intent, "Query"))
 
         # Filters
         if query_plan.filters:
             filter_parts = []
             for f in query_plan.filters:
-                op_desc = {
-                    QueryOperator.EQUALS: "equals",
-                    QueryOperator.NOT_EQUALS: "does not equal",
-                    QueryOperator.GREATER_THAN: "greater than",
-                    QueryOperator.LESS_THAN: "less than",
-                    QueryOperator.GREATER_THAN_OR_EQUAL: "at least",
-                    QueryOperator.LESS_THAN_OR_EQUAL: "at most",
-                    QueryOperator.CONTAINS: "contains",
-                    QueryOperator.IN: "is one of",
-                    QueryOperator.BETWEEN: "between",
-                }
-                concept_name = f.concept.replace("_", " ")
-                op = op_desc.get(f.operator, str(f.operator))
+                concept_name = f.concept.translate(_UNDERSCORE_TO_SPACE)
+                op = _OP_DESC.get(f.operator, str(f.operator))
                 filter_parts.append(f"{concept_name} {op} {f.value}")
 
             parts.append("where " + " AND ".join(filter_parts))
 
         # Aggregations
         if query_plan.aggregations:
-            parts.append(f"({', '.join(query_plan.aggregations)})")
+            aggregations = ", ".join(
+                f"{agg.function}({agg.concept})" for agg in query_plan.aggregations
+            )
+            parts.append(f"({aggregations})")
 
         # Limit
         if query_plan.limit:
@@ -0,0 +1,90 @@
+"""
+Exact-match cache for parsed LLM responses.
+"""
+
+import copy
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a natural language query for cache lookups.
+
+    Args:
+        query: Raw user query
+
+    Returns:
+        Lowercased query with whitespace runs collapsed to single spaces
+    """
+    return re.sub(r"\s+", " ", query.strip().lower())
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache of parsed LLM results, keyed by a hash of every input
+    that can change the response (model, sampling settings, prompts).
+    """
+
+    def __init__(self, maxsize: int = 256):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries kept before evicting the oldest
+        """
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+
+    @staticmethod
+    def make_key(**parts: Any) -> str:
+        """
+        Build a deterministic cache key from request parts.
+
+        Args:
+            **parts: JSON-serializable values identifying the request
+
+        Returns:
+            SHA-256 hex digest of the canonical JSON encoding of parts
+        """
+        canonical = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Key from make_key
+
+        Returns:
+            A deep copy of the cached result (so callers may mutate it), or
+            None on a miss
+        """
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return copy.deepcopy(self._entries[key])
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        Store a result, evicting the least recently used entry when full.
+
+        Args:
+            key: Key from make_key
+            value: Parsed result to cache
+        """
+        self._entries[key] = copy.deepcopy(value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
@@ -2,9 +2,13 @@
 Schema Analyzer Agent: Automatically analyze customer schemas and propose mappings.
 """
 
+import asyncio
 import json
-from typing import List, Dict, Any, Tuple, Optional
-from anthropic import Anthropic
+import logging
+import re
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Tuple, Optional
+from anthropic import Anthropic, AsyncAnthropic
 from ..models import (
     CustomerSchema,
     SchemaTable,
@@ -14,6 +18,82 @@ from ..models import (
 )
 from ..knowledge_graph import SchemaKnowledgeGraph
 from ..config import Config
+from .llm_json import reply_payload, retry_turns, tool_request
+from .response_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+# Tool the model is forced to call, so mappings come back as structured input
+# instead of JSON text
+_MAPPINGS_TOOL = {
+    "name": "emit_mappings",
+    "description": "Return the proposed concept mappings for the schema.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "mappings": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "concept": {"type": "string"},
+                        "table": {"type": "string"},
+                        "column": {"type": "string"},
+                        "confidence": {"type": "number", "minimum": 0, "maximum": 1},
+                        "reasoning": {"type": "string"},
+                        "transformation": {"type": ["string", "null"]},
+                    },
+                    "required": ["concept", "table", "column"],
+                },
+            },
+        },
+        "required": ["mappings"],
+    },
+}
+
+# SQL type classifier: one alternation per semantic type, tried in priority
+# order against the whole type name (TINYINT(1) already matches INT)
+_SQL_TYPE_RE = re.compile(
+    r".*(?P<float>INT|DECIMAL|FLOAT|DOUBLE|NUMERIC|REAL)"
+    r"|.*(?P<date>DATE|TIME)"
+    r"|.*(?P<boolean>BOOL)",
+    re.IGNORECASE | re.DOTALL,
+)
+_SQL_TYPE_GROUPS = {
+    "float": SemanticType.FLOAT,
+    "date": SemanticType.DATE,
+    "boolean": SemanticType.BOOLEAN,
+}
+
+# Task instructions sent after the schema block of the user message
+_ANALYSIS_INSTRUCTIONS = """Analyze this schema and identify mappings to semantic concepts.
+
+Example mappings for reference:
+
+Customer A:
+- contract_identifier → contracts.contract_id (confidence: 1.0, exact name match)
+- contract_value → contracts.total_value (confidence: 0.95, "total_value" represents contract value)
+- contract_expiration → contracts.end_date (confidence: 0.90, "end_date" is when contract expires)
+
+Customer B (multi-table):
+- customer_name → customers.customer_name (confidence: 1.0, requires JOIN via contracts.customer_id)
+
+Customer D (transformation needed):
+- contract_expiration → agreements.days_remaining (confidence: 0.85, transformation: "Convert days_remaining to actual date using CURRENT_DATE")
+
+Consider:
+1. Exact name matches have highest confidence
+2. Semantic equivalents (e.g., "end_date" for expiration) have high confidence
+3. Multi-table mappings may require JOINs
+4. Some fields may need transformations (e.g., days → date, annual → lifetime)
+
+Return ONLY the JSON object with mappings."""
+
+
+def _infer_semantic_type(data_type: str) -> SemanticType:
+    """Infer a column's semantic type from its SQL type."""
+    match = _SQL_TYPE_RE.match(data_type)
+    return _SQL_TYPE_GROUPS[match.lastgroup] if match else SemanticType.TEXT
 
 
 class SchemaAnalyzerAgent:
@@ -26,7 +106,9 @@ class SchemaAnalyzerAgent:
         self, 
         anthropic_api_key: str, 
         knowledge_graph: SchemaKnowledgeGraph,
-        config: Optional[Config] = None
+        config: Optional[Config] = None,
+        client: Optional[Anthropic] = None,
+        async_client: Optional[AsyncAnthropic] = None
     ):
         """
         Initialize the schema analyzer agent.
@@ -35,18 +117,33 @@ class SchemaAnalyzerAgent:
             anthropic_api_key: API key for Anthropic Claude
             knowledge_graph: Schema knowledge graph with semantic concepts
             config: Configuration object (creates new if None)
+            client: Existing Anthropic client to share (creates new if None)
+            async_client: Existing AsyncAnthropic client to share (creates
+                new if None)
         """
-        self.client = Anthropic(api_key=anthropic_api_key)
+        self.client = client or Anthropic(api_key=anthropic_api_key)
+        self.async_client = async_client or AsyncAnthropic(api_key=anthropic_api_key)
         self.kg = knowledge_graph
         self.config = config or Config()
-        self.model = self.config.model_name
-        self.max_tokens = self.config.max_tokens
+        self.model = self.config.schema_analyzer_model or self.config.model_name
+        self.max_tokens = self.config.max_output_tokens_schema
         self.temperature = self.config.temperature
+        self._mapping_cache = ResponseCache()
+        self._system_prompt = ""
+        self._system_prompt_version = None
 
     def _build_system_prompt(self) -> str:
+        """Return the system prompt, rebuilding it only when the concepts change."""
+        if self.kg.concepts_version != self._system_prompt_version:
+            self._system_prompt = self._render_system_prompt()
+            self._system_prompt_version = self.kg.concepts_version
+        return self._system_prompt
+
+    def _render_system_prompt(self) -> str:
         """Build the system prompt with available semantic concepts."""
         concepts = []
-        for concept_name, concept_data in self.kg.concepts.items():
+        # Sorted so the prompt is byte-stable for the same concept set
+        for concept_name, concept_data in sorted(self.kg.concepts.items()):
             description = concept_data.description if hasattr(concept_data, 'description') else 'No description'
             concepts.append(
                 f"- {concept_name}: {description}"
@@ -88,8 +185,12 @@ Return ONLY valid JSON matching this schema:
 
     def _build_user_prompt(
         self, customer_id: str, schema: CustomerSchema
-    ) -> str:
-        """Build the user prompt with schema details."""
+    ) -> List[Dict[str, Any]]:
+        """Build the user message content: the schema details, then the task.
+
+        The schema block is marked cacheable so retries and re-analysis of
+        the same schema are served from Anthropic's prompt cache.
+        """
         # Format schema information
         schema_text = f"Customer: {customer_id}\n\nTables and Columns:\n"
         for table in schema.tables:
@@ -104,30 +205,205 @@ Return ONLY valid JSON matching this schema:
                 constraint_str = ", ".join(constraints) if constraints else ""
                 schema_text += f"  - {column.name} ({column.data_type}) {constraint_str}\n"
 
-        return f"""{schema_text}
+        return [
+            {"type": "text", "text": schema_text, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": _ANALYSIS_INSTRUCTIONS},
+        ]
+
+    def _cache_key(self, system_prompt: str, customer_id: str, schema: CustomerSchema) -> str:
+        """Key an analysis request by everything that shapes its answer."""
+        # Re-analyzing an unchanged schema skips the API call entirely
+        return ResponseCache.make_key(
+            model=self.model,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            system=system_prompt,
+            customer_id=customer_id,
+            tables=schema.model_dump_json(include={"tables"}),
+        )
+
+    def _disk_cache_path(self, cache_key: str, customer_id: str) -> Optional[Path]:
+        """Path of an analysis in the on-disk cache, or None when it is disabled."""
+        if self.config.analysis_cache_dir is None:
+            return None
+        return self.config.analysis_cache_dir.expanduser() / f"{customer_id}_{cache_key}.json"
+
+    def _cached_mappings(
+        self, cache_key: str, customer_id: str, schema: CustomerSchema
+    ) -> Optional[List[ConceptMapping]]:
+        """
+        Look an analysis up in memory, then in the on-disk cache.
 
-Analyze this schema and identify mappings to semantic concepts.
+        Args:
+            cache_key: Key from _cache_key
+            customer_id: The customer identifier
+            schema: The schema being analyzed
 
-Example mappings for reference:
+        Returns:
+            Cached ConceptMapping objects, or None on a miss
+        """
+        cached_mappings = self._mapping_cache.get(cache_key)
+        if cached_mappings is not None:
+            return cached_mappings
+
+        path = self._disk_cache_path(cache_key, customer_id)
+        if path is None or not path.exists():
+            return None
+        try:
+            mappings = self._mappings_from_result(
+                customer_id, schema, json.loads(path.read_text())
+            )
+        except (OSError, json.JSONDecodeError, KeyError, ValueError) as e:
+            logger.warning("Ignoring unreadable analysis cache %s: %s", path, e)
+            return None
+        self._mapping_cache.put(cache_key, mappings)
+        return mappings
 
-Customer A:
-- contract_identifier → contracts.contract_id (confidence: 1.0, exact name match)
-- contract_value → contracts.total_value (confidence: 0.95, "total_value" represents contract value)
-- contract_expiration → contracts.end_date (confidence: 0.90, "end_date" is when contract expires)
+    def _store_mappings(
+        self,
+        cache_key: str,
+        customer_id: str,
+        result: Dict[str, Any],
+        mappings: List[ConceptMapping],
+    ) -> None:
+        """Remember a fresh analysis in memory and, if enabled, on disk."""
+        self._mapping_cache.put(cache_key, mappings)
+        path = self._disk_cache_path(cache_key, customer_id)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps({"mappings": result["mappings"]}))
+        except OSError as e:
+            logger.warning("Could not write analysis cache %s: %s", path, e)
+
+    def _request_kwargs(
+        self,
+        system_prompt: str,
+        messages: List[Dict[str, Any]],
+        max_tokens: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Build the messages.create arguments shared by the sync and async paths.
+
+        The model must answer by calling the emit_mappings tool, which returns
+        the mappings already decoded. max_tokens defaults to the whole-schema
+        budget.
+        """
+        return {
+            "model": self.model,
+            "max_tokens": max_tokens or self.max_tokens,
+            "system": system_prompt,
+            "messages": messages,
+            "temperature": self.temperature,
+            **tool_request(_MAPPINGS_TOOL),
+        }
+
+    @staticmethod
+    def _column_index(schema: CustomerSchema) -> Dict[Tuple[str, str], SchemaColumn]:
+        """Index a schema's columns by (table, column) for single lookups."""
+        return {
+            (table.name, column.name): column
+            for table in schema.tables
+            for column in table.columns
+        }
+
+    def _mapping_from_dict(
+        self,
+        customer_id: str,
+        m: Dict[str, Any],
+        column_index: Dict[Tuple[str, str], SchemaColumn],
+    ) -> ConceptMapping:
+        """
+        Turn one mapping from the model's reply into a validated ConceptMapping.
 
-Customer B (multi-table):
-- customer_name → customers.customer_name (confidence: 1.0, requires JOIN via contracts.customer_id)
+        Args:
+            customer_id: The customer identifier
+            m: One entry of the reply's "mappings" list
+            column_index: Columns of the analyzed schema, from _column_index
 
-Customer D (transformation needed):
-- contract_expiration → agreements.days_remaining (confidence: 0.85, transformation: "Convert days_remaining to actual date using CURRENT_DATE")
+        Returns:
+            ConceptMapping object
 
-Consider:
-1. Exact name matches have highest confidence
-2. Semantic equivalents (e.g., "end_date" for expiration) have high confidence
-3. Multi-table mappings may require JOINs
-4. Some fields may need transformations (e.g., days → date, annual → lifetime)
+        Raises:
+            KeyError, ValueError: If the entry is malformed or names an
+                unknown concept
+        """
+        # Find the actual column to get semantic type and data type
+        column = column_index.get((m["table"], m["column"]))
+        if column is not None:
+            data_type = column.data_type
+            semantic_type = _infer_semantic_type(data_type)
+        else:
+            semantic_type = SemanticType.TEXT  # Default
+            data_type = "TEXT"  # Default
+
+        mapping = ConceptMapping(
+            customer_id=customer_id,
+            table_name=m["table"],
+            column_name=m["column"],
+            data_type=data_type,
+            semantic_type=semantic_type,
+            transformation=m.get("transformation"),
+            concept=m["concept"],
+            confidence=m.get("confidence", 0.8),
+            reasoning=m.get("reasoning", ""),
+        )
+
+        # Validate that the concept exists
+        if mapping.concept not in self.kg.concepts:
+            raise ValueError(
+                f"Unknown semantic concept: {mapping.concept}. "
+                f"Available: {list(self.kg.concepts.keys())}"
+            )
 
-Return ONLY the JSON object with mappings."""
+        return mapping
+
+    def _mappings_from_result(
+        self, customer_id: str, schema: CustomerSchema, result: Dict[str, Any]
+    ) -> List[ConceptMapping]:
+        """
+        Turn the model's mapping list into validated ConceptMapping objects.
+
+        Args:
+            customer_id: The customer identifier
+            schema: The schema that was analyzed
+            result: Decoded reply, an object with a "mappings" list
+
+        Returns:
+            List of ConceptMapping objects
+
+        Raises:
+            KeyError, ValueError: If the reply is not a valid mapping list
+                over known concepts
+        """
+        # Index columns once so each mapping is a single lookup
+        column_index = self._column_index(schema)
+        return [
+            self._mapping_from_dict(customer_id, m, column_index)
+            for m in result["mappings"]
+        ]
+
+    @staticmethod
+    def _retry_messages(
+        messages: List[Dict[str, Any]],
+        message: Any,
+        error: Exception,
+        attempt: int,
+        max_retries: int,
+    ) -> List[Dict[str, Any]]:
+        """
+        Append the failed reply and error feedback for another attempt.
+
+        Raises:
+            ValueError: If no attempts are left
+        """
+        if attempt < max_retries:
+            feedback = f"Previous attempt failed: {str(error)}\nPlease try again with valid JSON."
+            return messages + retry_turns(message, feedback)
+        raise ValueError(
+            f"Failed to analyze schema after {max_retries + 1} attempts. "
+            f"Last error: {str(error)}"
+        )
 
     def analyze_schema(
         self, customer_id: str, schema: CustomerSchema, max_retries: int = 2
@@ -147,98 +423,183 @@ Return ONLY the JSON object with mappings."""
             ValueError: If unable to analyze schema after retries
         """
         system_prompt = self._build_system_prompt()
-        user_prompt = self._build_user_prompt(customer_id, schema)
+        cache_key = self._cache_key(system_prompt, customer_id, schema)
+        cached_mappings = self._cached_mappings(cache_key, customer_id, schema)
+        if cached_mappings is not None:
+            return cached_mappings
+
+        messages = [{"role": "user", "content": self._build_user_prompt(customer_id, schema)}]
 
         for attempt in range(max_retries + 1):
             try:
                 # Call Claude API
                 message = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=self.max_tokens,
-                    system=system_prompt,
-                    messages=[{"role": "user", "content": user_prompt}],
-                    temperature=self.temperature,
+                    **self._request_kwargs(system_prompt, messages)
                 )
+                # Tool input, or JSON text if the model answered without the tool
+                result = reply_payload(message)
+                mappings = self._mappings_from_result(customer_id, schema, result)
+                self._store_mappings(cache_key, customer_id, result, mappings)
+                return mappings
 
-                # Extract JSON from response
-                response_text = message.content[0].text.strip()
+            except (json.JSONDecodeError, KeyError, ValueError) as e:
+                messages = self._retry_messages(messages, message, e, attempt, max_retries)
 
-                # Handle markdown code blocks
-                if response_text.startswith("```"):
-                    lines = response_text.split("\n")
-                    response_text = "\n".join(
-                        line for line in lines if not line.startswith("```")
-                    )
+        raise ValueError("Unexpected error in schema analysis")
 
-                # Parse JSON
-                result = json.loads(response_text)
-
-                # Convert to ConceptMapping objects
-                mappings = []
-                for m in result["mappings"]:
-                    # Find the actual column to get semantic type and data type
-                    semantic_type = SemanticType.TEXT  # Default
-                    data_type = "TEXT"  # Default
-                    for table in schema.tables:
-                        if table.name == m["table"]:
-                            for column in table.columns:
-                                if column.name == m["column"]:
-                                    data_type = column.data_type
-                                    # Infer semantic type from SQL type
-                                    sql_type = column.data_type.upper()
-                                    if any(
-                                        t in sql_type
-                                        for t in ["INT", "DECIMAL", "FLOAT", "DOUBLE", "NUMERIC", "REAL"]
-                                    ):
-                                        semantic_type = SemanticType.FLOAT
-                                    elif any(
-                                        t in sql_type for t in ["DATE", "TIME", "TIMESTAMP"]
-                                    ):
-                                        semantic_type = SemanticType.DATE
-                                    elif any(
-                                        t in sql_type for t in ["BOOL", "TINYINT(1)"]
-                                    ):
-                                        semantic_type = SemanticType.BOOLEAN
-                                    else:
-                                        semantic_type = SemanticType.TEXT
-                                    break
-
-                    mapping = ConceptMapping(
-                        customer_id=customer_id,
-                        table_name=m["table"],
-                        column_name=m["column"],
-                        data_type=data_type,
-                        semantic_type=semantic_type,
-                        transformation=m.get("transformation"),
-                    )
-                    # Store additional metadata from LLM (not in model)
-                    mapping._confidence = m.get("confidence", 0.8)
-                    mapping._reasoning = m.get("reasoning", "")
-                    mapping._concept = m["concept"]
-                    mappings.append(mapping)
+    async def _analyze_chunk_async(
+        self,
+        system_prompt: str,
+        customer_id: str,
+        schema: CustomerSchema,
+        max_retries: int,
+        max_tokens: int,
+    ) -> Tuple[List[Dict[str, Any]], List[ConceptMapping]]:
+        """
+        Analyze one schema (or slice of one) in a single API call.
 
-                # Validate that all concepts exist
-                for mapping in mappings:
-                    if mapping._concept not in self.kg.concepts:
-                        raise ValueError(
-                            f"Unknown semantic concept: {mapping._concept}. "
-                            f"Available: {list(self.kg.concepts.keys())}"
-                        )
+        Args:
+            max_tokens: Response token budget for this call
 
-                return mappings
+        Returns:
+            Tuple of (the reply's raw mapping entries, ConceptMapping objects)
+
+        Raises:
+            ValueError: If unable to analyze the schema after retries
+        """
+        messages = [{"role": "user", "content": self._build_user_prompt(customer_id, schema)}]
+
+        for attempt in range(max_retries + 1):
+            try:
+                message = await self.async_client.messages.create(
+                    **self._request_kwargs(system_prompt, messages, max_tokens)
+                )
+                # Tool input, or JSON text if the model answered without the tool
+                result = reply_payload(message)
+                return result["mappings"], self._mappings_from_result(customer_id, schema, result)
 
             except (json.JSONDecodeError, KeyError, ValueError) as e:
-                if attempt < max_retries:
-                    user_prompt += f"\n\nPrevious attempt failed: {str(e)}\nPlease try again with valid JSON."
-                    continue
-                else:
-                    raise ValueError(
-                        f"Failed to analyze schema after {max_retries + 1} attempts. "
-                        f"Last error: {str(e)}"
-                    )
+                messages = self._retry_messages(messages, message, e, attempt, max_retries)
 
         raise ValueError("Unexpected error in schema analysis")
 
+    async def analyze_schema_async(
+        self, customer_id: str, schema: CustomerSchema, max_retries: int = 2
+    ) -> List[ConceptMapping]:
+        """
+        Analyze a customer schema without blocking the event loop.
+
+        Same cache as analyze_schema, but the API calls are awaited on the
+        async client. Schemas with more than config.schema_chunk_tables
+        tables are split into slices of that many tables, analyzed
+        concurrently (at most config.max_concurrency at once), and merged,
+        dropping repeated (table, column, concept) mappings.
+
+        Args:
+            customer_id: The customer identifier
+            schema: The customer's database schema
+            max_retries: Maximum number of retries per slice on parsing errors
+
+        Returns:
+            List of ConceptMapping objects with proposed mappings
+
+        Raises:
+            ValueError: If unable to analyze schema after retries
+        """
+        system_prompt = self._build_system_prompt()
+        cache_key = self._cache_key(system_prompt, customer_id, schema)
+        cached_mappings = self._cached_mappings(cache_key, customer_id, schema)
+        if cached_mappings is not None:
+            return cached_mappings
+
+        chunk_size = self.config.schema_chunk_tables
+        chunks = [
+            schema.model_copy(update={"tables": schema.tables[start:start + chunk_size]})
+            for start in range(0, len(schema.tables), chunk_size)
+        ] or [schema]
+        # A schema that fits in one slice is sent whole, with the full budget
+        max_tokens = (
+            self.config.max_output_tokens_schema_chunk if len(chunks) > 1 else self.max_tokens
+        )
+        semaphore = asyncio.Semaphore(self.config.max_concurrency)
+
+        async def analyze(chunk: CustomerSchema):
+            async with semaphore:
+                return await self._analyze_chunk_async(
+                    system_prompt, customer_id, chunk, max_retries, max_tokens
+                )
+
+        entries: List[Dict[str, Any]] = []
+        mappings: List[ConceptMapping] = []
+        seen = set()
+        for chunk_entries, chunk_mappings in await asyncio.gather(*(analyze(c) for c in chunks)):
+            for entry, mapping in zip(chunk_entries, chunk_mappings):
+                key = (mapping.table_name, mapping.column_name, mapping.concept)
+                if key not in seen:
+                    seen.add(key)
+                    entries.append(entry)
+                    mappings.append(mapping)
+
+        self._store_mappings(cache_key, customer_id, {"mappings": entries}, mappings)
+        return mappings
+
+    def iter_schema_mappings(
+        self, customer_id: str, schema: CustomerSchema
+    ) -> Iterator[ConceptMapping]:
+        """
+        Stream a schema analysis, yielding each mapping as soon as the model
+        has finished writing it.
+
+        Each mapping is validated as it arrives, and the first bad one stops
+        the generation, so a reply that goes wrong early does not run to
+        completion. Unlike analyze_schema there are no retries. A completed
+        analysis is cached just like analyze_schema's.
+
+        Args:
+            customer_id: The customer identifier
+            schema: The customer's database schema
+
+        Yields:
+            ConceptMapping objects in the order the model proposes them
+
+        Raises:
+            KeyError, ValueError: If a mapping is malformed or names an
+                unknown concept, or the reply ends before the list is complete
+        """
+        system_prompt = self._build_system_prompt()
+        cache_key = self._cache_key(system_prompt, customer_id, schema)
+        cached_mappings = self._cached_mappings(cache_key, customer_id, schema)
+        if cached_mappings is not None:
+            yield from cached_mappings
+            return
+
+        column_index = self._column_index(schema)
+        messages = [{"role": "user", "content": self._build_user_prompt(customer_id, schema)}]
+        mappings: List[ConceptMapping] = []
+        result = None
+
+        with self.client.messages.stream(
+            **self._request_kwargs(system_prompt, messages)
+        ) as stream:
+            for event in stream:
+                if event.type == "input_json":
+                    # The last entry of a partial list may still be growing
+                    ready = (event.snapshot.get("mappings") or [])[:-1]
+                elif event.type == "content_block_stop" and event.content_block.type == "tool_use":
+                    result = event.content_block.input
+                    ready = result["mappings"]
+                else:
+                    continue
+
+                for m in ready[len(mappings):]:
+                    mapping = self._mapping_from_dict(customer_id, m, column_index)
+                    mappings.append(mapping)
+                    yield mapping
+
+        if result is None:
+            raise ValueError("Reply ended before the mapping list was complete")
+        self._store_mappings(cache_key, customer_id, result, mappings)
+
     def explain_mappings(
         self, mappings: List[ConceptMapping], include_low_confidence: bool = False
     ) -> str:
@@ -257,9 +618,8 @@ Return ONLY the JSON object with mappings."""
         # Group by concept
         by_concept: Dict[str, List[ConceptMapping]] = {}
         for mapping in mappings:
-            confidence = getattr(mapping, '_confidence', 1.0)
-            concept = getattr(mapping, '_concept', 'unknown')
-            if not include_low_confidence and confidence < 0.5:
+            concept = mapping.concept or 'unknown'
+            if not include_low_confidence and mapping.confidence < 0.5:
                 continue
             if concept not in by_concept:
                 by_concept[concept] = []
@@ -269,8 +629,7 @@ Return ONLY the JSON object with mappings."""
             concept_display = concept.replace("_", " ").title()
             lines.append(f"\n{concept_display}:")
             for mapping in concept_mappings:
-                confidence = getattr(mapping, '_confidence', 1.0)
-                confidence_pct = int(confidence * 100)
+                confidence_pct = int(mapping.confidence * 100)
                 location = f"{mapping.table_name}.{mapping.column_name}"
                 line = f"  - {location} ({confidence_pct}% confidence)"
                 if mapping.transformation:
@@ -299,33 +658,29 @@ Return ONLY the JSON object with mappings."""
         valid_mappings = []
         errors = []
 
-        # Build a lookup of available tables and columns
-        schema_lookup = {}
-        for table in schema.tables:
-            schema_lookup[table.name] = {
-                col.name for col in table.columns
-            }
+        # Build lookups of available tables and (table, column) pairs
+        tables = {table.name for table in schema.tables}
+        valid_pairs = frozenset(
+            (table.name, col.name) for table in schema.tables for col in table.columns
+        )
 
         for mapping in mappings:
-            # Check if table exists
-            if mapping.table_name not in schema_lookup:
-                errors.append(
-                    f"Table '{mapping.table_name}' not found in schema for {customer_id}"
-                )
-                continue
-
-            # Check if column exists
-            if mapping.column_name not in schema_lookup[mapping.table_name]:
-                errors.append(
-                    f"Column '{mapping.column_name}' not found in table "
-                    f"'{mapping.table_name}' for {customer_id}"
-                )
+            # Check the table and column exist (one probe for a valid mapping)
+            if (mapping.table_name, mapping.column_name) not in valid_pairs:
+                if mapping.table_name not in tables:
+                    errors.append(
+                        f"Table '{mapping.table_name}' not found in schema for {customer_id}"
+                    )
+                else:
+                    errors.append(
+                        f"Column '{mapping.column_name}' not found in table "
+                        f"'{mapping.table_name}' for {customer_id}"
+                    )
                 continue
 
-            # Check if concept exists (stored as _concept attribute)
-            concept = getattr(mapping, '_concept', None)
-            if concept and concept not in self.kg.concepts:
-                errors.append(f"Unknown concept: {concept}")
+            # Check if concept exists
+            if mapping.concept and mapping.concept not in self.kg.concepts:
+                errors.append(f"Unknown concept: {mapping.concept}")
                 continue
 
             # Mapping is valid
@@ -1,12 +1,28 @@
 """Configuration management for Schema Translator."""
 
 import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Set
 
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Directories created so far in this process
+_dirs_ensured: Set[Path] = set()
+
+
+def ensure_dir(path: Path) -> None:
+    """Create a directory and its parents unless already done in this process.
+    
+    Args:
+        path: Directory to create
+    """
+    if path in _dirs_ensured:
+        return
+    path.mkdir(parents=True, exist_ok=True)
+    _dirs_ensured.add(path)
+
 
 class Config(BaseSettings):
     """Application configuration loaded from environment variables."""
@@ -29,18 +45,59 @@ class Config(BaseSettings):
         default="claude-sonnet-4-5-20250929",
         description="Claude model to use"
     )
+    query_understanding_model: str = Field(
+        default="claude-haiku-4-5-20251001",
+        description="Claude model for parsing queries into plans"
+    )
+    schema_analyzer_model: Optional[str] = Field(
+        default=None,
+        description="Claude model for schema analysis (defaults to model_name)"
+    )
     max_tokens: int = Field(
         default=4096,
         ge=1,
         le=8192,
         description="Maximum tokens for LLM responses"
     )
+    max_output_tokens_query: int = Field(
+        default=512,
+        ge=1,
+        le=8192,
+        description="Maximum response tokens per query plan"
+    )
+    max_output_tokens_schema: int = Field(
+        default=4096,
+        ge=1,
+        le=8192,
+        description="Maximum response tokens for a whole-schema analysis"
+    )
+    max_output_tokens_schema_chunk: int = Field(
+        default=2048,
+        ge=1,
+        le=8192,
+        description="Maximum response tokens per slice of a chunked schema analysis"
+    )
     temperature: float = Field(
         default=0.0,
         ge=0.0,
         le=1.0,
         description="Temperature for LLM responses"
     )
+    max_concurrency: int = Field(
+        default=5,
+        ge=1,
+        description="Maximum concurrent LLM requests in batch calls"
+    )
+    max_batch_size: int = Field(
+        default=20,
+        ge=1,
+        description="Maximum queries packed into one LLM request"
+    )
+    schema_chunk_tables: int = Field(
+        default=10,
+        ge=1,
+        description="Tables per request when analyzing large schemas asynchronously"
+    )
     
     # Database Configuration
     database_dir: Path = Field(
@@ -54,13 +111,19 @@ class Config(BaseSettings):
         description="Path to knowledge graph JSON file"
     )
     
+    # Schema analysis cache; None keeps analyses in memory only
+    analysis_cache_dir: Optional[Path] = Field(
+        default=None,
+        description="Directory for cached schema analyses (e.g. ~/.schema_translator/analysis_cache)"
+    )
+    
     # Logging Configuration
     log_level: str = Field(
         default="INFO",
         description="Logging level"
     )
     
-    @field_validator("database_dir", "knowledge_graph_path", mode="before")
+    @field_validator("database_dir", "knowledge_graph_path", "analysis_cache_dir", mode="before")
     @classmethod
     def convert_to_path(cls, v) -> Path:
         """Convert string paths to Path objects."""
@@ -87,10 +150,10 @@ class Config(BaseSettings):
             )
         
         # Create database directory if it doesn't exist
-        self.database_dir.mkdir(parents=True, exist_ok=True)
+        ensure_dir(self.database_dir)
         
         # Ensure parent directories exist for other paths
-        self.knowledge_graph_path.parent.mkdir(parents=True, exist_ok=True)
+        ensure_dir(self.knowledge_graph_path.parent)
     
     def get_database_path(self, customer_id: str) -> Path:
         """Get path to a specific customer database.
@@ -117,8 +180,12 @@ class Config(BaseSettings):
         )
 
 
-# Global config instance
-_config: Optional[Config] = None
+@lru_cache(maxsize=1)
+def _build_config() -> Config:
+    """Create and validate the configuration; cached as the global instance."""
+    config = Config()
+    config.validate_config()
+    return config
 
 
 def get_config() -> Config:
@@ -130,11 +197,7 @@ def get_config() -> Config:
     Raises:
         ValueError: If configuration is invalid
     """
-    global _config
-    if _config is None:
-        _config = Config()
-        _config.validate_config()
-    return _config
+    return _build_config()
 
 
 def reload_config() -> Config:
@@ -145,7 +208,5 @@ def reload_config() -> Config:
     Returns:
         Config: The newly loaded configuration object
     """
-    global _config
-    _config = Config()
-    _config.validate_config()
-    return _config
+    _build_config.cache_clear()
+    return _build_config()
@@ -1,13 +1,27 @@
 """Database executor for running queries against customer databases."""
 
+import os
 import sqlite3
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Sequence
 
 from schema_translator.config import get_config
 from schema_translator.models import QueryResult
 
+# Per-connection settings: 64 MB page cache, 256 MB memory-mapped reads and
+# in-memory temp tables for sorts and GROUP BYs
+_CONNECTION_PRAGMAS = """
+PRAGMA foreign_keys = ON;
+PRAGMA synchronous = NORMAL;
+PRAGMA cache_size = -65536;
+PRAGMA mmap_size = 268435456;
+PRAGMA temp_store = MEMORY;
+"""
+
 
 class DatabaseExecutor:
     """Executes SQL queries against customer databases."""
@@ -16,17 +30,62 @@ class DatabaseExecutor:
         """Initialize the database executor."""
         self.config = get_config()
         self._connections: Dict[str, sqlite3.Connection] = {}
+        self._connections_lock = threading.Lock()
+        # One lock per connection, held while a thread executes and fetches
+        self._query_locks: Dict[str, threading.Lock] = {}
+        # Database files found at startup or opened since, by stem (e.g.
+        # "customer_a"); opening a connection needs no separate existence probe
+        self._db_paths: Dict[str, Path] = self._scan_databases()
+    
+    def _scan_databases(self) -> Dict[str, Path]:
+        """List the customer database files in one directory scan.
+        
+        Returns:
+            Dictionary mapping database file stem to its path
+        """
+        try:
+            with os.scandir(self.config.database_dir) as entries:
+                return {
+                    entry.name[:-len(".db")]: Path(entry.path)
+                    for entry in entries
+                    if entry.name.endswith(".db") and entry.is_file()
+                }
+        except FileNotFoundError:
+            return {}
+    
+    def list_customers(self, refresh: bool = False) -> List[str]:
+        """List the customers that have a database file.
+        
+        Served from the startup scan, so regular queries touch the
+        filesystem only when opening a connection.
+        
+        Args:
+            refresh: Rescan the database directory first, picking up
+                databases added or removed since the last scan
+            
+        Returns:
+            Sorted list of customer IDs
+        """
+        if refresh:
+            self._db_paths = self._scan_databases()
+        return sorted(stem for stem in list(self._db_paths) if stem.startswith("customer_"))
     
     def execute_query(
         self,
         customer_id: str,
-        sql: str
+        sql: str,
+        params: Sequence[Any] = ()
     ) -> QueryResult:
         """Execute a SQL query for a specific customer.
         
+        Pass literal values through params rather than formatting them into
+        sql: the SQL text then stays the same across calls, and SQLite reuses
+        the connection's cached prepared statement instead of re-parsing it.
+        
         Args:
             customer_id: Customer identifier
-            sql: SQL query to execute
+            sql: SQL query to execute, with ? placeholders for params
+            params: Values bound to the query's placeholders
             
         Returns:
             QueryResult with data and execution metadata
@@ -34,23 +93,18 @@ class DatabaseExecutor:
         start_time = time.time()
         
         try:
-            # Get database connection
-            conn = self._get_connection(customer_id)
-            cursor = conn.cursor()
-            
-            # Execute query
-            cursor.execute(sql)
-            
-            # Fetch results
-            rows = cursor.fetchall()
-            
-            # Get column names
-            column_names = [desc[0] for desc in cursor.description] if cursor.description else []
-            
-            # Convert to list of dictionaries
-            data = []
-            for row in rows:
-                data.append(dict(zip(column_names, row)))
+            with self._cursor(customer_id) as cursor:
+                # Execute query
+                cursor.execute(sql, params)
+                
+                # Build each row as a dictionary while fetching, with the
+                # column names looked up once per query
+                if cursor.description:
+                    column_names = tuple(desc[0] for desc in cursor.description)
+                    cursor.row_factory = lambda _cursor, row, keys=column_names: dict(zip(keys, row))
+                
+                # Fetch results
+                data = cursor.fetchall()
             
             # Calculate execution time
             execution_time_ms = (time.time() - start_time) * 1000
@@ -80,26 +134,33 @@ class DatabaseExecutor:
         self,
         sql_by_customer: Dict[str, str]
     ) -> List[QueryResult]:
-        """Execute queries for multiple customers.
+        """Execute queries for multiple customers in parallel.
+        
+        Each customer has its own database file and connection, so the
+        queries run on a thread pool (SQLite releases the GIL while a
+        statement runs). Threads sharing one customer's connection take
+        turns; see _cursor.
         
         Args:
             sql_by_customer: Dictionary mapping customer_id to SQL query
             
         Returns:
-            List of QueryResult objects
+            List of QueryResult objects, in the order of sql_by_customer
         """
-        results = []
-        
-        for customer_id, sql in sql_by_customer.items():
-            result = self.execute_query(customer_id, sql)
-            results.append(result)
+        if not sql_by_customer:
+            return []
         
-        return results
+        with ThreadPoolExecutor(max_workers=min(len(sql_by_customer), 10)) as pool:
+            return list(pool.map(
+                lambda item: self.execute_query(*item),
+                sql_by_customer.items()
+            ))
     
     def execute_raw_query(
         self,
         customer_id: str,
-        sql: str
+        sql: str,
+        params: Sequence[Any] = ()
     ) -> List[Dict[str, Any]]:
         """Execute a raw SQL query and return results directly.
         
@@ -107,12 +168,13 @@ class DatabaseExecutor:
         
         Args:
             customer_id: Customer identifier
-            sql: SQL query to execute
+            sql: SQL query to execute, with ? placeholders for params
+            params: Values bound to the query's placeholders
             
         Returns:
             List of result dictionaries
         """
-        result = self.execute_query(customer_id, sql)
+        result = self.execute_query(customer_id, sql, params)
         
         if result.error:
             raise RuntimeError(f"Query failed: {result.error}")
@@ -129,10 +191,9 @@ class DatabaseExecutor:
             True if connection works, False otherwise
         """
         try:
-            conn = self._get_connection(customer_id)
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1")
-            cursor.fetchone()
+            with self._cursor(customer_id) as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
             return True
         except Exception:
             return False
@@ -146,26 +207,24 @@ class DatabaseExecutor:
         Returns:
             Dictionary mapping table names to column info
         """
-        conn = self._get_connection(customer_id)
-        cursor = conn.cursor()
-        
-        # Get all tables
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = [row[0] for row in cursor.fetchall()]
-        
         table_info = {}
-        for table in tables:
-            cursor.execute(f"PRAGMA table_info({table})")
-            columns = []
-            for row in cursor.fetchall():
-                columns.append({
-                    "name": row[1],
-                    "type": row[2],
-                    "notnull": bool(row[3]),
-                    "default": row[4],
-                    "primary_key": bool(row[5])
-                })
-            table_info[table] = columns
+        with self._cursor(customer_id) as cursor:
+            # Get all tables
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+            tables = [row[0] for row in cursor.fetchall()]
+            
+            for table in tables:
+                cursor.execute(f"PRAGMA table_info({table})")
+                columns = []
+                for row in cursor.fetchall():
+                    columns.append({
+                        "name": row[1],
+                        "type": row[2],
+                        "notnull": bool(row[3]),
+                        "default": row[4],
+                        "primary_key": bool(row[5])
+                    })
+                table_info[table] = columns
         
         return table_info
     
@@ -178,11 +237,45 @@ class DatabaseExecutor:
             
         Returns:
             Number of rows
+            
+        Raises:
+            ValueError: If the database has no such table
+        """
+        with self._cursor(customer_id) as cursor:
+            # Table names cannot be bound as parameters, so only names listed
+            # in sqlite_master are interpolated
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name = ?",
+                (table_name,)
+            )
+            if cursor.fetchone() is None:
+                raise ValueError(f"Table not found: {table_name}")
+            
+            quoted_name = '"' + table_name.replace('"', '""') + '"'
+            cursor.execute(f"SELECT COUNT(*) FROM {quoted_name}")
+            return cursor.fetchone()[0]
+    
+    @contextmanager
+    def _cursor(self, customer_id: str) -> Iterator[sqlite3.Cursor]:
+        """Hold a customer's connection for one thread's statements.
+        
+        The connection is shared by every thread, so this lock, not SQLite's
+        build-time threading mode, keeps two threads from running statements
+        on it at once. Queries for different customers still run in
+        parallel.
+        
+        Args:
+            customer_id: Customer identifier
+            
+        Yields:
+            A new cursor on the customer's connection
+            
+        Raises:
+            FileNotFoundError: If database file doesn't exist
         """
         conn = self._get_connection(customer_id)
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-        return cursor.fetchone()[0]
+        with self._query_locks[customer_id]:
+            yield conn.cursor()
     
     def _get_connection(self, customer_id: str) -> sqlite3.Connection:
         """Get or create a database connection for a customer.
@@ -197,23 +290,50 @@ class DatabaseExecutor:
             FileNotFoundError: If database file doesn't exist
         """
         # Reuse existing connection if available
-        if customer_id in self._connections:
-            return self._connections[customer_id]
-        
-        # Get database path
-        db_path = self.config.get_database_path(customer_id)
-        
-        if not db_path.exists():
-            raise FileNotFoundError(f"Database not found: {db_path}")
-        
-        # Create connection
-        conn = sqlite3.connect(str(db_path))
+        conn = self._connections.get(customer_id)
+        if conn is not None:
+            return conn
         
-        # Enable foreign keys
-        conn.execute("PRAGMA foreign_keys = ON")
-        
-        # Store connection
-        self._connections[customer_id] = conn
+        with self._connections_lock:
+            # Another thread may have opened it while we waited
+            if customer_id in self._connections:
+                return self._connections[customer_id]
+            
+            # Get database path
+            db_path = self.config.get_database_path(customer_id)
+            
+            # Create connection, caching more prepared statements than the
+            # default 128. mode=rw never creates the file, so a database
+            # removed after the startup scan is still reported missing
+            # instead of reopened empty.
+            #
+            # check_same_thread=False lets worker threads (parallel
+            # harmonization, execute_for_all_customers, the UI's thread
+            # offloading) share this connection; each statement runs under
+            # the connection's lock from _cursor, whatever threading mode
+            # SQLite was built with.
+            try:
+                conn = sqlite3.connect(
+                    f"{db_path.resolve().as_uri()}?mode=rw",
+                    uri=True,
+                    check_same_thread=False,
+                    cached_statements=256
+                )
+            except sqlite3.OperationalError:
+                if db_path.exists():
+                    raise
+                self._db_paths.pop(db_path.stem, None)
+                raise FileNotFoundError(f"Database not found: {db_path}") from None
+            self._db_paths[db_path.stem] = db_path
+            
+            # Enable foreign keys and tune the connection for read-mostly
+            # analytical queries
+            conn.executescript(_CONNECTION_PRAGMAS)
+            
+            # Store connection (lock first, so any thread that sees the
+            # connection also finds its lock)
+            self._query_locks.setdefault(customer_id, threading.Lock())
+            self._connections[customer_id] = conn
         
         return conn
     
@@ -8,10 +8,26 @@ and schema mapping over time.
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta, timezone
 from collections import defaultdict, Counter
+from bisect import bisect_left, insort
 import json
 import logging
+import os
 from pathlib import Path
 
+try:  # optional accelerator for the feedback log
+    import orjson
+
+    def _dump_line(data: Dict[str, Any]) -> bytes:
+        return orjson.dumps(data) + b"\n"
+
+    _loads = orjson.loads
+except ImportError:
+    def _dump_line(data: Dict[str, Any]) -> bytes:
+        return (json.dumps(data) + "\n").encode("utf-8")
+
+    _loads = json.loads
+
+from schema_translator.config import ensure_dir
 from schema_translator.models import (
     QueryFeedback,
     SemanticQueryPlan,
@@ -20,6 +36,17 @@ from schema_translator.models import (
 
 logger = logging.getLogger(__name__)
 
+# Words ignored when looking for recurring terms in failed queries
+_COMMON_WORDS = frozenset({"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for"})
+# Concept suggestions also skip query verbs and filler
+_NON_CONCEPT_WORDS = _COMMON_WORDS | {"with", "show", "find", "get", "list", "all", "me"}
+
+_FAILURE_TYPES = ("incorrect", "missing")
+
+
+def _timestamp_of(feedback: QueryFeedback) -> datetime:
+    return feedback.timestamp
+
 
 class FeedbackLoop:
     """Collects and analyzes user feedback to improve the system."""
@@ -31,13 +58,21 @@ class FeedbackLoop:
             feedback_file: Path to store feedback (default: data/feedback.jsonl)
         """
         self.feedback_file = feedback_file or Path("data/feedback.jsonl")
-        self.feedback_file.parent.mkdir(parents=True, exist_ok=True)
+        # Append handle for the feedback log, opened on first save
+        self._fp = None
+        ensure_dir(self.feedback_file.parent)
         
-        # In-memory cache
+        # In-memory cache, kept in timestamp order
         self.feedback_cache: List[QueryFeedback] = []
         self.query_patterns: Dict[str, int] = defaultdict(int)
         self.failure_patterns: Dict[str, List[str]] = defaultdict(list)
         
+        # Running counts over feedback_cache, so reports need not rescan it
+        self._type_counts: Counter = Counter()
+        self._query_counts: Counter = Counter()
+        self._problem_query_counts: Counter = Counter()
+        self._failure_words: Dict[str, Counter] = {t: Counter() for t in _FAILURE_TYPES}
+        
         # Load existing feedback
         self._load_feedback()
         logger.info(f"FeedbackLoop initialized with {len(self.feedback_cache)} feedback entries")
@@ -70,16 +105,8 @@ class FeedbackLoop:
             correct_result=correct_result
         )
         
-        # Store in cache
-        self.feedback_cache.append(feedback)
-        
-        # Update patterns
-        if feedback_type == "incorrect" or feedback_type == "missing":
-            self.failure_patterns[feedback_type].append(query_text)
-        
-        # Track query patterns
-        intent_str = str(semantic_plan.intent)
-        self.query_patterns[intent_str] += 1
+        # Store in cache and update patterns
+        self._add_to_cache(feedback)
         
         # Persist to disk
         self._save_feedback(feedback)
@@ -100,12 +127,10 @@ class FeedbackLoop:
             Summary statistics
         """
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
-        recent_feedback = [
-            f for f in self.feedback_cache
-            if f.timestamp >= cutoff_date
-        ]
+        start = bisect_left(self.feedback_cache, cutoff_date, key=_timestamp_of)
+        total = len(self.feedback_cache) - start
         
-        if not recent_feedback:
+        if not total:
             return {
                 "total_feedback": 0,
                 "period_days": days,
@@ -113,23 +138,28 @@ class FeedbackLoop:
                 "most_problematic_queries": []
             }
         
-        # Count by type
-        type_counts = Counter(f.feedback_type for f in recent_feedback)
-        
-        # Find most problematic queries (incorrect/missing)
-        problem_queries = [
-            f.query_text for f in recent_feedback
-            if f.feedback_type in ["incorrect", "missing"]
-        ]
-        problem_query_counts = Counter(problem_queries)
+        if start == 0:
+            # Window covers everything: use the running counts
+            type_counts = self._type_counts
+            problem_query_counts = self._problem_query_counts
+        else:
+            recent_feedback = self.feedback_cache[start:]
+            
+            # Count by type
+            type_counts = Counter(f.feedback_type for f in recent_feedback)
+            
+            # Find most problematic queries (incorrect/missing)
+            problem_query_counts = Counter(
+                f.query_text for f in recent_feedback
+                if f.feedback_type in _FAILURE_TYPES
+            )
         
         return {
-            "total_feedback": len(recent_feedback),
+            "total_feedback": total,
             "period_days": days,
             "feedback_types": dict(type_counts),
             "most_problematic_queries": problem_query_counts.most_common(10),
-            "success_rate": (type_counts.get("good", 0) / len(recent_feedback) * 100
-                            if recent_feedback else 0)
+            "success_rate": type_counts.get("good", 0) / total * 100
         }
     
     def analyze_failure_patterns(self) -> Dict[str, Any]:
@@ -154,16 +184,11 @@ class FeedbackLoop:
         failure_counts = Counter(all_failures)
         
         # Analyze common terms in failed queries
-        all_words = []
-        for query in all_failures:
-            all_words.extend(query.lower().split())
-        
-        word_counts = Counter(all_words)
+        word_counts = self._failure_word_counts()
         # Remove common words
-        common_words = {"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for"}
         common_terms = [
             (word, count) for word, count in word_counts.most_common(20)
-            if word not in common_words and len(word) > 2
+            if word not in _COMMON_WORDS and len(word) > 2
         ]
         
         # Generate suggestions
@@ -224,23 +249,13 @@ class FeedbackLoop:
             return []
         
         # Extract potential concept names
-        all_words = []
-        for query in all_failures:
-            words = query.lower().split()
-            all_words.extend(words)
-        
-        word_counts = Counter(all_words)
+        word_counts = self._failure_word_counts()
         
         # Filter to meaningful terms
-        common_words = {
-            "the", "a", "an", "and", "or", "but", "in", "on", "at", "to",
-            "for", "with", "show", "find", "get", "list", "all", "me"
-        }
-        
         suggestions = []
         for word, count in word_counts.most_common(50):
             if (count >= min_occurrences and
-                word not in common_words and
+                word not in _NON_CONCEPT_WORDS and
                 len(word) > 2):
                 
                 # Find example queries containing this term
@@ -295,28 +310,72 @@ class FeedbackLoop:
         
         return recommendations
     
+    def _add_to_cache(self, feedback: QueryFeedback) -> None:
+        """Insert feedback in timestamp order and update running counts.
+        
+        Args:
+            feedback: Feedback to add
+        """
+        if self.feedback_cache and feedback.timestamp < self.feedback_cache[-1].timestamp:
+            insort(self.feedback_cache, feedback, key=_timestamp_of)
+        else:
+            self.feedback_cache.append(feedback)
+        self._count_feedback(feedback)
+    
+    def _count_feedback(self, feedback: QueryFeedback) -> None:
+        """Add one feedback entry to the patterns and running counts.
+        
+        Args:
+            feedback: Feedback to count
+        """
+        self.query_patterns[str(feedback.semantic_plan.intent)] += 1
+        self._type_counts[feedback.feedback_type] += 1
+        self._query_counts[feedback.query_text] += 1
+        
+        if feedback.feedback_type in _FAILURE_TYPES:
+            self.failure_patterns[feedback.feedback_type].append(feedback.query_text)
+            self._problem_query_counts[feedback.query_text] += 1
+            self._failure_words[feedback.feedback_type].update(feedback.query_text.lower().split())
+    
+    def _reset_counts(self) -> None:
+        """Clear the patterns and running counts."""
+        self.query_patterns.clear()
+        self.failure_patterns.clear()
+        self._type_counts.clear()
+        self._query_counts.clear()
+        self._problem_query_counts.clear()
+        for counts in self._failure_words.values():
+            counts.clear()
+    
+    def _failure_word_counts(self) -> Counter:
+        """Count words across failed queries (incorrect, then missing).
+        
+        Returns:
+            Counter of lowercased words
+        """
+        return self._failure_words["incorrect"] + self._failure_words["missing"]
+    
+    def close(self) -> None:
+        """Close the feedback log's append handle, if open."""
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+    
+    def __del__(self):
+        self.close()
+    
     def _load_feedback(self):
         """Load feedback from disk."""
         if not self.feedback_file.exists():
             return
         
         try:
-            with open(self.feedback_file, 'r') as f:
+            with open(self.feedback_file, 'rb') as f:
                 for line in f:
                     if line.strip():
-                        data = json.loads(line)
-                        # Reconstruct feedback object
-                        feedback = QueryFeedback(**data)
-                        self.feedback_cache.append(feedback)
-                        
-                        # Update patterns
-                        intent_str = str(feedback.semantic_plan.intent)
-                        self.query_patterns[intent_str] += 1
-                        
-                        if feedback.feedback_type in ["incorrect", "missing"]:
-                            self.failure_patterns[feedback.feedback_type].append(
-                                feedback.query_text
-                            )
+                        data = _loads(line)
+                        # Reconstruct feedback object and update patterns
+                        self._add_to_cache(QueryFeedback(**data))
         except Exception as e:
             logger.error(f"Error loading feedback: {e}", exc_info=True)
     
@@ -330,8 +389,10 @@ class FeedbackLoop:
             # Convert to dict for JSON serialization
             data = feedback.model_dump(mode='json')
             
-            with open(self.feedback_file, 'a') as f:
-                f.write(json.dumps(data) + '\n')
+            if self._fp is None:
+                self._fp = open(self.feedback_file, 'ab')
+            self._fp.write(_dump_line(data))
+            self._fp.flush()
         except Exception as e:
             logger.error(f"Error saving feedback: {e}", exc_info=True)
     
@@ -387,21 +448,20 @@ class FeedbackLoop:
         removed = old_count - len(self.feedback_cache)
         
         # Rebuild patterns
-        self.query_patterns.clear()
-        self.failure_patterns.clear()
+        self._reset_counts()
         for feedback in self.feedback_cache:
-            intent_str = str(feedback.semantic_plan.intent)
-            self.query_patterns[intent_str] += 1
-            if feedback.feedback_type in ["incorrect", "missing"]:
-                self.failure_patterns[feedback.feedback_type].append(
-                    feedback.query_text
-                )
+            self._count_feedback(feedback)
         
         # Rewrite file
         if removed > 0:
-            self.feedback_file.unlink(missing_ok=True)
-            for feedback in self.feedback_cache:
-                self._save_feedback(feedback)
+            self.close()
+            tmp_file = self.feedback_file.with_suffix('.tmp')
+            with open(tmp_file, 'wb') as f:
+                f.writelines(
+                    _dump_line(feedback.model_dump(mode='json'))
+                    for feedback in self.feedback_cache
+                )
+            os.replace(tmp_file, self.feedback_file)
         
         logger.info(f"Removed {removed} old feedback entries")
         return removed
@@ -421,16 +481,14 @@ class FeedbackLoop:
                 "newest_feedback": None
             }
         
-        type_counts = Counter(f.feedback_type for f in self.feedback_cache)
-        
         now = datetime.now(timezone.utc)
         ages = [(now - f.timestamp).days for f in self.feedback_cache]
         
         return {
             "total_feedback": len(self.feedback_cache),
-            "feedback_by_type": dict(type_counts),
+            "feedback_by_type": dict(self._type_counts),
             "average_age_days": sum(ages) / len(ages) if ages else 0,
             "oldest_feedback": min(f.timestamp for f in self.feedback_cache),
             "newest_feedback": max(f.timestamp for f in self.feedback_cache),
-            "unique_queries": len(set(f.query_text for f in self.feedback_cache))
+            "unique_queries": len(self._query_counts)
         }
@@ -1,14 +1,44 @@
 """Knowledge graph for semantic schema mappings."""
 
+import hashlib
 import json
+import logging
+import pickle
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 import networkx as nx
 
 from schema_translator.config import get_config
 from schema_translator.models import ConceptMapping, SemanticConcept, SemanticType
 
+logger = logging.getLogger(__name__)
+
+# Bump when the snapshot payload layout changes
+_SNAPSHOT_LAYOUT = 1
+
+# Schema-analysis metadata on a mapping is not part of the saved graph
+_UNSAVED_MAPPING_FIELDS = {"concept", "confidence", "reasoning"}
+
+
+@lru_cache(maxsize=1)
+def _snapshot_format() -> bytes:
+    """Tag identifying the snapshot layout and the pickled models' schemas.
+    
+    Snapshots pickle SemanticConcept and ConceptMapping instances, so one
+    written before a model gained or lost a field must not be reused.
+    
+    Returns:
+        ASCII tag written as the snapshot's first line
+    """
+    schemas = json.dumps(
+        [SemanticConcept.model_json_schema(), ConceptMapping.model_json_schema()],
+        sort_keys=True
+    )
+    digest = hashlib.sha256(schemas.encode("utf-8")).hexdigest()
+    return f"kg-snapshot-{_SNAPSHOT_LAYOUT}-{digest}".encode("ascii")
+
 
 class SchemaKnowledgeGraph:
     """Manages semantic relationships between customer schemas and concepts."""
@@ -19,6 +49,11 @@ class SchemaKnowledgeGraph:
         self.concepts: Dict[str, SemanticConcept] = {}
         self.transformations: Dict[str, Dict[str, str]] = {}
         self.config = get_config()
+        # Bumped whenever the concept set changes, so prompt builders can
+        # tell when text derived from the concepts is stale
+        self.concepts_version = 0
+        self._concept_list_text = ""
+        self._concept_list_version: Optional[int] = None
     
     def add_concept(
         self,
@@ -48,6 +83,7 @@ class SchemaKnowledgeGraph:
         
         self.concepts[concept_id] = concept
         self.graph.add_node(concept_id, type="concept", data=concept)
+        self.concepts_version += 1
         
         return concept
     
@@ -74,26 +110,60 @@ class SchemaKnowledgeGraph:
             transformation: SQL transformation needed (optional)
             join_requirements: Additional tables for JOIN (optional)
         """
-        if concept_id not in self.concepts:
-            raise ValueError(f"Concept {concept_id} not found. Add it first with add_concept()")
-        
-        mapping = ConceptMapping(
-            customer_id=customer_id,
-            table_name=table_name,
-            column_name=column_name,
-            data_type=data_type,
-            semantic_type=semantic_type,
-            transformation=transformation,
-            join_requirements=join_requirements or []
-        )
+        self.add_customer_mappings([{
+            "concept_id": concept_id,
+            "customer_id": customer_id,
+            "table_name": table_name,
+            "column_name": column_name,
+            "data_type": data_type,
+            "semantic_type": semantic_type,
+            "transformation": transformation,
+            "join_requirements": join_requirements,
+        }])
+    
+    def add_customer_mappings(self, mappings: Iterable[Dict[str, Any]]) -> None:
+        """Add many customer-specific mappings in one batch.
         
-        # Add to concept
-        self.concepts[concept_id].customer_mappings[customer_id] = mapping
+        Graph nodes and edges are inserted with one add_nodes_from and one
+        add_edges_from call instead of one NetworkX call pair per mapping.
+        
+        Args:
+            mappings: Dicts of add_customer_mapping keyword arguments
+                (transformation and join_requirements may be omitted)
+        """
+        built = []
+        for entry in mappings:
+            concept_id = entry["concept_id"]
+            if concept_id not in self.concepts:
+                raise ValueError(f"Concept {concept_id} not found. Add it first with add_concept()")
+            
+            customer_id = entry["customer_id"]
+            mapping = ConceptMapping(
+                customer_id=customer_id,
+                table_name=entry["table_name"],
+                column_name=entry["column_name"],
+                data_type=entry["data_type"],
+                semantic_type=entry["semantic_type"],
+                transformation=entry.get("transformation"),
+                join_requirements=entry.get("join_requirements") or []
+            )
+            
+            built.append((concept_id, customer_id, mapping))
+        
+        # Apply only after every entry validated, so a bad entry adds nothing
+        nodes = []
+        edges = []
+        for concept_id, customer_id, mapping in built:
+            # Add to concept
+            self.concepts[concept_id].customer_mappings[customer_id] = mapping
+            
+            customer_node = f"{customer_id}:{concept_id}"
+            nodes.append((customer_node, {"type": "mapping", "data": mapping}))
+            edges.append((concept_id, customer_node, {"relation": "has_mapping"}))
         
         # Add to graph
-        customer_node = f"{customer_id}:{concept_id}"
-        self.graph.add_node(customer_node, type="mapping", data=mapping)
-        self.graph.add_edge(concept_id, customer_node, relation="has_mapping")
+        self.graph.add_nodes_from(nodes)
+        self.graph.add_edges_from(edges)
     
     def add_transformation(
         self,
@@ -124,6 +194,23 @@ class SchemaKnowledgeGraph:
         """
         return self.concepts.get(concept_id)
     
+    def concept_list_text(self) -> str:
+        """Get the concept IDs as a sorted "- concept_id" list for prompts.
+        
+        The text is byte-identical for the same concept set regardless of
+        insertion order, so prompts built from it stay prompt-cache hits
+        across processes. It is rebuilt only when the concepts change.
+        
+        Returns:
+            One "- concept_id" line per concept, sorted by ID
+        """
+        if self._concept_list_version != self.concepts_version:
+            self._concept_list_text = "\n".join(
+                f"- {concept_id}" for concept_id in sorted(self.concepts)
+            )
+            self._concept_list_version = self.concepts_version
+        return self._concept_list_text
+    
     def get_mapping(
         self,
         concept_id: str,
@@ -215,14 +302,20 @@ class SchemaKnowledgeGraph:
         
         data = {
             "concepts": {
-                concept_id: concept.model_dump()
+                concept_id: concept.model_dump(
+                    exclude={"customer_mappings": {"__all__": _UNSAVED_MAPPING_FIELDS}}
+                )
                 for concept_id, concept in self.concepts.items()
             },
             "transformations": self.transformations
         }
         
-        with open(path, "w") as f:
-            json.dump(data, f, indent=2, default=str)
+        # Serialize in memory and write once with a fixed encoding
+        Path(path).write_text(
+            json.dumps(data, indent=2, default=str),
+            encoding="utf-8",
+            newline="\n"
+        )
     
     def load(self, path: Optional[Path] = None) -> None:
         """Load knowledge graph from JSON file.
@@ -236,29 +329,106 @@ class SchemaKnowledgeGraph:
         if not path.exists():
             raise FileNotFoundError(f"Knowledge graph file not found: {path}")
         
-        with open(path, "r") as f:
-            data = json.load(f)
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
         
         # Clear existing data
         self.graph.clear()
         self.concepts.clear()
         self.transformations.clear()
         
-        # Load concepts
+        # Load concepts, collecting graph nodes and edges for one bulk insert
+        nodes = []
+        edges = []
         for concept_id, concept_data in data.get("concepts", {}).items():
             concept = SemanticConcept(**concept_data)
             self.concepts[concept_id] = concept
-            self.graph.add_node(concept_id, type="concept", data=concept)
+            nodes.append((concept_id, {"type": "concept", "data": concept}))
             
             # Add mapping nodes
             for customer_id, mapping_data in concept.customer_mappings.items():
                 customer_node = f"{customer_id}:{concept_id}"
-                self.graph.add_node(customer_node, type="mapping", data=mapping_data)
-                self.graph.add_edge(concept_id, customer_node, relation="has_mapping")
+                nodes.append((customer_node, {"type": "mapping", "data": mapping_data}))
+                edges.append((concept_id, customer_node, {"relation": "has_mapping"}))
+        
+        self.graph.add_nodes_from(nodes)
+        self.graph.add_edges_from(edges)
+        self.concepts_version += 1
         
         # Load transformations
         self.transformations = data.get("transformations", {})
     
+    def save_binary(self, path: Path) -> None:
+        """Save the built graph as a pickle snapshot.
+        
+        The pickle is preceded by a format tag line, so snapshots written
+        for other model schemas are rejected before unpickling.
+        
+        Args:
+            path: Destination file
+        """
+        data = {
+            "graph": self.graph,
+            "concepts": self.concepts,
+            "transformations": self.transformations
+        }
+        Path(path).write_bytes(
+            _snapshot_format() + b"\n" + pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        )
+    
+    def load_binary(self, path: Path) -> None:
+        """Load a snapshot written by save_binary.
+        
+        Only load snapshots this process or a trusted build wrote; unpickling
+        can run arbitrary code.
+        
+        Args:
+            path: Snapshot file
+            
+        Raises:
+            ValueError: If the snapshot was written for a different format or
+                model schema
+        """
+        tag, _, payload = Path(path).read_bytes().partition(b"\n")
+        if tag != _snapshot_format():
+            raise ValueError("snapshot format does not match the current models")
+        data = pickle.loads(payload)
+        self.graph = data["graph"]
+        self.concepts = data["concepts"]
+        self.transformations = data["transformations"]
+        self.concepts_version += 1
+    
+    def load_cached(self, path: Optional[Path] = None) -> None:
+        """Load from JSON through a binary snapshot kept beside it.
+        
+        The snapshot skips JSON parsing and model validation on later
+        starts. It is used only while newer than the JSON file and written
+        for the current models, and is rewritten from the JSON otherwise.
+        
+        Args:
+            path: Optional custom JSON path, uses config default if not provided
+        """
+        if path is None:
+            path = self.config.knowledge_graph_path
+        path = Path(path)
+        snapshot = path.with_suffix(".pkl")
+        
+        if (
+            path.exists()
+            and snapshot.exists()
+            and snapshot.stat().st_mtime > path.stat().st_mtime
+        ):
+            try:
+                self.load_binary(snapshot)
+                return
+            except Exception as e:
+                logger.warning("Ignoring unreadable knowledge graph snapshot %s: %s", snapshot, e)
+        
+        self.load(path)
+        try:
+            self.save_binary(snapshot)
+        except OSError as e:
+            logger.warning("Could not write knowledge graph snapshot %s: %s", snapshot, e)
+    
     def validate(self) -> Dict[str, Any]:
         """Validate the knowledge graph for completeness.
         
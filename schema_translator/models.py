@@ -2,9 +2,10 @@
 
 from datetime import datetime, timezone
 from enum import Enum
+from functools import cached_property
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 # Enums
@@ -120,6 +121,9 @@ class ConceptMapping(BaseModel):
         default_factory=list,
         description="Additional tables needed for JOIN"
     )
+    concept: Optional[str] = Field(None, description="Concept proposed for this column by schema analysis")
+    confidence: float = Field(1.0, description="Confidence in a proposed mapping (0.0 to 1.0)")
+    reasoning: str = Field("", description="Why schema analysis proposed this mapping")
     
     model_config = {"use_enum_values": True}
 
@@ -177,6 +181,20 @@ class SemanticQueryPlan(BaseModel):
     
     model_config = {"use_enum_values": True}
 
+    @field_validator("aggregations", mode="before")
+    @classmethod
+    def accept_bare_aggregation_functions(cls, v):
+        """Accept the older aggregation format of bare function names.
+
+        A string such as "count" becomes a count over contract_identifier.
+        """
+        if isinstance(v, list):
+            return [
+                {"function": agg, "concept": "contract_identifier"} if isinstance(agg, str) else agg
+                for agg in v
+            ]
+        return v
+
 
 # Result Models
 class QueryResult(BaseModel):
@@ -232,6 +250,11 @@ class HarmonizedResult(BaseModel):
         if not self.customers_queried:
             return 0.0
         return len(self.customers_succeeded) / len(self.customers_queried) * 100
+    
+    @cached_property
+    def columns(self) -> List[str]:
+        """Column names of the first result row, in order (computed once)."""
+        return list(self.results[0].data.keys()) if self.results else []
 
 
 # Feedback and Learning Models
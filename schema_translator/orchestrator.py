@@ -3,7 +3,9 @@
 import logging
 import time
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Any
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from anthropic import Anthropic, AsyncAnthropic
 
 from schema_translator.agents import QueryUnderstandingAgent, SchemaAnalyzerAgent
 from schema_translator.config import Config
@@ -19,11 +21,7 @@ from schema_translator.result_harmonizer import ResultHarmonizer
 from schema_translator.feedback_loop import FeedbackLoop
 from schema_translator.schema_drift_detector import SchemaDriftDetector
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Logging is configured by the entry point (app.py); the library only logs
 logger = logging.getLogger(__name__)
 
 
@@ -34,7 +32,9 @@ class ChatOrchestrator:
         self,
         config: Optional[Config] = None,
         knowledge_graph: Optional[SchemaKnowledgeGraph] = None,
-        use_llm: bool = True
+        use_llm: bool = True,
+        executor: Optional[DatabaseExecutor] = None,
+        llm_clients: Optional[Tuple[Anthropic, AsyncAnthropic]] = None
     ):
         """Initialize the chat orchestrator.
         
@@ -42,6 +42,9 @@ class ChatOrchestrator:
             config: Configuration object (creates new if None)
             knowledge_graph: Knowledge graph (loads from config if None)
             use_llm: Whether to use LLM agents (False for mock mode)
+            executor: Database executor to share (creates new if None)
+            llm_clients: (sync, async) Anthropic clients for the agents to
+                share (each agent creates its own if None)
         """
         self.config = config or Config()
         self.use_llm = use_llm
@@ -50,28 +53,33 @@ class ChatOrchestrator:
         if knowledge_graph is None:
             logger.info("Loading knowledge graph...")
             self.knowledge_graph = SchemaKnowledgeGraph()
-            self.knowledge_graph.load(self.config.knowledge_graph_path)
+            self.knowledge_graph.load_cached(self.config.knowledge_graph_path)
         else:
             self.knowledge_graph = knowledge_graph
         
         # Initialize components
         logger.info("Initializing components...")
-        self.executor = DatabaseExecutor()
+        self.executor = executor or DatabaseExecutor()
         self.compiler = QueryCompiler(self.knowledge_graph)
         self.result_harmonizer = ResultHarmonizer(self.knowledge_graph, self.executor)
         
         # Initialize agents (if using LLM)
         if self.use_llm:
             logger.info("Initializing LLM agents...")
+            client, async_client = llm_clients or (None, None)
             self.query_agent = QueryUnderstandingAgent(
                 self.config.anthropic_api_key,
                 self.knowledge_graph,
-                self.config
+                self.config,
+                client=client,
+                async_client=async_client
             )
             self.schema_agent = SchemaAnalyzerAgent(
                 self.config.anthropic_api_key,
                 self.knowledge_graph,
-                self.config
+                self.config,
+                client=client,
+                async_client=async_client
             )
         else:
             logger.info("Running in mock mode (no LLM)")
@@ -110,7 +118,7 @@ class ChatOrchestrator:
         """
         start_time = time.time()
         
-        logger.info(f"Processing query: '{query_text}'")
+        logger.info("Processing query: '%s'", query_text)
         
         try:
             # Step 1: Validate query
@@ -122,82 +130,202 @@ class ChatOrchestrator:
             semantic_plan = self._parse_query(query_text)
             
             if debug:
-                logger.info(f"Semantic plan: {semantic_plan}")
+                logger.info("Semantic plan: %s", semantic_plan)
             
             # Step 3: Determine which customers to query
-            # Priority: explicit customer_ids parameter > target_customers from query > all customers
-            target_customers = customer_ids
-            if target_customers is None and semantic_plan.target_customers:
-                target_customers = semantic_plan.target_customers
-                logger.info(f"Extracted target customers from query: {target_customers}")
+            target_customers = self._resolve_target_customers(semantic_plan, customer_ids)
             
             # Step 4: Execute query across customers
-            logger.info(f"Executing query across {len(target_customers) if target_customers else 'all'} customers...")
+            logger.info("Executing query across %s customers...", len(target_customers) if target_customers else 'all')
             result = self.result_harmonizer.execute_across_customers(
                 semantic_plan,
                 customer_ids=target_customers
             )
             
-            # Step 5: Calculate total execution time
-            total_time_ms = (time.time() - start_time) * 1000
-            
-            logger.info(
-                f"Query completed: {result.total_count} rows, "
-                f"{result.success_rate:.1f}% success rate, "
-                f"{total_time_ms:.2f}ms"
+            return self._complete_query(
+                query_text, semantic_plan, result, customer_ids, debug, start_time
             )
             
-            # Step 6: Add to history
-            self._add_to_history(
-                query_text=query_text,
-                semantic_plan=semantic_plan,
-                result=result,
-                execution_time_ms=total_time_ms,
-                error=None
-            )
+        except Exception as e:
+            return self._fail_query(query_text, e, start_time)
+    
+    async def process_query_async(
+        self,
+        query_text: str,
+        customer_ids: Optional[List[str]] = None,
+        debug: bool = False,
+        on_plan: Optional[Callable[[SemanticQueryPlan], Awaitable[Any]]] = None
+    ) -> Dict[str, Any]:
+        """Process a query without blocking the event loop.
+        
+        Parsing awaits the agent's async client, then each customer's SQL
+        compile and execute step runs as its own task and the results are
+        harmonized once all of them finish.
+        
+        Args:
+            query_text: Natural language query
+            customer_ids: Optional list of customer IDs to query (all if None)
+            debug: Whether to include debug information
+            on_plan: Optional coroutine function awaited with the semantic plan
+                as soon as the query is parsed
             
-            # Step 7: Build response
-            response = {
-                "success": True,
-                "query_text": query_text,
-                "semantic_plan": semantic_plan if debug else None,
-                "result": result,
-                "execution_time_ms": total_time_ms,
-                "error": None
-            }
+        Returns:
+            Dictionary with results and metadata (same shape as process_query)
+        """
+        start_time = time.time()
+        
+        logger.info("Processing query: '%s'", query_text)
+        
+        try:
+            if not self._validate_query(query_text):
+                raise ValueError("Invalid query: Query text is empty or too short")
+            
+            if self.use_llm and self.query_agent:
+                semantic_plan = await self.query_agent.understand_query_async(query_text)
+            else:
+                semantic_plan = self._parse_query(query_text)
             
             if debug:
-                response["debug"] = self._build_debug_info(
-                    semantic_plan,
-                    result,
-                    customer_ids
-                )
+                logger.info("Semantic plan: %s", semantic_plan)
+            
+            if on_plan is not None:
+                await on_plan(semantic_plan)
+            
+            target_customers = self._resolve_target_customers(semantic_plan, customer_ids)
+            
+            logger.info("Executing query across %s customers...", len(target_customers) if target_customers else 'all')
+            result = await self.result_harmonizer.execute_across_customers_async(
+                semantic_plan,
+                customer_ids=target_customers
+            )
             
-            return response
+            return self._complete_query(
+                query_text, semantic_plan, result, customer_ids, debug, start_time
+            )
             
         except Exception as e:
-            error_msg = str(e)
-            total_time_ms = (time.time() - start_time) * 1000
-            
-            logger.error(f"Query failed: {error_msg}", exc_info=True)
-            
-            # Add failed query to history
-            self._add_to_history(
-                query_text=query_text,
-                semantic_plan=None,
-                result=None,
-                execution_time_ms=total_time_ms,
-                error=error_msg
+            return self._fail_query(query_text, e, start_time)
+    
+    def _resolve_target_customers(
+        self,
+        semantic_plan: SemanticQueryPlan,
+        customer_ids: Optional[List[str]]
+    ) -> Optional[List[str]]:
+        """Pick the customers a query should run against.
+        
+        Priority: explicit customer_ids parameter > target_customers from
+        query > all customers (None).
+        
+        Args:
+            semantic_plan: Parsed semantic plan
+            customer_ids: Customer IDs passed by the caller
+            
+        Returns:
+            List of customer IDs, or None for all customers
+        """
+        if customer_ids is None and semantic_plan.target_customers:
+            logger.info("Extracted target customers from query: %s", semantic_plan.target_customers)
+            return semantic_plan.target_customers
+        return customer_ids
+    
+    def _complete_query(
+        self,
+        query_text: str,
+        semantic_plan: SemanticQueryPlan,
+        result: HarmonizedResult,
+        customer_ids: Optional[List[str]],
+        debug: bool,
+        start_time: float
+    ) -> Dict[str, Any]:
+        """Record a successful query and build its response.
+        
+        Args:
+            query_text: Natural language query
+            semantic_plan: Parsed semantic plan
+            result: Harmonized result
+            customer_ids: Customer IDs passed by the caller
+            debug: Whether to include debug information
+            start_time: time.time() when processing started
+            
+        Returns:
+            Response dictionary
+        """
+        # Calculate total execution time
+        total_time_ms = (time.time() - start_time) * 1000
+        
+        logger.info(
+            "Query completed: %d rows, %.1f%% success rate, %.2fms",
+            result.total_count,
+            result.success_rate,
+            total_time_ms
+        )
+        
+        # Add to history
+        self._add_to_history(
+            query_text=query_text,
+            semantic_plan=semantic_plan,
+            result=result,
+            execution_time_ms=total_time_ms,
+            error=None
+        )
+        
+        # Build response
+        response = {
+            "success": True,
+            "query_text": query_text,
+            "semantic_plan": semantic_plan if debug else None,
+            "result": result,
+            "execution_time_ms": total_time_ms,
+            "error": None
+        }
+        
+        if debug:
+            response["debug"] = self._build_debug_info(
+                semantic_plan,
+                result,
+                customer_ids
             )
+        
+        return response
+    
+    def _fail_query(
+        self,
+        query_text: str,
+        error: Exception,
+        start_time: float
+    ) -> Dict[str, Any]:
+        """Record a failed query and build its error response.
+        
+        Args:
+            query_text: Natural language query
+            error: Exception that stopped processing
+            start_time: time.time() when processing started
             
-            return {
-                "success": False,
-                "query_text": query_text,
-                "semantic_plan": None,
-                "result": None,
-                "execution_time_ms": total_time_ms,
-                "error": error_msg
-            }
+        Returns:
+            Response dictionary with success=False
+        """
+        error_msg = str(error)
+        total_time_ms = (time.time() - start_time) * 1000
+        
+        logger.error("Query failed: %s", error_msg, exc_info=error)
+        
+        # Add failed query to history
+        self._add_to_history(
+            query_text=query_text,
+            semantic_plan=None,
+            result=None,
+            execution_time_ms=total_time_ms,
+            error=error_msg
+        )
+        
+        return {
+            "success": False,
+            "query_text": query_text,
+            "semantic_plan": None,
+            "result": None,
+            "execution_time_ms": total_time_ms,
+            "error": error_msg
+        }
     
     def _validate_query(self, query_text: str) -> bool:
         """Validate a query before processing.
@@ -350,7 +478,7 @@ class ChatOrchestrator:
             feedback_text=feedback_text
         )
         
-        logger.info(f"Feedback received: {feedback_type} for query '{query_text}'")
+        logger.info("Feedback received: %s for query '%s'", feedback_type, query_text)
         
         return feedback
     
@@ -397,15 +525,17 @@ class ChatOrchestrator:
                 "error": str(e)
             }
     
-    def list_available_customers(self) -> List[str]:
+    def list_available_customers(self, refresh: bool = False) -> List[str]:
         """Get list of available customer IDs.
         
+        Args:
+            refresh: Rescan the database directory instead of using the
+                executor's last scan
+            
         Returns:
-            List of customer IDs
+            Sorted list of customer IDs
         """
-        db_dir = self.config.database_dir
-        db_files = list(db_dir.glob("customer_*.db"))
-        return sorted([f.stem for f in db_files])
+        return self.executor.list_customers(refresh=refresh)
     
     def get_customer_info(self, customer_id: str) -> Dict[str, Any]:
         """Get information about a specific customer.
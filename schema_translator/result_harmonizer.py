@@ -1,5 +1,6 @@
 """Result harmonization for combining and normalizing multi-customer query results."""
 
+import asyncio
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
@@ -55,11 +56,7 @@ class ResultHarmonizer:
         start_time = time.time()
         
         # Determine which customers to query
-        if customer_ids is None:
-            # Get all customer IDs from database directory
-            db_dir = self.executor.config.database_dir
-            db_files = list(db_dir.glob("customer_*.db"))
-            customer_ids = [f.stem for f in db_files]
+        customer_ids = self._resolve_customer_ids(customer_ids)
         
         # Execute queries for each customer
         if parallel and len(customer_ids) > 1:
@@ -76,6 +73,80 @@ class ResultHarmonizer:
         
         return harmonized
     
+    async def execute_across_customers_async(
+        self,
+        query_plan: SemanticQueryPlan,
+        customer_ids: Optional[List[str]] = None
+    ) -> HarmonizedResult:
+        """Async variant of execute_across_customers.
+        
+        Each customer's compile-and-execute step runs as its own task, so a
+        slow database does not hold up the others and the event loop stays
+        free while they run.
+        
+        Args:
+            query_plan: Semantic query plan to execute
+            customer_ids: List of customer IDs to query (all if None)
+            
+        Returns:
+            HarmonizedResult with combined and normalized data
+        """
+        start_time = time.time()
+        
+        customer_ids = self._resolve_customer_ids(customer_ids)
+        
+        outcomes = await asyncio.gather(
+            *(
+                asyncio.to_thread(self._execute_for_customer, query_plan, cid)
+                for cid in customer_ids
+            ),
+            return_exceptions=True
+        )
+        
+        results = {
+            cid: self._error_result(cid, outcome) if isinstance(outcome, Exception) else outcome
+            for cid, outcome in zip(customer_ids, outcomes)
+        }
+        
+        harmonized = self._harmonize_results(query_plan, results)
+        harmonized.execution_time_ms = (time.time() - start_time) * 1000
+        
+        return harmonized
+    
+    def _resolve_customer_ids(self, customer_ids: Optional[List[str]]) -> List[str]:
+        """Return the customers to query, defaulting to every customer database.
+        
+        Args:
+            customer_ids: Explicit customer IDs, or None for all
+            
+        Returns:
+            List of customer IDs
+        """
+        if customer_ids is not None:
+            return customer_ids
+        
+        # Every customer database the executor knows about
+        return self.executor.list_customers()
+    
+    def _error_result(self, customer_id: str, error: Exception) -> QueryResult:
+        """Build an empty QueryResult recording a per-customer failure.
+        
+        Args:
+            customer_id: Customer ID
+            error: Exception raised while querying the customer
+            
+        Returns:
+            QueryResult with no data and the error message
+        """
+        return QueryResult(
+            customer_id=customer_id,
+            data=[],
+            sql_executed="",
+            execution_time_ms=0,
+            row_count=0,
+            error=str(error)
+        )
+    
     def _execute_parallel(
         self,
         query_plan: SemanticQueryPlan,
@@ -105,15 +176,7 @@ class ResultHarmonizer:
                 try:
                     results[customer_id] = future.result()
                 except Exception as e:
-                    # Create error result
-                    results[customer_id] = QueryResult(
-                        customer_id=customer_id,
-                        data=[],
-                        sql_executed="",
-                        execution_time_ms=0,
-                        row_count=0,
-                        error=str(e)
-                    )
+                    results[customer_id] = self._error_result(customer_id, e)
         
         return results
     
@@ -137,15 +200,7 @@ class ResultHarmonizer:
             try:
                 results[customer_id] = self._execute_for_customer(query_plan, customer_id)
             except Exception as e:
-                # Create error result
-                results[customer_id] = QueryResult(
-                    customer_id=customer_id,
-                    data=[],
-                    sql_executed="",
-                    execution_time_ms=0,
-                    row_count=0,
-                    error=str(e)
-                )
+                results[customer_id] = self._error_result(customer_id, e)
         
         return results
     
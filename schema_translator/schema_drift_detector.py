@@ -454,10 +454,9 @@ class SchemaDriftDetector:
             return
         
         try:
-            with open(self.snapshot_file, 'r') as f:
-                data = json.load(f)
-                for customer_id, snapshot_data in data.items():
-                    self.snapshots[customer_id] = SchemaSnapshot.from_dict(snapshot_data)
+            data = json.loads(self.snapshot_file.read_text(encoding="utf-8"))
+            for customer_id, snapshot_data in data.items():
+                self.snapshots[customer_id] = SchemaSnapshot.from_dict(snapshot_data)
         except Exception as e:
             logger.error(f"Error loading snapshots: {e}", exc_info=True)
     
@@ -469,7 +468,10 @@ class SchemaDriftDetector:
                 for customer_id, snapshot in self.snapshots.items()
             }
             
-            with open(self.snapshot_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            self.snapshot_file.write_text(
+                json.dumps(data, indent=2),
+                encoding="utf-8",
+                newline="\n"
+            )
         except Exception as e:
             logger.error(f"Error saving snapshots: {e}", exc_info=True)
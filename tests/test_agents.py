@@ -2,6 +2,11 @@
 Tests for LLM agents (query understanding and schema analysis).
 """
 
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
 import pytest
 from schema_translator.agents import QueryUnderstandingAgent, SchemaAnalyzerAgent
 from schema_translator.knowledge_graph import SchemaKnowledgeGraph
@@ -113,6 +118,26 @@ class TestQueryUnderstandingAgent:
         assert len(explanation) > 0
         assert "contract" in explanation.lower() or "active" in explanation.lower()
 
+    def test_explain_query_plan_with_aggregations(self, query_agent):
+        """Test explaining a hand-built plan with filters and aggregations."""
+        from schema_translator.models import QueryAggregation, QueryFilter, SemanticQueryPlan
+
+        plan = SemanticQueryPlan(
+            intent=QueryIntent.AGGREGATE_VALUES,
+            filters=[
+                QueryFilter(concept="contract_value", operator=QueryOperator.GREATER_THAN, value=1000)
+            ],
+            aggregations=[QueryAggregation(function="sum", concept="contract_value")],
+            limit=5,
+        )
+
+        explanation = query_agent.explain_query_plan(plan)
+
+        assert explanation == (
+            "Calculate statistics for contracts where contract value greater than 1000 "
+            "(sum(contract_value)) (limit 5)"
+        )
+
 
 class TestSchemaAnalyzerAgent:
     """Tests for automated schema analysis."""
@@ -231,6 +256,18 @@ class TestSchemaAnalyzerAgent:
         assert any("nonexistent_table" in e for e in errors)
         assert any("nonexistent_column" in e for e in errors)
 
+    def test_infer_semantic_type(self):
+        """Test classifying SQL column types into semantic types."""
+        from schema_translator.agents.schema_analyzer import _infer_semantic_type
+
+        assert _infer_semantic_type("BIGINT") == SemanticType.FLOAT
+        assert _infer_semantic_type("decimal(15,2)") == SemanticType.FLOAT
+        assert _infer_semantic_type("TINYINT(1)") == SemanticType.FLOAT
+        assert _infer_semantic_type("DATETIME") == SemanticType.DATE
+        assert _infer_semantic_type("timestamp") == SemanticType.DATE
+        assert _infer_semantic_type("BOOLEAN") == SemanticType.BOOLEAN
+        assert _infer_semantic_type("VARCHAR(255)") == SemanticType.TEXT
+
     def test_explain_mappings(self, schema_agent):
         """Test generating human-readable mapping explanations."""
         from schema_translator.models import ConceptMapping
@@ -241,9 +278,9 @@ class TestSchemaAnalyzerAgent:
             column_name="total_amount",
             data_type="DECIMAL(15,2)",
             semantic_type=SemanticType.FLOAT,
+            concept="contract_value",
+            confidence=0.95,
         )
-        mapping1._concept = "contract_value"
-        mapping1._confidence = 0.95
         
         mapping2 = ConceptMapping(
             customer_id="test",
@@ -252,9 +289,9 @@ class TestSchemaAnalyzerAgent:
             data_type="DATE",
             semantic_type=SemanticType.DATE,
             transformation="Direct mapping",
+            concept="contract_expiration",
+            confidence=0.90,
         )
-        mapping2._concept = "contract_expiration"
-        mapping2._confidence = 0.90
         
         mappings = [mapping1, mapping2]
 
@@ -267,6 +304,380 @@ class TestSchemaAnalyzerAgent:
         assert "Transformation" in explanation
 
 
+def _fake_client(payload):
+    """Build a stand-in Anthropic client whose replies call a tool with payload."""
+    client = MagicMock()
+    client.messages.create.return_value = SimpleNamespace(
+        content=[SimpleNamespace(type="tool_use", id="toolu_1", name="emit", input=payload)]
+    )
+    return client
+
+
+class TestReplyParsing:
+    """Tests for reading JSON out of model replies (no API calls)."""
+
+    def test_fenced_reply_is_parsed(self, query_agent):
+        """Test that a reply wrapped in a ```json fence still parses."""
+        plan = {"intent": "count_contracts", "filters": [], "projections": []}
+        query_agent.client = MagicMock()
+        query_agent.client.messages.create.return_value = SimpleNamespace(
+            content=[SimpleNamespace(text=f"```json\n{json.dumps(plan)}\n```")]
+        )
+
+        result = query_agent.understand_query("How many contracts are there?")
+
+        assert result.intent == QueryIntent.COUNT_CONTRACTS
+        assert query_agent.client.messages.create.call_count == 1
+
+    def test_tool_call_reply_is_used(self, query_agent, schema_agent):
+        """Test that both agents force a tool call and read its input."""
+        query_agent.client = _fake_client(
+            {"intent": "find_contracts", "filters": [], "projections": [], "limit": 7}
+        )
+
+        result = query_agent.understand_query("Show seven contracts")
+
+        assert result.limit == 7
+        kwargs = query_agent.client.messages.create.call_args.kwargs
+        assert kwargs["tool_choice"] == {"type": "tool", "name": "emit_plan"}
+        assert kwargs["max_tokens"] == query_agent.config.max_output_tokens_query
+        assert kwargs["tools"][0]["input_schema"]["properties"]["intent"]
+
+        schema_agent.client = _fake_client({"mappings": []})
+        assert schema_agent.analyze_schema("test_customer", CustomerSchema(customer_id="test_customer", tables=[])) == []
+        kwargs = schema_agent.client.messages.create.call_args.kwargs
+        assert kwargs["tool_choice"] == {"type": "tool", "name": "emit_mappings"}
+
+    def test_agents_use_their_own_models(self, config, knowledge_graph):
+        """Test that query parsing and schema analysis pick separate models."""
+        config = config.model_copy(
+            update={"query_understanding_model": "fast-model", "schema_analyzer_model": None}
+        )
+        query_agent = QueryUnderstandingAgent(config.anthropic_api_key, knowledge_graph, config=config)
+        schema_agent = SchemaAnalyzerAgent(config.anthropic_api_key, knowledge_graph, config=config)
+        query_agent.client = _fake_client({"intent": "find_contracts", "filters": [], "projections": []})
+
+        query_agent.understand_query("Show me all contracts")
+
+        assert query_agent.client.messages.create.call_args.kwargs["model"] == "fast-model"
+        assert schema_agent.model == config.model_name
+
+    def test_retry_appends_turns(self, query_agent):
+        """Test that a failed reply is retried as new turns, not a longer prompt."""
+        bad = _fake_client({"intent": "find_contracts", "filters": [], "projections": ["no_such_concept"]})
+        good = _fake_client({"intent": "find_contracts", "filters": [], "projections": []})
+        query_agent.client = MagicMock()
+        query_agent.client.messages.create.side_effect = [
+            bad.messages.create.return_value,
+            good.messages.create.return_value,
+        ]
+
+        query_agent.understand_query("Show me all contracts")
+
+        first, second = (c.kwargs["messages"] for c in query_agent.client.messages.create.call_args_list)
+        assert len(first) == 1
+        assert second[0] == first[0]
+        assert [turn["role"] for turn in second] == ["user", "assistant", "user"]
+        feedback = second[2]["content"][0]
+        assert feedback["type"] == "tool_result"
+        assert feedback["tool_use_id"] == "toolu_1"
+        assert "no_such_concept" in feedback["content"]
+
+
+class TestSystemPrompt:
+    """Tests for system prompt memoization."""
+
+    def test_system_prompt_rebuilt_only_on_concept_change(self, query_agent, schema_agent):
+        """Test that prompts are reused until the concept set changes."""
+        query_prompt = query_agent._build_system_prompt()
+        schema_prompt = schema_agent._build_system_prompt()
+        assert query_agent._build_system_prompt() is query_prompt
+        assert schema_agent._build_system_prompt() is schema_prompt
+
+        query_agent.kg.add_concept(
+            concept_id="contract_owner",
+            concept_name="Contract Owner",
+            description="Person responsible for the contract"
+        )
+
+        assert "- contract_owner" in query_agent._build_system_prompt()
+        assert "contract_owner: Person responsible" in schema_agent._build_system_prompt()
+
+
+    def test_examples_sent_as_cached_system_block(self, query_agent):
+        """Test that few-shot examples ride in a cache-marked system block."""
+        query_agent.client = _fake_client(
+            {"intent": "find_contracts", "filters": [], "projections": []}
+        )
+
+        query_agent.understand_query("Show me all contracts")
+
+        kwargs = query_agent.client.messages.create.call_args.kwargs
+        base, examples = kwargs["system"]
+        assert base["text"] == query_agent._build_system_prompt()
+        assert examples["text"].startswith("Examples:")
+        assert examples["cache_control"] == {"type": "ephemeral"}
+        assert "Examples:" not in kwargs["messages"][0]["content"]
+
+
+class TestResponseCaching:
+    """Tests for the exact-match response cache (no API calls)."""
+
+    def test_repeat_query_uses_cache(self, query_agent):
+        """Test that a repeated query, modulo case and spacing, hits the cache."""
+        query_agent.client = _fake_client(
+            {"intent": "find_contracts", "filters": [], "projections": []}
+        )
+
+        first = query_agent.understand_query("Show me all contracts")
+        second = query_agent.understand_query("  show me   ALL contracts ")
+
+        assert query_agent.client.messages.create.call_count == 1
+        assert second == first
+        assert second is not first
+
+    def test_cached_plan_is_isolated_from_caller(self, query_agent):
+        """Test that mutating a returned plan does not corrupt the cache."""
+        query_agent.client = _fake_client(
+            {"intent": "find_contracts", "filters": [], "projections": []}
+        )
+
+        plan = query_agent.understand_query("Show me all contracts")
+        plan.projections.append("contract_value")
+
+        assert query_agent.understand_query("Show me all contracts").projections == []
+
+    def test_understand_queries_batches_uncached(self, config, knowledge_graph):
+        """Test that uncached queries share one request per batch."""
+        agent = QueryUnderstandingAgent(
+            config.anthropic_api_key,
+            knowledge_graph,
+            config=config.model_copy(update={"max_batch_size": 2}),
+        )
+        plan = {"intent": "find_contracts", "filters": [], "projections": []}
+        agent.client = _fake_client(plan)
+        agent.understand_query("Show me all contracts")
+
+        agent.client = _fake_client({"plans": [plan, plan]})
+        plans = agent.understand_queries(
+            ["Show me all contracts", "List contracts", "All contracts", "Every contract", "Any contract"]
+        )
+
+        # One query was cached; the other four go out as two batches of two
+        assert len(plans) == 5
+        assert agent.client.messages.create.call_count == 2
+        kwargs = agent.client.messages.create.call_args.kwargs
+        assert kwargs["max_tokens"] == 2 * config.max_output_tokens_query
+        assert agent.understand_query("Every contract") == plans[3]
+
+    def test_repeat_schema_analysis_uses_cache(self, schema_agent):
+        """Test that re-analyzing an identical schema hits the cache."""
+        schema_agent.client = _fake_client(
+            {"mappings": [{"concept": "contract_identifier", "table": "contracts", "column": "id"}]}
+        )
+        schema = CustomerSchema(
+            customer_id="test_customer",
+            tables=[
+                SchemaTable(
+                    name="contracts",
+                    columns=[SchemaColumn(name="id", data_type="INTEGER")],
+                )
+            ],
+        )
+
+        first = schema_agent.analyze_schema("test_customer", schema)
+        second = schema_agent.analyze_schema("test_customer", schema)
+
+        assert schema_agent.client.messages.create.call_count == 1
+        assert second[0].column_name == "id"
+        assert second[0].concept == first[0].concept == "contract_identifier"
+
+    def test_schema_analysis_cached_on_disk(self, config, knowledge_graph, tmp_path):
+        """Test that a fresh agent reuses an analysis saved by another."""
+        config = config.model_copy(update={"analysis_cache_dir": tmp_path})
+        schema = CustomerSchema(
+            customer_id="test_customer",
+            tables=[
+                SchemaTable(
+                    name="contracts",
+                    columns=[SchemaColumn(name="value", data_type="DECIMAL(15,2)")],
+                )
+            ],
+        )
+        first_agent = SchemaAnalyzerAgent(config.anthropic_api_key, knowledge_graph, config=config)
+        first_agent.client = _fake_client(
+            {"mappings": [{"concept": "contract_value", "table": "contracts", "column": "value"}]}
+        )
+        first_agent.analyze_schema("test_customer", schema)
+
+        second_agent = SchemaAnalyzerAgent(config.anthropic_api_key, knowledge_graph, config=config)
+        second_agent.client = _fake_client({"mappings": []})
+        mappings = second_agent.analyze_schema("test_customer", schema)
+
+        assert second_agent.client.messages.create.call_count == 0
+        assert mappings[0].concept == "contract_value"
+        assert mappings[0].semantic_type == SemanticType.FLOAT
+        kwargs = first_agent.client.messages.create.call_args.kwargs
+        schema_block = kwargs["messages"][0]["content"][0]
+        assert "contracts" in schema_block["text"]
+        assert schema_block["cache_control"] == {"type": "ephemeral"}
+
+
+class TestStreamingAnalysis:
+    """Tests for streamed schema analysis (no API calls)."""
+
+    @staticmethod
+    def _fake_stream(events):
+        """Build a stand-in client whose messages.stream yields events."""
+        client = MagicMock()
+        stream = client.messages.stream.return_value.__enter__.return_value
+        stream.__iter__.side_effect = lambda: iter(events)
+        return client
+
+    def test_mappings_yielded_as_they_complete(self, schema_agent):
+        """Test that each mapping is yielded once the next one has started."""
+        first = {"concept": "contract_identifier", "table": "contracts", "column": "id"}
+        second = {"concept": "contract_value", "table": "contracts", "column": "value"}
+        events = [
+            SimpleNamespace(type="input_json", snapshot={"mappings": [{"concept": "contract_id"}]}),
+            SimpleNamespace(type="input_json", snapshot={"mappings": [first, {"concept": "con"}]}),
+            SimpleNamespace(
+                type="content_block_stop",
+                content_block=SimpleNamespace(type="tool_use", input={"mappings": [first, second]}),
+            ),
+        ]
+        schema_agent.client = self._fake_stream(events)
+        schema = CustomerSchema(
+            customer_id="test_customer",
+            tables=[
+                SchemaTable(
+                    name="contracts",
+                    columns=[
+                        SchemaColumn(name="id", data_type="INTEGER"),
+                        SchemaColumn(name="value", data_type="DECIMAL(15,2)"),
+                    ],
+                )
+            ],
+        )
+
+        stream = schema_agent.iter_schema_mappings("test_customer", schema)
+
+        assert next(stream).concept == "contract_identifier"
+        assert [m.concept for m in stream] == ["contract_value"]
+        # The completed analysis is cached for analyze_schema
+        assert len(schema_agent.analyze_schema("test_customer", schema)) == 2
+
+    def test_bad_mapping_stops_stream(self, schema_agent):
+        """Test that an unknown concept aborts the stream immediately."""
+        bad = {"concept": "no_such_concept", "table": "contracts", "column": "id"}
+        events = [
+            SimpleNamespace(type="input_json", snapshot={"mappings": [bad, {}]}),
+            SimpleNamespace(type="content_block_stop", content_block=SimpleNamespace(type="tool_use", input={})),
+        ]
+        schema_agent.client = self._fake_stream(events)
+        schema = CustomerSchema(customer_id="test_customer", tables=[])
+
+        with pytest.raises(ValueError, match="no_such_concept"):
+            list(schema_agent.iter_schema_mappings("test_customer", schema))
+
+        schema_agent.client.messages.stream.return_value.__exit__.assert_called_once()
+
+
+class TestAsyncAgents:
+    """Tests for the async agent entry points (no API calls)."""
+
+    @pytest.mark.asyncio
+    async def test_understand_query_batch(self, config, knowledge_graph):
+        """Test that a batch runs concurrently, capped, and keeps input order."""
+        agent = QueryUnderstandingAgent(
+            config.anthropic_api_key,
+            knowledge_graph,
+            config=config.model_copy(update={"max_concurrency": 2}),
+        )
+        in_flight = 0
+        peak = 0
+
+        async def create(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            limit = int(kwargs["messages"][0]["content"].split('"')[1].split()[-1])
+            plan = {"intent": "find_contracts", "filters": [], "projections": [], "limit": limit}
+            return SimpleNamespace(content=[SimpleNamespace(text=json.dumps(plan))])
+
+        agent.async_client = MagicMock()
+        agent.async_client.messages.create = create
+
+        plans = await agent.understand_query_batch([f"show contracts limit {n}" for n in range(1, 6)])
+
+        assert [plan.limit for plan in plans] == [1, 2, 3, 4, 5]
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_analyze_schema_async(self, schema_agent):
+        """Test async schema analysis parses mappings like the sync path."""
+        schema_agent.async_client = MagicMock()
+        schema_agent.async_client.messages.create = AsyncMock(
+            return_value=SimpleNamespace(content=[SimpleNamespace(text=json.dumps(
+                {"mappings": [{"concept": "contract_value", "table": "contracts", "column": "value"}]}
+            ))])
+        )
+        schema = CustomerSchema(
+            customer_id="test_customer",
+            tables=[
+                SchemaTable(
+                    name="contracts",
+                    columns=[SchemaColumn(name="value", data_type="DECIMAL(15,2)")],
+                )
+            ],
+        )
+
+        mappings = await schema_agent.analyze_schema_async("test_customer", schema)
+
+        assert mappings[0].concept == "contract_value"
+        assert mappings[0].semantic_type == SemanticType.FLOAT
+
+    @pytest.mark.asyncio
+    async def test_analyze_large_schema_in_chunks(self, config, knowledge_graph):
+        """Test that a large schema is split into table slices and merged."""
+        agent = SchemaAnalyzerAgent(
+            config.anthropic_api_key,
+            knowledge_graph,
+            config=config.model_copy(update={"schema_chunk_tables": 2}),
+        )
+        seen_tables = []
+        budgets = set()
+
+        async def create(**kwargs):
+            schema_text = kwargs["messages"][0]["content"][0]["text"]
+            tables = [line.split(": ")[1] for line in schema_text.splitlines() if line.startswith("Table: ")]
+            seen_tables.append(tables)
+            budgets.add(kwargs["max_tokens"])
+            entries = [{"concept": "contract_identifier", "table": t, "column": "id"} for t in tables]
+            # The same mapping proposed twice is kept once
+            entries.append(entries[0])
+            return SimpleNamespace(content=[SimpleNamespace(type="tool_use", id="toolu_1", input={"mappings": entries})])
+
+        agent.async_client = MagicMock()
+        agent.async_client.messages.create = create
+        schema = CustomerSchema(
+            customer_id="test_customer",
+            tables=[
+                SchemaTable(name=name, columns=[SchemaColumn(name="id", data_type="INTEGER")])
+                for name in ["t1", "t2", "t3"]
+            ],
+        )
+
+        mappings = await agent.analyze_schema_async("test_customer", schema)
+
+        assert seen_tables == [["t1", "t2"], ["t3"]]
+        assert [m.table_name for m in mappings] == ["t1", "t2", "t3"]
+        # Slices use the per-chunk budget; whole schemas keep the full one
+        assert budgets == {config.max_output_tokens_schema_chunk}
+
+
 class TestEndToEndAgent:
     """End-to-end tests with agents."""
 
@@ -1,6 +1,7 @@
 """Tests for the knowledge graph."""
 
 import json
+import os
 from pathlib import Path
 
 import pytest
@@ -78,6 +79,16 @@ class TestKnowledgeGraphBasics:
         assert len(empty_kg.concepts) == 1
         assert empty_kg.graph.number_of_nodes() == 1
     
+    def test_concept_list_text(self, empty_kg):
+        """Test that the prompt concept list is sorted and refreshed on change."""
+        empty_kg.add_concept(concept_id="contract_value", concept_name="Value", description="Value")
+        empty_kg.add_concept(concept_id="contract_id", concept_name="ID", description="ID")
+        
+        assert empty_kg.concept_list_text() == "- contract_id\n- contract_value"
+        
+        empty_kg.add_concept(concept_id="a_concept", concept_name="A", description="A")
+        assert empty_kg.concept_list_text().startswith("- a_concept\n")
+    
     def test_add_customer_mapping(self, empty_kg):
         """Test adding a customer mapping."""
         empty_kg.add_concept(
@@ -112,6 +123,31 @@ class TestKnowledgeGraphBasics:
                 semantic_type=SemanticType.TEXT
             )
     
+    def test_add_customer_mappings_bulk(self, empty_kg):
+        """Test that a bad entry in a bulk load leaves the graph untouched."""
+        empty_kg.add_concept(
+            concept_id="contract_id",
+            concept_name="Contract ID",
+            description="Contract identifier"
+        )
+        good = dict(
+            concept_id="contract_id",
+            customer_id="customer_a",
+            table_name="contracts",
+            column_name="id",
+            data_type="INTEGER",
+            semantic_type=SemanticType.INTEGER
+        )
+        
+        with pytest.raises(ValueError, match="Concept .* not found"):
+            empty_kg.add_customer_mappings([good, {**good, "concept_id": "nonexistent"}])
+        assert empty_kg.get_mapping("contract_id", "customer_a") is None
+        assert empty_kg.graph.number_of_nodes() == 1
+        
+        empty_kg.add_customer_mappings([good, {**good, "customer_id": "customer_b"}])
+        assert empty_kg.get_mapping("contract_id", "customer_b").column_name == "id"
+        assert empty_kg.graph.number_of_edges() == 2
+    
     def test_get_concept(self, populated_kg):
         """Test retrieving a concept."""
         concept = populated_kg.get_concept("test_concept")
@@ -226,6 +262,10 @@ class TestPersistence:
         assert "concepts" in data
         assert "transformations" in data
         assert "test_concept" in data["concepts"]
+        # Schema-analysis metadata is not saved with the mappings
+        mapping = data["concepts"]["test_concept"]["customer_mappings"]["customer_a"]
+        assert "confidence" not in mapping
+        assert "reasoning" not in mapping
     
     def test_load_nonexistent_file(self, empty_kg, tmp_path):
         """Test loading a nonexistent file raises an error."""
@@ -233,7 +273,57 @@ class TestPersistence:
         
         with pytest.raises(FileNotFoundError):
             empty_kg.load(nonexistent)
+    
+    def test_save_and_load_binary(self, populated_kg, tmp_path):
+        """Test round-tripping the graph through a binary snapshot."""
+        snapshot = tmp_path / "test_kg.pkl"
+        populated_kg.save_binary(snapshot)
+        
+        new_kg = SchemaKnowledgeGraph()
+        new_kg.load_binary(snapshot)
+        
+        assert new_kg.get_mapping("test_concept", "customer_b").column_name == "test_col"
+        assert new_kg.get_transformation("type_a", "type_b") == "TRANSFORM({column})"
+        assert new_kg.graph.number_of_nodes() == populated_kg.graph.number_of_nodes()
+    
+    def test_load_cached_writes_and_reuses_snapshot(self, populated_kg, tmp_path):
+        """Test that load_cached snapshots the JSON and reads the snapshot next time."""
+        temp_file = tmp_path / "test_kg.json"
+        populated_kg.save(temp_file)
+        
+        first = SchemaKnowledgeGraph()
+        first.load_cached(temp_file)
+        snapshot = temp_file.with_suffix(".pkl")
+        assert snapshot.exists()
+        
+        # A corrupt JSON file proves the second load comes from the snapshot
+        temp_file.write_text("not json")
+        os.utime(temp_file, (0, 0))
+        second = SchemaKnowledgeGraph()
+        second.load_cached(temp_file)
+        assert second.get_mapping("test_concept", "customer_a") is not None
 
+    
+    def test_load_cached_rebuilds_stale_snapshot(self, populated_kg, tmp_path):
+        """Test that a snapshot written for other models is replaced from the JSON."""
+        temp_file = tmp_path / "test_kg.json"
+        populated_kg.save(temp_file)
+        snapshot = temp_file.with_suffix(".pkl")
+        
+        # A snapshot tagged for an older format or set of model schemas
+        snapshot.write_bytes(b"kg-snapshot-0-old\n" + b"stale payload")
+        os.utime(temp_file, (0, 0))
+        with pytest.raises(ValueError):
+            SchemaKnowledgeGraph().load_binary(snapshot)
+        
+        kg = SchemaKnowledgeGraph()
+        kg.load_cached(temp_file)
+        assert kg.get_mapping("test_concept", "customer_a") is not None
+        
+        # The snapshot was rewritten and is now accepted
+        reloaded = SchemaKnowledgeGraph()
+        reloaded.load_binary(snapshot)
+        assert reloaded.get_mapping("test_concept", "customer_a") is not None
 
 class TestValidation:
     """Test validation functionality."""
@@ -32,6 +32,16 @@ class TestFeedbackLoop:
         assert len(loop.feedback_cache) == 0
         assert len(loop.query_patterns) == 0
     
+    def test_feedback_dir_created_once(self, tmp_path):
+        """Test the feedback directory is only created on first use."""
+        feedback_file = tmp_path / "nested" / "feedback.jsonl"
+        FeedbackLoop(feedback_file=feedback_file)
+        assert feedback_file.parent.is_dir()
+        
+        with patch.object(Path, "mkdir") as mkdir:
+            FeedbackLoop(feedback_file=feedback_file)
+        mkdir.assert_not_called()
+    
     def test_submit_good_feedback(self, tmp_path):
         """Test submitting positive feedback."""
         loop = FeedbackLoop(feedback_file=tmp_path / "feedback.jsonl")
@@ -97,6 +107,39 @@ class TestFeedbackLoop:
         assert summary["feedback_types"]["incorrect"] == 1
         assert summary["success_rate"] == pytest.approx(66.67, rel=0.1)
     
+    def test_feedback_summary_window(self, tmp_path):
+        """Test the summary only counts feedback inside the window."""
+        feedback_file = tmp_path / "feedback.jsonl"
+        loop = FeedbackLoop(feedback_file=feedback_file)
+        
+        plan = SemanticQueryPlan(
+            intent=QueryIntent.FIND_CONTRACTS,
+            projections=["contract_id"],
+            filters=[],
+            aggregations=[]
+        )
+        
+        loop.submit_feedback("recent query", plan, "incorrect")
+        old = loop.submit_feedback("old query", plan, "incorrect")
+        old.timestamp = datetime.now(timezone.utc) - timedelta(days=60)
+        feedback_file.write_text(
+            "".join(f.model_dump_json() + "\n" for f in loop.feedback_cache)
+        )
+        
+        # Reloading puts the older entry first
+        reloaded = FeedbackLoop(feedback_file=feedback_file)
+        assert [f.query_text for f in reloaded.feedback_cache] == ["old query", "recent query"]
+        
+        summary = reloaded.get_feedback_summary(days=30)
+        assert summary["total_feedback"] == 1
+        assert summary["most_problematic_queries"] == [("recent query", 1)]
+        assert summary["success_rate"] == 0
+        
+        assert reloaded.get_feedback_summary(days=90)["total_feedback"] == 2
+        stats = reloaded.get_statistics()
+        assert stats["feedback_by_type"] == {"incorrect": 2}
+        assert stats["unique_queries"] == 2
+    
     def test_analyze_failure_patterns(self, tmp_path):
         """Test failure pattern analysis."""
         loop = FeedbackLoop(feedback_file=tmp_path / "feedback.jsonl")
@@ -119,6 +162,28 @@ class TestFeedbackLoop:
         assert analysis["unique_failures"] == 2
         assert len(analysis["common_terms"]) > 0
     
+    def test_failure_terms_survive_reload(self, tmp_path):
+        """Test failed-query terms are counted the same after reloading."""
+        feedback_file = tmp_path / "feedback.jsonl"
+        loop = FeedbackLoop(feedback_file=feedback_file)
+        
+        plan = SemanticQueryPlan(
+            intent=QueryIntent.FIND_CONTRACTS,
+            projections=["contract_id"],
+            filters=[],
+            aggregations=[]
+        )
+        
+        loop.submit_feedback("Show the Renewal dates", plan, "incorrect")
+        loop.submit_feedback("renewal terms for ACME", plan, "missing")
+        
+        analysis = loop.analyze_failure_patterns()
+        assert analysis["common_terms"][0] == ("renewal", 2)
+        assert "the" not in dict(analysis["common_terms"])
+        
+        reloaded = FeedbackLoop(feedback_file=feedback_file)
+        assert reloaded.analyze_failure_patterns() == analysis
+    
     def test_suggest_new_concepts(self, tmp_path):
         """Test new concept suggestions."""
         loop = FeedbackLoop(feedback_file=tmp_path / "feedback.jsonl")
@@ -163,6 +228,31 @@ class TestFeedbackLoop:
         assert len(loop2.feedback_cache) == 2
         assert len(loop2.query_patterns) > 0
     
+    def test_save_after_clear(self, tmp_path):
+        """Test feedback saved after clearing old entries lands in the new file."""
+        feedback_file = tmp_path / "feedback.jsonl"
+        loop = FeedbackLoop(feedback_file=feedback_file)
+        
+        plan = SemanticQueryPlan(
+            intent=QueryIntent.FIND_CONTRACTS,
+            projections=["contract_id"],
+            filters=[],
+            aggregations=[]
+        )
+        
+        loop.submit_feedback("query1", plan, "good")
+        loop.submit_feedback("query2", plan, "good")
+        loop.feedback_cache[0].timestamp = datetime.now(timezone.utc) - timedelta(days=100)
+        
+        assert loop.clear_old_feedback(days=90) == 1
+        assert len(feedback_file.read_text().splitlines()) == 1
+        assert not feedback_file.with_suffix(".tmp").exists()
+        loop.submit_feedback("query3", plan, "incorrect")
+        loop.close()
+        
+        reloaded = FeedbackLoop(feedback_file=feedback_file)
+        assert [f.query_text for f in reloaded.feedback_cache] == ["query2", "query3"]
+    
     def test_clear_old_feedback(self, tmp_path):
         """Test clearing old feedback."""
         loop = FeedbackLoop(feedback_file=tmp_path / "feedback.jsonl")
@@ -115,6 +115,22 @@ class TestSemanticModels:
         assert mapping.customer_id == "customer_a"
         assert mapping.semantic_type == SemanticType.LIFETIME_TOTAL
     
+    def test_concept_mapping_analysis_fields(self):
+        """Test schema-analysis metadata fields."""
+        mapping = ConceptMapping(
+            customer_id="customer_a",
+            table_name="contracts",
+            column_name="contract_value",
+            data_type="INTEGER",
+            semantic_type=SemanticType.LIFETIME_TOTAL,
+            concept="contract_value",
+            confidence=0.9,
+        )
+        
+        assert mapping.concept == "contract_value"
+        assert mapping.confidence == 0.9
+        assert mapping.reasoning == ""
+    
     def test_semantic_concept_creation(self):
         """Test creating a SemanticConcept."""
         mapping_a = ConceptMapping(
@@ -203,6 +219,23 @@ class TestQueryModels:
         plan_dict = json.loads(json_str)
         plan2 = SemanticQueryPlan(**plan_dict)
         assert plan2.intent == plan.intent
+    
+    def test_semantic_query_plan_model_validate(self):
+        """Test validating a raw plan dict, including bare aggregation names."""
+        plan = SemanticQueryPlan.model_validate({
+            "intent": "count_contracts",
+            "filters": [{"concept": "contract_status", "operator": "equals", "value": "active"}],
+            "aggregations": ["count", {"function": "sum", "concept": "contract_value"}],
+        })
+        
+        assert plan.intent == QueryIntent.COUNT_CONTRACTS
+        assert isinstance(plan.filters[0], QueryFilter)
+        assert plan.filters[0].operator == QueryOperator.EQUALS
+        assert plan.aggregations[0] == QueryAggregation(function="count", concept="contract_identifier")
+        assert plan.aggregations[1].concept == "contract_value"
+        
+        with pytest.raises(ValueError):
+            SemanticQueryPlan.model_validate({"intent": "find_contracts", "filters": [{"operator": "bogus"}]})
 
 
 class TestResultModels:
@@ -260,6 +293,7 @@ class TestResultModels:
         assert result.total_count == 2
         assert result.success_rate == 100.0
         assert len(result.customers_succeeded) == 2
+        assert result.columns == ["contract_id", "value"]
     
     def test_harmonized_result_partial_success(self):
         """Test HarmonizedResult with partial success."""
@@ -278,6 +312,7 @@ class TestResultModels:
         
         assert result.success_rate == pytest.approx(33.33, rel=0.01)
         assert len(result.errors) == 2
+        assert result.columns == []
 
 
 class TestEnums:
@@ -228,6 +228,32 @@ class TestChatOrchestrator:
         assert orchestrator.query_agent is not None
         assert orchestrator.schema_agent is not None
     
+    def test_shared_components(self, config, knowledge_graph, orchestrator_mock):
+        """Test orchestrators built on shared components keep their own state."""
+        from anthropic import Anthropic, AsyncAnthropic
+        
+        clients = (Anthropic(api_key="test-key"), AsyncAnthropic(api_key="test-key"))
+        first = ChatOrchestrator(
+            config=config,
+            knowledge_graph=knowledge_graph,
+            use_llm=True,
+            executor=orchestrator_mock.executor,
+            llm_clients=clients
+        )
+        second = ChatOrchestrator(
+            config=config,
+            knowledge_graph=knowledge_graph,
+            use_llm=True,
+            executor=orchestrator_mock.executor,
+            llm_clients=clients
+        )
+        
+        assert first.executor is second.executor is orchestrator_mock.executor
+        assert first.query_agent.client is second.query_agent.client is clients[0]
+        assert first.schema_agent.async_client is clients[1]
+        assert first.query_agent is not second.query_agent
+        assert first.query_history is not second.query_history
+    
     def test_validate_query(self, orchestrator_mock):
         """Test query validation."""
         assert orchestrator_mock._validate_query("Show me contracts") is True
@@ -261,6 +287,17 @@ class TestChatOrchestrator:
         assert "debug" in response
         assert "sql_queries" in response["debug"]
     
+    def test_process_query_without_debug_skips_debug_info(self, orchestrator_mock):
+        """Test that debug payloads are only built when requested."""
+        response = orchestrator_mock.process_query(
+            "Show me all contracts",
+            customer_ids=["customer_a"]
+        )
+        
+        assert response["success"] is True
+        assert response["semantic_plan"] is None
+        assert "debug" not in response
+    
     def test_process_query_invalid(self, orchestrator_mock):
         """Test processing an invalid query."""
         response = orchestrator_mock.process_query("")
@@ -280,6 +317,41 @@ class TestChatOrchestrator:
         result = response["result"]
         assert len(result.customers_queried) == 3
     
+    @pytest.mark.asyncio
+    async def test_process_query_async_matches_sync(self, orchestrator_mock):
+        """Test that the async pipeline returns the same response shape."""
+        plans = []
+        
+        async def on_plan(plan):
+            plans.append(plan)
+        
+        response = await orchestrator_mock.process_query_async(
+            "Find contracts",
+            customer_ids=["customer_a", "customer_c"],
+            debug=True,
+            on_plan=on_plan
+        )
+        expected = orchestrator_mock.process_query(
+            "Find contracts",
+            customer_ids=["customer_a", "customer_c"],
+            debug=True
+        )
+        
+        assert response["success"] is True
+        assert len(plans) == 1
+        assert response.keys() == expected.keys()
+        assert sorted(response["result"].customers_queried) == ["customer_a", "customer_c"]
+        assert response["result"].total_count == expected["result"].total_count
+    
+    @pytest.mark.asyncio
+    async def test_process_query_async_invalid(self, orchestrator_mock):
+        """Test that the async pipeline reports invalid queries."""
+        response = await orchestrator_mock.process_query_async("")
+        
+        assert response["success"] is False
+        assert "Invalid query" in response["error"]
+        assert orchestrator_mock.get_query_history()[-1]["success"] is False
+    
     def test_process_query_all_customers(self, orchestrator_mock):
         """Test processing query across all customers."""
         response = orchestrator_mock.process_query("Find contracts")
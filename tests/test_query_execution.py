@@ -225,6 +225,26 @@ class TestDatabaseExecutor:
         count = executor.count_rows("customer_a", "contracts")
         assert count == 50  # 50 contracts per database
     
+    def test_count_rows_unknown_table(self, executor):
+        """Test that count_rows rejects names that are not tables."""
+        with pytest.raises(ValueError, match="Table not found"):
+            executor.count_rows("customer_a", "nonexistent_table")
+        with pytest.raises(ValueError):
+            executor.count_rows("customer_a", "contracts; DROP TABLE contracts")
+        
+        assert executor.count_rows("customer_a", "contracts") == 50
+    
+    def test_query_parameters(self, executor):
+        """Test binding values to query placeholders."""
+        sql = "SELECT COUNT(*) as count FROM contracts WHERE contract_value > ?"
+        high = executor.execute_query("customer_a", sql, (100000,))
+        none = executor.execute_query("customer_a", sql, (float("inf"),))
+        
+        assert high.success
+        assert 0 < high.data[0]["count"] <= 50
+        assert none.data[0]["count"] == 0
+        assert executor.execute_raw_query("customer_a", sql, [0])[0]["count"] == 50
+    
     def test_customer_b_multi_table(self, executor):
         """Test querying Customer B's multi-table schema."""
         sql = """
@@ -247,12 +267,126 @@ class TestDatabaseExecutor:
         assert result.execution_time_ms >= 0
         assert result.execution_time_ms < 10000  # Should be fast
     
+    def test_execute_for_all_customers(self, executor):
+        """Test running one query per customer, keeping input order."""
+        sql_by_customer = {
+            customer_id: "SELECT COUNT(*) as count FROM " + table
+            for customer_id, table in [
+                ("customer_c", "contracts"),
+                ("customer_a", "contracts"),
+                ("customer_zz", "contracts"),
+            ]
+        }
+        
+        results = executor.execute_for_all_customers(sql_by_customer)
+        
+        assert [r.customer_id for r in results] == ["customer_c", "customer_a", "customer_zz"]
+        assert results[0].success and results[1].success
+        assert not results[2].success
+        assert executor.execute_for_all_customers({}) == []
+    
+    def test_connection_pragmas(self, executor):
+        """Test that connections are tuned when opened."""
+        conn = executor._get_connection("customer_a")
+        
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -65536
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+    
+    def test_list_customers(self, executor, tmp_path, monkeypatch):
+        """Test listing customers from the scan, rescanning on request."""
+        assert "customer_a" in executor.list_customers()
+        
+        (tmp_path / "customer_a.db").write_bytes(b"")
+        (tmp_path / "notes.db").write_bytes(b"")
+        monkeypatch.setattr(executor.config, "database_dir", tmp_path)
+        scanned = DatabaseExecutor()
+        assert scanned.list_customers() == ["customer_a"]
+        
+        (tmp_path / "customer_b.db").write_bytes(b"")
+        assert scanned.list_customers() == ["customer_a"]
+        assert scanned.list_customers(refresh=True) == ["customer_a", "customer_b"]
+    
+    def test_missing_database(self, executor):
+        """Test that an unknown customer reports a missing database."""
+        result = executor.execute_query("customer_zz", "SELECT 1")
+        
+        assert not result.success
+        assert "Database not found" in result.error
+    
+    def test_database_removed_after_startup(self, executor, tmp_path, monkeypatch):
+        """Test that a database deleted after the startup scan is not recreated."""
+        db_copy = tmp_path / "customer_a.db"
+        db_copy.write_bytes(executor.config.get_database_path("a").read_bytes())
+        monkeypatch.setattr(executor.config, "database_dir", tmp_path)
+        
+        with DatabaseExecutor() as scanned:
+            assert scanned.list_customers() == ["customer_a"]
+            db_copy.unlink()
+            
+            result = scanned.execute_query("customer_a", "SELECT 1")
+            
+            assert not result.success
+            assert "Database not found" in result.error
+            assert not db_copy.exists()
+            assert scanned.list_customers() == []
+    
     def test_context_manager(self):
         """Test using executor as context manager."""
         with DatabaseExecutor() as executor:
             result = executor.execute_query("customer_a", "SELECT COUNT(*) as count FROM contracts")
             assert result.success
+    
+    def test_connection_reused_across_threads(self, executor):
+        """Test that a connection opened in one thread works from another."""
+        import threading
+        
+        executor.execute_query("customer_a", "SELECT 1")
+        
+        results = []
+        thread = threading.Thread(
+            target=lambda: results.append(executor.execute_query("customer_a", "SELECT 1"))
+        )
+        thread.start()
+        thread.join()
+        
+        assert results[0].success, results[0].error
 
+    
+    def test_shared_connection_runs_one_statement_at_a_time(self, executor):
+        """Test that threads take turns on a customer's connection only."""
+        import threading
+        import time
+        
+        release = threading.Event()
+        executor._get_connection("customer_a").create_function(
+            "wait_for_release", 0, lambda: release.wait(5)
+        )
+        
+        results = {}
+        
+        def run(name, customer_id, sql):
+            results[name] = executor.execute_query(customer_id, sql)
+        
+        blocker = threading.Thread(target=run, args=("blocker", "customer_a", "SELECT wait_for_release()"))
+        blocker.start()
+        while blocker.is_alive() and not executor._query_locks["customer_a"].locked():
+            time.sleep(0.001)
+        
+        same = threading.Thread(target=run, args=("same", "customer_a", "SELECT 1"))
+        other = threading.Thread(target=run, args=("other", "customer_b", "SELECT 1"))
+        same.start()
+        other.start()
+        
+        other.join(5)
+        same.join(0.2)
+        assert results["other"].success
+        assert "same" not in results
+        
+        release.set()
+        blocker.join(5)
+        same.join(5)
+        assert results["blocker"].success and results["same"].success
 
 class TestIntegration:
     """Integration tests combining compiler and executor."""
@@ -197,6 +197,27 @@ class TestResultHarmonizer:
         assert len(result.customers_succeeded) >= 0
         assert result.total_count >= 0
     
+    @pytest.mark.asyncio
+    async def test_execute_across_customers_async(self, result_harmonizer):
+        """Test the async fan-out matches the thread-pool path."""
+        plan = SemanticQueryPlan(
+            intent=QueryIntent.FIND_CONTRACTS,
+            projections=["contract_identifier", "contract_status"],
+            filters=[],
+            aggregations=[],
+            limit=5
+        )
+        customer_ids = ["customer_a", "customer_c", "customer_missing"]
+        
+        result = await result_harmonizer.execute_across_customers_async(plan, customer_ids=customer_ids)
+        expected = result_harmonizer.execute_across_customers(plan, customer_ids=customer_ids)
+        
+        assert isinstance(result, HarmonizedResult)
+        assert sorted(result.customers_queried) == sorted(expected.customers_queried)
+        assert sorted(result.customers_succeeded) == sorted(expected.customers_succeeded)
+        assert "customer_missing" in result.customers_failed
+        assert result.total_count == expected.total_count
+    
     def test_execute_across_multiple_customers(self, result_harmonizer):
         """Test executing a query across multiple customers."""
         plan = SemanticQueryPlan(
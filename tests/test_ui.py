@@ -6,11 +6,16 @@ Full UI testing requires running the Chainlit app and using browser automation.
 """
 
 import pytest
-from unittest.mock import Mock, MagicMock
+from unittest.mock import AsyncMock, Mock, MagicMock
+import app
 from app import (
+    cached_process_query,
     format_result_table,
     format_statistics,
-    format_debug_info
+    format_debug_info,
+    iter_response_chunks,
+    render_response,
+    result_to_csv
 )
 from schema_translator.models import HarmonizedRow, HarmonizedResult
 
@@ -86,6 +91,30 @@ class TestResultFormatting:
         assert "| 1 | Test1 |" in output
         assert "| 2 | Test2 |" in output
     
+    def test_format_keeps_column_order(self):
+        """Test that preferred columns lead and the rest keep row order."""
+        row = HarmonizedRow(
+            customer_id="customer_a",
+            data={
+                "zeta": "z",
+                "contract_status": "active",
+                "alpha": "a",
+                "contract_identifier": "C001"
+            }
+        )
+        result = HarmonizedResult(
+            results=[row],
+            total_count=1,
+            customers_queried=["customer_a"],
+            customers_succeeded=["customer_a"],
+            customers_failed=[],
+            execution_time_ms=1.0
+        )
+        
+        output = format_result_table(result)
+        
+        assert output.startswith("| Customer | Contract ID | Status | Zeta | Alpha |")
+    
     def test_format_truncates_large_results(self):
         """Test that large results are truncated."""
         rows = [
@@ -112,6 +141,44 @@ class TestResultFormatting:
         # Test with custom limit of 50
         output = format_result_table(result, limit=50)
         assert "Showing 50 of 100 rows" in output
+    
+    def test_format_truncates_long_cells(self):
+        """Test that long cell values are cut to MAX_CELL_WIDTH."""
+        result = HarmonizedResult(
+            results=[HarmonizedRow(customer_id="customer_a", data={"notes": "x" * 500})],
+            total_count=1,
+            customers_queried=["customer_a"],
+            customers_succeeded=["customer_a"],
+            customers_failed=[],
+            execution_time_ms=1.0
+        )
+        
+        output = format_result_table(result)
+        
+        assert "x" * (app.MAX_CELL_WIDTH - 1) + "…" in output
+        assert "x" * app.MAX_CELL_WIDTH not in output
+    
+    def test_result_to_csv_includes_all_rows(self):
+        """Test that the CSV export covers every row and column."""
+        rows = [
+            HarmonizedRow(customer_id="customer_a", data={"id": str(i), "status": "active"})
+            for i in range(3)
+        ]
+        rows.append(HarmonizedRow(customer_id="customer_b", data={"id": "3", "value": 5}))
+        result = HarmonizedResult(
+            results=rows,
+            total_count=4,
+            customers_queried=["customer_a", "customer_b"],
+            customers_succeeded=["customer_a", "customer_b"],
+            customers_failed=[],
+            execution_time_ms=1.0
+        )
+        
+        lines = result_to_csv(result).decode("utf-8").splitlines()
+        
+        assert lines[0] == "id,status,value"
+        assert len(lines) == 5
+        assert lines[-1] == "3,,5"
 
 
 class TestStatisticsFormatting:
@@ -215,6 +282,76 @@ class TestDebugFormatting:
         output = format_debug_info(debug)
         
         assert "COUNT" in output
+    
+    def test_format_debug_with_missing_sections(self):
+        """Test that a sparse debug dict still formats."""
+        debug = {
+            'semantic_plan': {
+                'intent': 'find_contracts',
+                'projections': ['contract_id']
+            }
+        }
+        
+        output = format_debug_info(debug)
+        
+        assert "`contract_id`" in output
+        assert "```sql" not in output
+    
+    def test_format_empty_debug_info(self):
+        """Test that missing debug info renders nothing."""
+        assert format_debug_info({}) == ""
+    
+    def test_format_debug_info_first_sql(self):
+        """Test that the SQL of the first customer queried is shown."""
+        debug = {
+            'semantic_plan': {'intent': 'find_contracts', 'projections': ['contract_id']},
+            'sql_queries': {'customer_b': 'SELECT 2', 'customer_a': 'SELECT 1'}
+        }
+        
+        output = format_debug_info(debug)
+        
+        assert "SELECT 2" in output
+        assert "SELECT 1" not in output
+
+
+class TestQueryCache:
+    """Test the exact-match query response cache."""
+    
+    def setup_method(self):
+        app._QUERY_CACHE.clear()
+    
+    @pytest.mark.asyncio
+    async def test_repeat_query_hits_cache(self):
+        """Test that an identical query does not re-run the orchestrator."""
+        orchestrator = Mock()
+        
+        async def process_query_async(query_text, customer_ids, debug, on_plan=None):
+            await on_plan(Mock())
+            return {'success': True, 'result': None, 'execution_time_ms': 12.5}
+        
+        orchestrator.process_query_async = AsyncMock(side_effect=process_query_async)
+        on_plan = AsyncMock()
+        
+        first = await cached_process_query(orchestrator, "Show all contracts", ["customer_b", "customer_a"], False, on_plan)
+        second = await cached_process_query(orchestrator, "  show all contracts ", ["customer_a", "customer_b"], False, on_plan)
+        
+        assert second is not first
+        assert second['cached'] is True
+        assert second['execution_time_ms'] == 0.0
+        assert 'cached' not in first
+        assert orchestrator.process_query_async.await_count == 1
+        assert on_plan.await_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_failures_not_cached(self):
+        """Test that failed responses are retried."""
+        orchestrator = Mock()
+        orchestrator.process_query_async = AsyncMock(return_value={'success': False, 'error': 'boom'})
+        
+        await cached_process_query(orchestrator, "Show all contracts", None, False)
+        await cached_process_query(orchestrator, "Show all contracts", None, False)
+        
+        assert orchestrator.process_query_async.await_count == 2
 
 
 class TestUIIntegration:
@@ -262,6 +399,68 @@ class TestUIIntegration:
         # Both should be valid markdown
         assert "|" in table
         assert "**" in stats_output
+    
+    def test_render_response_combines_sections(self):
+        """Test that the fused renderer matches the standalone helpers."""
+        rows = [
+            HarmonizedRow(
+                customer_id="customer_a",
+                data={"contract_identifier": "C001", "contract_status": "active"}
+            )
+        ]
+        
+        result = HarmonizedResult(
+            results=rows,
+            total_count=1,
+            customers_queried=["customer_a"],
+            customers_succeeded=["customer_a"],
+            customers_failed=[],
+            execution_time_ms=1.0
+        )
+        stats = {
+            'success_rate': 100.0,
+            'total_rows': 1,
+            'customers_queried': ['customer_a'],
+            'customers_succeeded': ['customer_a'],
+            'customers_failed': [],
+            'execution_time_ms': 1.0
+        }
+        
+        output = render_response(result, stats)
+        
+        assert output.startswith("**Showing 2 fields:**")
+        assert format_result_table(result) in output
+        assert output.endswith(format_statistics(stats))
+        assert "Debug Information" not in output
+    
+    def test_response_chunks_batch_table_rows(self):
+        """Test that streamed chunks split rows into batches and join to the full response."""
+        rows = [
+            HarmonizedRow(customer_id="customer_a", data={"source_db": "A", "contract_identifier": f"C{i:03d}"})
+            for i in range(25)
+        ]
+        result = HarmonizedResult(
+            results=rows,
+            total_count=25,
+            customers_queried=["customer_a"],
+            customers_succeeded=["customer_a"],
+            customers_failed=[],
+            execution_time_ms=1.0
+        )
+        stats = {
+            'success_rate': 100.0,
+            'total_rows': 25,
+            'customers_queried': ['customer_a'],
+            'customers_succeeded': ['customer_a'],
+            'customers_failed': [],
+            'execution_time_ms': 1.0
+        }
+        
+        chunks = list(iter_response_chunks(result, stats, limit=25))
+        row_chunks = [c for c in chunks if c.startswith("\n| ")]
+        
+        assert "".join(chunks) == render_response(result, stats, limit=25)
+        assert [c.count("\n| ") for c in row_chunks] == [10, 10, 5]
 
 
 if __name__ == "__main__":